@@ -10,7 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 # Import your models
 from app.db.base_class import Base
-from app.db.models import User, UserPreferences
+from app.db.models import User, UserPreferences, FavoriteMovie, WatchlistItem, Movie, Genre, MovieNeighbor
 
 # this is the Alembic Config object
 config = context.config
@@ -0,0 +1,75 @@
+"""movie catalog
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-03-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import sqlite
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Create genres table
+    op.create_table(
+        'genres',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # Create movies table
+    op.create_table(
+        'movies',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('original_title', sa.String(), nullable=True),
+        sa.Column('overview', sa.Text(), nullable=True),
+        sa.Column('tagline', sa.String(), nullable=True),
+        sa.Column('poster_url', sa.String(), nullable=True),
+        sa.Column('backdrop_url', sa.String(), nullable=True),
+        sa.Column('release_date', sa.String(), nullable=True),
+        sa.Column('rating', sa.Float(), nullable=True),
+        sa.Column('popularity', sa.Float(), nullable=True),
+        sa.Column('runtime', sa.Integer(), nullable=True),
+        sa.Column('budget', sa.BigInteger(), nullable=True),
+        sa.Column('revenue', sa.BigInteger(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('original_language', sa.String(), nullable=True),
+        sa.Column('adult', sa.Boolean(), nullable=True),
+        sa.Column('production_companies', sqlite.JSON, nullable=True),
+        sa.Column('language', sa.String(), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_movies_id'), 'movies', ['id'], unique=False)
+    op.create_index(op.f('ix_movies_popularity'), 'movies', ['popularity'], unique=False)
+    op.create_index(op.f('ix_movies_original_language'), 'movies', ['original_language'], unique=False)
+    op.create_index(op.f('ix_movies_fetched_at'), 'movies', ['fetched_at'], unique=False)
+
+    # Create movie_genres association table
+    op.create_table(
+        'movie_genres',
+        sa.Column('movie_id', sa.Integer(), nullable=False),
+        sa.Column('genre_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['movie_id'], ['movies.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['genre_id'], ['genres.id'], ),
+        sa.PrimaryKeyConstraint('movie_id', 'genre_id')
+    )
+    op.create_index(op.f('ix_movie_genres_genre_id'), 'movie_genres', ['genre_id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_movie_genres_genre_id'), table_name='movie_genres')
+    op.drop_table('movie_genres')
+    op.drop_index(op.f('ix_movies_fetched_at'), table_name='movies')
+    op.drop_index(op.f('ix_movies_original_language'), table_name='movies')
+    op.drop_index(op.f('ix_movies_popularity'), table_name='movies')
+    op.drop_index(op.f('ix_movies_id'), table_name='movies')
+    op.drop_table('movies')
+    op.drop_table('genres')
@@ -0,0 +1,24 @@
+"""movie etag
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-03-22 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Existing rows get their ETag on their next refresh; until then it is computed per response
+    with op.batch_alter_table('movies') as batch_op:
+        batch_op.add_column(sa.Column('etag', sa.String(), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table('movies') as batch_op:
+        batch_op.drop_column('etag')
@@ -0,0 +1,30 @@
+"""movie genre position
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-03-29 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.batch_alter_table('movie_genres') as batch_op:
+        batch_op.add_column(sa.Column('position', sa.Integer(), server_default='0', nullable=False))
+
+    # TMDB's order of existing links is unknown, so their stored ETags may not match
+    # the catalog body; clear them to be hashed per response until the next refresh
+    op.execute(
+        "UPDATE movies SET etag = NULL WHERE id IN "
+        "(SELECT movie_id FROM movie_genres GROUP BY movie_id HAVING count(*) > 1)"
+    )
+
+def downgrade() -> None:
+    with op.batch_alter_table('movie_genres') as batch_op:
+        batch_op.drop_column('position')
@@ -0,0 +1,31 @@
+"""movie neighbors
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-03-08 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Create movie_neighbors table
+    op.create_table(
+        'movie_neighbors',
+        sa.Column('movie_id', sa.Integer(), nullable=False),
+        sa.Column('neighbor_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('movie_id', 'neighbor_id')
+    )
+    op.create_index('ix_movie_neighbors_movie_id_rank', 'movie_neighbors', ['movie_id', 'rank'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_movie_neighbors_movie_id_rank', table_name='movie_neighbors')
+    op.drop_table('movie_neighbors')
@@ -0,0 +1,83 @@
+"""saved movies
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+# (table, former JSON column on user_preferences)
+SAVED_MOVIE_TABLES = [('favorite_movies', 'favorite_movies'), ('watchlist_items', 'watchlist')]
+
+user_preferences = sa.table(
+    'user_preferences',
+    sa.column('user_id', sa.Integer),
+    sa.column('favorite_movies', sa.JSON),
+    sa.column('watchlist', sa.JSON)
+)
+
+def upgrade() -> None:
+    # Create one association table per list
+    for table_name, _ in SAVED_MOVIE_TABLES:
+        op.create_table(
+            table_name,
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('movie_id', sa.Integer(), nullable=False),
+            sa.Column('position', sa.Integer(), nullable=False),
+            sa.Column('added_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('user_id', 'movie_id')
+        )
+        op.create_index(op.f(f'ix_{table_name}_movie_id'), table_name, ['movie_id'], unique=False)
+
+    # Move existing JSON arrays into the new tables in order, dropping duplicates
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(user_preferences)).all()
+    for table_name, column in SAVED_MOVIE_TABLES:
+        table = sa.table(
+            table_name,
+            sa.column('user_id', sa.Integer),
+            sa.column('movie_id', sa.Integer),
+            sa.column('position', sa.Integer)
+        )
+        saved = [
+            {'user_id': row.user_id, 'movie_id': movie_id, 'position': position}
+            for row in rows if row.user_id is not None
+            for position, movie_id in enumerate(dict.fromkeys(getattr(row, column) or []))
+        ]
+        if saved:
+            op.bulk_insert(table, saved)
+
+    with op.batch_alter_table('user_preferences') as batch_op:
+        batch_op.drop_column('favorite_movies')
+        batch_op.drop_column('watchlist')
+
+def downgrade() -> None:
+    with op.batch_alter_table('user_preferences') as batch_op:
+        batch_op.add_column(sa.Column('favorite_movies', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('watchlist', sa.JSON(), nullable=True))
+
+    connection = op.get_bind()
+    for table_name, column in SAVED_MOVIE_TABLES:
+        saved = {}
+        query = sa.text(f'SELECT user_id, movie_id FROM {table_name} ORDER BY position, movie_id')
+        for user_id, movie_id in connection.execute(query):
+            saved.setdefault(user_id, []).append(movie_id)
+        for user_id, movie_ids in saved.items():
+            connection.execute(
+                user_preferences.update()
+                .where(user_preferences.c.user_id == user_id)
+                .values({column: movie_ids})
+            )
+
+    for table_name, _ in SAVED_MOVIE_TABLES:
+        op.drop_index(op.f(f'ix_{table_name}_movie_id'), table_name=table_name)
+        op.drop_table(table_name)
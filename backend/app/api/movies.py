@@ -1,80 +1,269 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional
-from ..models.movie import MovieDetail, MovieSearchResponse, MovieRecommendationResponse
-from ..utils.tmdb_client import TMDBClient
+import logging
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.movie import (
+    MovieDetail,
+    MovieSearchResponse,
+    MovieRecommendationResponse,
+    MovieBatchRequest,
+    MovieBatchResponse
+)
+from ..utils.tmdb_client import AsyncTMDBClient
 from ..core.config import get_settings
+from ..db.session import get_db
+from ..services import catalog, collaborative
+from ..services.export import NDJSON_MEDIA_TYPE, fixed_pages, ndjson_movies, prefetch_pages
+from ..services.recommender import PAGE_SIZE, ContentRecommender, paginate
+from ..utils.cache import LRUCache, make_cache_key
+from ..utils.error_handlers import TMDBAPIError
+from ..utils.responses import CachedBody, cache_headers, conditional_response, is_not_modified, model_json, page_json
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/movies", tags=["movies"])
 
-def get_tmdb_client() -> TMDBClient:
-    """Dependency to get TMDB client instance"""
-    settings = get_settings()
-    return TMDBClient(settings.tmdb_api_key)
+def to_http_exception(error: Exception) -> HTTPException:
+    """Map a client error to an HTTP error, using 503 while TMDB is degraded"""
+    if isinstance(error, TMDBAPIError) and error.transient:
+        headers = None
+        if error.retry_after is not None:
+            headers = {"Retry-After": str(max(int(error.retry_after), 1))}
+        return HTTPException(status_code=503, detail=str(error), headers=headers)
+    return HTTPException(status_code=400, detail=str(error))
+
+def get_tmdb_client(request: Request) -> AsyncTMDBClient:
+    """Dependency to get the shared TMDB client created at startup"""
+    return request.app.state.tmdb_client
+
+def get_recommender(request: Request) -> Optional[ContentRecommender]:
+    """Dependency to get the current content recommender, if there is one"""
+    loader = getattr(request.app.state, 'recommender_loader', None)
+    return loader.get() if loader is not None else None
+
+def get_response_cache(request: Request) -> Optional[LRUCache]:
+    """Dependency to get the cache of serialized TMDB list pages, if enabled"""
+    return getattr(request.app.state, 'response_cache', None)
+
+async def cached_tmdb_body(
+    cache: Optional[LRUCache],
+    endpoint: str,
+    params: Dict,
+    ttl: float,
+    fetch: Callable[[], Awaitable[Dict]],
+    encode: Callable[[Dict], bytes]
+) -> CachedBody:
+    """Encode a TMDB result once, keeping the bytes and ETag next to the upstream cache entry.
 
-@router.get("/search", response_model=MovieSearchResponse)
-async def search_movies(
-    query: str = Query(..., min_length=1),
+    CacheWarmer stores entries under the same keys and TTLs ahead of expiry.
+    """
+    key = make_cache_key(endpoint, params)
+    cached = cache.get(key) if cache is not None else None
+    if cached is None:
+        try:
+            result = await fetch()
+        except Exception as e:
+            raise to_http_exception(e)
+        cached = CachedBody.of(encode(result), last_modified=datetime.utcnow())
+        if cache is not None:
+            cache.set(key, cached, ttl)
+    return cached
+
+async def tmdb_page_response(
+    request: Request,
+    cache: Optional[LRUCache],
+    endpoint: str,
+    params: Dict,
+    ttl: float,
+    fetch: Callable[[], Awaitable[Dict]],
+    cache_control: str,
+    model=MovieSearchResponse
+) -> Response:
+    """Serve a TMDB list page as JSON, answering conditional requests from the cached ETag"""
+    cached = await cached_tmdb_body(cache, endpoint, params, ttl, fetch, lambda result: page_json(result, model))
+    return conditional_response(request, cached, cache_control)
+
+@router.get("/popular", response_model=MovieSearchResponse)
+async def get_popular_movies(
+    request: Request,
     page: int = Query(1, ge=1),
     language: str = Query("en-US", min_length=2, max_length=5),
-    client: TMDBClient = Depends(get_tmdb_client)
+    client: AsyncTMDBClient = Depends(get_tmdb_client),
+    cache: Optional[LRUCache] = Depends(get_response_cache)
 ):
-    """Search for movies"""
+    """Get popular movies"""
+    return await tmdb_page_response(
+        request, cache, 'movie/popular', {'page': page, 'language': language},
+        client.cache_ttls['popular'],
+        lambda: client.get_popular_movies(page, language),
+        get_settings().cache_control_popular
+    )
+
+def check_export_pages(pages: int) -> None:
+    max_pages = get_settings().export_max_pages
+    if pages > max_pages:
+        raise HTTPException(status_code=400, detail=f"At most {max_pages} pages per export")
+
+@router.get("/popular/export")
+async def export_popular_movies(
+    pages: int = Query(10, ge=1),
+    language: str = Query("en-US", min_length=2, max_length=5),
+    client: AsyncTMDBClient = Depends(get_tmdb_client)
+):
+    """Stream up to pages pages of popular movies as NDJSON, one movie per line"""
+    check_export_pages(pages)
     try:
-        result = client.search_movies(query, page, language)
-        return MovieSearchResponse(
-            page=result["page"],
-            total_pages=result["total_pages"],
-            total_results=result["total_results"],
-            movies=result["movies"]
-        )
+        first = await client.get_popular_movies(1, language)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise to_http_exception(e)
+    stream = prefetch_pages(
+        lambda page: client.get_popular_movies(page, language), first, pages, get_settings().export_prefetch_pages
+    )
+    return StreamingResponse(ndjson_movies(stream), media_type=NDJSON_MEDIA_TYPE)
+
+@router.post("/batch", response_model=MovieBatchResponse)
+async def get_movie_details_batch(
+    batch: MovieBatchRequest,
+    client: AsyncTMDBClient = Depends(get_tmdb_client)
+):
+    """Get detailed information about several movies in one request"""
+    settings = get_settings()
+    if len(batch.ids) > settings.movie_batch_max_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.movie_batch_max_size} movie IDs per batch"
+        )
+    return await client.get_movie_details_many(
+        batch.ids,
+        batch.language,
+        concurrency=settings.movie_batch_concurrency
+    )
+
+async def local_recommendations(
+    db: AsyncSession,
+    recommender: Optional[ContentRecommender],
+    movie_id: int,
+    language: str,
+    page: int,
+    page_size: int
+) -> Optional[Tuple[List[Dict], int]]:
+    """A page of catalog recommendations and their total, or None to ask TMDB.
+
+    Neighbors learned from users' saved movies are preferred over content
+    similarity; only the catalog language is served locally.
+    """
+    if language != get_settings().catalog_language:
+        return None
+    movie_ids, total_results = await collaborative.get_neighbors_page(db, movie_id, page, page_size)
+    if not total_results and recommender is not None and movie_id in recommender:
+        movie_ids, total_results = recommender.recommend_page(movie_id, page, page_size)
+    if not total_results:
+        return None
+    return await catalog.get_movie_summaries(db, movie_ids), total_results
 
 @router.get("/{movie_id}", response_model=MovieDetail)
 async def get_movie_details(
     movie_id: int,
+    request: Request,
+    background_tasks: BackgroundTasks,
     language: str = Query("en-US", min_length=2, max_length=5),
-    client: TMDBClient = Depends(get_tmdb_client)
+    client: AsyncTMDBClient = Depends(get_tmdb_client),
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[LRUCache] = Depends(get_response_cache)
 ):
-    """Get detailed information about a specific movie"""
-    try:
-        return client.get_movie_details(movie_id, language)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    """Get detailed information about a specific movie.
 
-@router.get("/popular", response_model=MovieSearchResponse)
-async def get_popular_movies(
-    page: int = Query(1, ge=1),
-    language: str = Query("en-US", min_length=2, max_length=5),
-    client: TMDBClient = Depends(get_tmdb_client)
-):
-    """Get popular movies"""
-    try:
-        result = client.get_popular_movies(page, language)
-        return MovieSearchResponse(
-            page=result["page"],
-            total_pages=result["total_pages"],
-            total_results=result["total_results"],
-            movies=result["movies"]
-        )
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    Catalog rows and TMDB responses carry the same content-hash ETag, which
+    is known before serializing on both paths.
+    """
+    settings = get_settings()
+    use_catalog = settings.catalog_enabled and language == settings.catalog_language
+
+    # Serve from the local catalog, refreshing stale rows after responding
+    if use_catalog:
+        movie = await catalog.get_movie(db, movie_id)
+        if movie is not None:
+            if catalog.is_stale(movie, timedelta(hours=settings.catalog_max_age_hours)):
+                background_tasks.add_task(catalog.refresh_movie, client, movie_id, language)
+            if movie.etag is not None:
+                headers = cache_headers(movie.etag, movie.fetched_at, settings.cache_control_details)
+                if is_not_modified(request, movie.etag, movie.fetched_at):
+                    return Response(status_code=304, headers=headers)
+                body = catalog.details_json(catalog.movie_to_details(movie))
+                return Response(body, media_type="application/json", headers=headers)
+            # Rows written before ETags were stored are hashed per response
+            cached = CachedBody.of(catalog.details_json(catalog.movie_to_details(movie)), movie.fetched_at)
+            return conditional_response(request, cached, settings.cache_control_details)
+
+    async def fetch() -> Dict:
+        details = await client.get_movie_details(movie_id, language)
+        # A failed catalog write only costs the next request a TMDB lookup
+        if use_catalog:
+            try:
+                await catalog.upsert_movie(db, details, language)
+            except SQLAlchemyError:
+                logger.exception("Failed to store movie %s in the catalog", movie_id)
+                await db.rollback()
+        return details
+
+    cached = await cached_tmdb_body(
+        cache, f"movie/{movie_id}", {'language': language},
+        client.cache_ttls['details'], fetch, catalog.details_json
+    )
+    return conditional_response(request, cached, settings.cache_control_details)
 
 @router.get("/{movie_id}/recommendations", response_model=MovieRecommendationResponse)
 async def get_movie_recommendations(
     movie_id: int,
+    request: Request,
     page: int = Query(1, ge=1),
     language: str = Query("en-US", min_length=2, max_length=5),
-    client: TMDBClient = Depends(get_tmdb_client)
+    client: AsyncTMDBClient = Depends(get_tmdb_client),
+    recommender: Optional[ContentRecommender] = Depends(get_recommender),
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[LRUCache] = Depends(get_response_cache)
 ):
     """Get movie recommendations based on a movie"""
+    cache_control = get_settings().cache_control_recommendations
+    local = await local_recommendations(db, recommender, movie_id, language, page, PAGE_SIZE)
+    if local is not None:
+        movies, total_results = local
+        body = model_json(MovieRecommendationResponse(**paginate(movies, page, total_results)))
+        return conditional_response(request, CachedBody.of(body), cache_control)
+
+    return await tmdb_page_response(
+        request, cache, f"movie/{movie_id}/recommendations", {'page': page, 'language': language},
+        client.cache_ttls['recommendations'],
+        lambda: client.get_movie_recommendations(movie_id, page, language),
+        cache_control,
+        model=MovieRecommendationResponse
+    )
+
+@router.get("/{movie_id}/recommendations/export")
+async def export_movie_recommendations(
+    movie_id: int,
+    pages: int = Query(5, ge=1),
+    language: str = Query("en-US", min_length=2, max_length=5),
+    client: AsyncTMDBClient = Depends(get_tmdb_client),
+    recommender: Optional[ContentRecommender] = Depends(get_recommender),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream up to pages pages of recommendations as NDJSON, one movie per line"""
+    check_export_pages(pages)
+    # Local lists are capped by the recommenders, so they are read in one query
+    local = await local_recommendations(db, recommender, movie_id, language, 1, pages * PAGE_SIZE)
+    if local is not None:
+        return StreamingResponse(ndjson_movies(fixed_pages([{'movies': local[0]}])), media_type=NDJSON_MEDIA_TYPE)
+
     try:
-        result = client.get_movie_recommendations(movie_id, page, language)
-        return MovieRecommendationResponse(
-            page=result["page"],
-            total_pages=result["total_pages"],
-            total_results=result["total_results"],
-            movies=result["movies"]
-        )
+        first = await client.get_movie_recommendations(movie_id, 1, language)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise to_http_exception(e)
+    stream = prefetch_pages(
+        lambda page: client.get_movie_recommendations(movie_id, page, language),
+        first, pages, get_settings().export_prefetch_pages
+    )
+    return StreamingResponse(ndjson_movies(stream), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1 @@
+"""Additional API route modules"""
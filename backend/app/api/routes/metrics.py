@@ -0,0 +1,68 @@
+from typing import Dict, Iterable, List, Tuple
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import PlainTextResponse
+
+from ...core.metrics import metrics
+from ...utils.auth import password_hasher, principal_cache
+from ...utils.cache import CacheStats
+from .recommendations import recommendation_cache
+
+router = APIRouter(tags=["metrics"])
+
+def cache_families(caches: Dict[str, CacheStats]) -> Iterable[Tuple[str, str, str, List]]:
+    """Hit and miss counters plus hit ratio for each named cache"""
+    yield 'cache_hits_total', 'Cache lookups that found a fresh entry', 'counter', [
+        ({'cache': name}, stats.hits) for name, stats in caches.items()
+    ]
+    yield 'cache_misses_total', 'Cache lookups that found nothing fresh', 'counter', [
+        ({'cache': name}, stats.misses) for name, stats in caches.items()
+    ]
+    yield 'cache_hit_ratio', 'Share of lookups served from the cache', 'gauge', [
+        ({'cache': name}, stats.hit_ratio) for name, stats in caches.items()
+    ]
+
+def register_collectors(app: FastAPI) -> None:
+    """Expose caches, the password hasher and the write queue of app at scrape time"""
+    def collect():
+        caches = {'principal': principal_cache.stats, 'user_recommendations': recommendation_cache.stats}
+        if app.state.response_cache is not None:
+            caches['movie_responses'] = app.state.response_cache.stats
+        tmdb_cache = getattr(app.state.tmdb_client, 'cache', None)
+        if tmdb_cache is not None:
+            caches['tmdb_memory'] = tmdb_cache.memory.stats
+            if tmdb_cache.shared is not None:
+                caches['tmdb_shared'] = tmdb_cache.shared.stats
+        yield from cache_families(caches)
+
+        yield 'password_hash_pending', 'Password hashes running or queued', 'gauge', [({}, password_hasher.pending)]
+        yield 'password_hash_queue_depth', 'Password hashes waiting for a worker', 'gauge', [({}, password_hasher.queue_depth)]
+        yield 'password_hash_rejected_total', 'Password hashes refused because the queue was full', 'counter', [
+            ({}, password_hasher.stats.rejected)
+        ]
+        yield 'password_hash_seconds_mean', 'Mean time to hash or verify a password', 'gauge', [
+            ({}, password_hasher.stats.as_dict()['mean_seconds'])
+        ]
+
+        writer = app.state.db_writer
+        yield 'db_write_batches_total', 'Transactions committed by the write queue', 'counter', [({}, writer.batches)]
+        yield 'db_writes_total', 'Writes applied through the write queue', 'counter', [({}, writer.writes)]
+
+        scheduler = getattr(app.state, 'scheduler', None)
+        if scheduler is not None:
+            jobs = scheduler.status()
+            yield 'scheduler_job_runs_total', 'Completed runs of each background job', 'counter', [
+                ({'job': job['name']}, job['runs']) for job in jobs
+            ]
+            yield 'scheduler_job_failures_total', 'Failed runs of each background job', 'counter', [
+                ({'job': job['name']}, job['failures']) for job in jobs
+            ]
+            yield 'scheduler_job_last_duration_seconds', 'Duration of the last run of each background job', 'gauge', [
+                ({'job': job['name']}, job['last_duration']) for job in jobs if job['last_duration'] is not None
+            ]
+
+    metrics.set_collector('app', collect)
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,95 @@
+import hashlib
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.config import get_settings
+from ...db.models import Movie
+from ...db.session import get_db
+from ...models.movie import MovieRecommendationResponse
+from ...models.user import UserInDB, UserPreferences
+from ...services import catalog
+from ...services.recommender import ContentRecommender, paginate, PAGE_SIZE
+from ...utils.auth import get_current_user
+from ...utils.cache import LRUCache
+from ...utils.responses import model_response
+from ..movies import get_recommender
+
+router = APIRouter(prefix="/users", tags=["recommendations"])
+settings = get_settings()
+
+# ((preferences fingerprint, embedding version), ranked movie IDs) per user
+# ID. The fingerprint catches preference changes made through other
+# workers, and the version drops rankings made before an embedding swap.
+recommendation_cache = LRUCache(settings.user_recommendations_cache_size)
+
+# Relative weight of each preference list in the user profile
+FAVORITE_WEIGHT = 1.0
+WATCHLIST_WEIGHT = 0.5
+
+def preferences_fingerprint(preferences: UserPreferences) -> str:
+    """Hash the preference fields that affect recommendations"""
+    fingerprint = json.dumps([
+        preferences.favorite_movies or [],
+        preferences.watchlist or [],
+        preferences.favorite_genres or [],
+        bool(preferences.adult_content)
+    ])
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+def invalidate_user_recommendations(user_id: int) -> None:
+    """Drop cached recommendations after a user's preferences change"""
+    recommendation_cache.delete(str(user_id))
+
+async def rank_for_user(
+    db: AsyncSession,
+    recommender: ContentRecommender,
+    preferences: UserPreferences,
+    limit: int
+) -> List[int]:
+    """Score the catalog against a user's profile and filter unsuitable titles"""
+    favorites = preferences.favorite_movies or []
+    watchlist = preferences.watchlist or []
+    movie_weights = {movie_id: WATCHLIST_WEIGHT for movie_id in watchlist}
+    movie_weights.update({movie_id: FAVORITE_WEIGHT for movie_id in favorites})
+
+    ranked = recommender.recommend_for_profile(
+        movie_weights,
+        preferences.favorite_genres or [],
+        exclude=frozenset(movie_weights),
+        k=limit
+    )
+    movie_ids = [movie_id for movie_id, _ in ranked]
+    if not preferences.adult_content and movie_ids:
+        adult = set(await db.scalars(
+            select(Movie.id).where(Movie.id.in_(movie_ids), Movie.adult.is_(True))
+        ))
+        movie_ids = [movie_id for movie_id in movie_ids if movie_id not in adult]
+    return movie_ids
+
+@router.get("/me/recommendations", response_model=MovieRecommendationResponse)
+async def get_my_recommendations(
+    page: int = Query(1, ge=1),
+    current_user: UserInDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    recommender: Optional[ContentRecommender] = Depends(get_recommender)
+):
+    """Get personalized recommendations from the user's favorites, watchlist and genres"""
+    preferences = current_user.preferences
+    if recommender is None:
+        return model_response(MovieRecommendationResponse(**paginate([], page, 0)))
+
+    key = str(current_user.id)
+    stamp = (preferences_fingerprint(preferences), recommender.version)
+    cached = recommendation_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        movie_ids = cached[1]
+    else:
+        movie_ids = await rank_for_user(db, recommender, preferences, settings.recommender_max_results)
+        recommendation_cache.set(key, (stamp, movie_ids), settings.user_recommendations_cache_ttl)
+
+    page_ids = movie_ids[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+    movies = await catalog.get_movie_summaries(db, page_ids)
+    return model_response(MovieRecommendationResponse(**paginate(movies, page, len(movie_ids))))
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends, Request
+
+from ...models.user import UserInDB
+from ...utils.auth import get_current_user
+
+router = APIRouter(prefix="/scheduler", tags=["scheduler"])
+
+@router.get("/status")
+async def get_scheduler_status(request: Request, current_user: UserInDB = Depends(get_current_user)):
+    """Background jobs with their last run, duration, error and next run"""
+    scheduler = getattr(request.app.state, 'scheduler', None)
+    return {'jobs': scheduler.status() if scheduler is not None else []}
@@ -0,0 +1,71 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.config import get_settings
+from ...db.session import get_db
+from ...models.movie import MovieSearchResponse, MovieSuggestion, MovieSuggestResponse
+from ...services import catalog
+from ...services.recommender import PAGE_SIZE, paginate
+from ...services.search import SearchIndex
+from ...services.suggest import MAX_SUGGESTIONS, SuggestIndex
+from ...utils.cache import LRUCache
+from ...utils.responses import CachedBody, conditional_response, model_json, model_response
+from ...utils.tmdb_client import AsyncTMDBClient
+from ..movies import get_response_cache, get_tmdb_client, tmdb_page_response
+
+router = APIRouter(prefix="/movies", tags=["search"])
+
+def get_search_index(request: Request) -> Optional[SearchIndex]:
+    """Dependency to get the current catalog search index, if one was built"""
+    loader = getattr(request.app.state, 'search_index_loader', None)
+    return loader.index if loader is not None else None
+
+def get_suggest_index(request: Request) -> Optional[SuggestIndex]:
+    """Dependency to get the current title suggestion index, if one was built"""
+    loader = getattr(request.app.state, 'search_index_loader', None)
+    return loader.suggest_index if loader is not None else None
+
+@router.get("/suggest", response_model=MovieSuggestResponse)
+async def suggest_movies(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    index: Optional[SuggestIndex] = Depends(get_suggest_index)
+):
+    """Suggest catalog titles as the user types, most popular first"""
+    suggestions = index.suggest(q, limit) if index is not None else []
+    return model_response(MovieSuggestResponse(query=q, suggestions=[
+        MovieSuggestion(id=movie_id, title=title, release_date=release_date)
+        for movie_id, title, release_date in suggestions
+    ]))
+
+@router.get("/search", response_model=MovieSearchResponse)
+async def search_movies(
+    request: Request,
+    query: str = Query(..., min_length=1),
+    page: int = Query(1, ge=1),
+    language: str = Query("en-US", min_length=2, max_length=5),
+    original_language: Optional[str] = Query(None, min_length=2, max_length=2),
+    client: AsyncTMDBClient = Depends(get_tmdb_client),
+    cache: Optional[LRUCache] = Depends(get_response_cache),
+    index: Optional[SearchIndex] = Depends(get_search_index),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search for movies in the local catalog, asking TMDB only when nothing matches.
+
+    original_language narrows local results; TMDB results are not filtered.
+    """
+    settings = get_settings()
+    if index is not None and language == settings.catalog_language:
+        movie_ids, total_results = index.search_page(query, page, PAGE_SIZE, original_language)
+        if total_results:
+            movies = await catalog.get_movie_summaries(db, movie_ids)
+            body = model_json(MovieSearchResponse(**paginate(movies, page, total_results)))
+            return conditional_response(request, CachedBody.of(body), settings.cache_control_search)
+
+    return await tmdb_page_response(
+        request, cache, 'search/movie', {'query': query, 'page': page, 'language': language},
+        client.cache_ttls['search'],
+        lambda: client.search_movies(query, page, language),
+        settings.cache_control_search
+    )
@@ -1,35 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from typing import List
 
-from ..models.user import User, UserCreate, UserPreferences, Token
+from ..models.user import User, UserCreate, UserInDB, UserPreferences, Token
 from ..utils.auth import (
-    get_password_hash,
-    verify_password,
     create_access_token,
-    get_current_user
+    get_current_user,
+    invalidate_principal,
+    password_hasher
 )
+from ..utils.hashing import PasswordHasherBusy
 from ..core.config import get_settings
 from ..db.session import get_db
-from ..db.models import User as UserModel, UserPreferences as UserPreferencesModel
+from ..db.writer import WriteQueue
+from ..db.models import (
+    FavoriteMovie,
+    User as UserModel,
+    UserPreferences as UserPreferencesModel,
+    WatchlistItem
+)
+from ..services.saved_movies import add_saved_movie, remove_saved_movie, replace_saved_movies
+from .routes.recommendations import invalidate_user_recommendations
 
 router = APIRouter(prefix="/users", tags=["users"])
 settings = get_settings()
 
+def get_db_writer(request: Request) -> WriteQueue:
+    """Get the shared queue that batches small writes"""
+    return request.app.state.db_writer
+
+def hasher_busy(error: PasswordHasherBusy) -> HTTPException:
+    """Shed login and registration load while the hashing pool is saturated"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": "1"}
+    )
+
 @router.post("/register", response_model=User)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
     # Check if user already exists
-    db_user = db.query(UserModel).filter(UserModel.email == user.email).first()
+    db_user = await db.scalar(select(UserModel).where(UserModel.email == user.email))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    db_user = db.query(UserModel).filter(UserModel.username == user.username).first()
+    db_user = await db.scalar(select(UserModel).where(UserModel.username == user.username))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -37,32 +59,38 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusy as e:
+        raise hasher_busy(e)
     db_user = UserModel(
         email=user.email,
         username=user.username,
         hashed_password=hashed_password
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
     
     # Create user preferences
-    db_preferences = UserPreferencesModel(user_id=db_user.id)
-    db.add(db_preferences)
-    db.commit()
+    db_user.preferences = UserPreferencesModel()
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user, ["created_at"])
+    await db.refresh(db_user.preferences)
     
     return db_user
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login and get access token"""
     # Get user from database
-    user = db.query(UserModel).filter(UserModel.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await db.scalar(select(UserModel).where(UserModel.username == form_data.username))
+    try:
+        verified = user is not None and await password_hasher.verify(form_data.password, user.hashed_password)
+    except PasswordHasherBusy as e:
+        raise hasher_busy(e)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -77,77 +105,79 @@ async def login_for_access_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=User)
-async def read_users_me(current_user: UserModel = Depends(get_current_user)):
+async def read_users_me(current_user: UserInDB = Depends(get_current_user)):
     """Get current user information"""
     return current_user
 
 @router.get("/me/preferences", response_model=UserPreferences)
-async def get_user_preferences(
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+async def get_user_preferences(current_user: UserInDB = Depends(get_current_user)):
     """Get user preferences"""
-    preferences = db.query(UserPreferencesModel).filter(
-        UserPreferencesModel.user_id == current_user.id
-    ).first()
-    return preferences
+    return current_user.preferences
 
 @router.put("/me/preferences", response_model=UserPreferences)
 async def update_user_preferences(
     preferences: UserPreferences,
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserInDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    writer: WriteQueue = Depends(get_db_writer)
 ):
     """Update user preferences"""
-    db_preferences = db.query(UserPreferencesModel).filter(
-        UserPreferencesModel.user_id == current_user.id
-    ).first()
-    
-    for key, value in preferences.dict(exclude_unset=True).items():
-        setattr(db_preferences, key, value)
-    
-    db.commit()
-    db.refresh(db_preferences)
-    return db_preferences
+    updates = preferences.dict(exclude_unset=True)
+    saved_movies = {
+        model: updates.pop(key)
+        for key, model in (("favorite_movies", FavoriteMovie), ("watchlist", WatchlistItem))
+        if key in updates
+    }
+
+    async def write(session: AsyncSession) -> None:
+        for model, movie_ids in saved_movies.items():
+            await replace_saved_movies(session, model, current_user.id, movie_ids)
+        if updates:
+            await session.execute(
+                update(UserPreferencesModel)
+                .where(UserPreferencesModel.user_id == current_user.id)
+                .values(**updates)
+            )
+
+    await writer.submit(write)
+    invalidate_principal(current_user.username)
+    invalidate_user_recommendations(current_user.id)
+    return await db.scalar(
+        select(UserPreferencesModel)
+        .where(UserPreferencesModel.user_id == current_user.id)
+        .execution_options(populate_existing=True)
+    )
 
 @router.post("/me/watchlist/{movie_id}")
 async def add_to_watchlist(
     movie_id: int,
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserInDB = Depends(get_current_user),
+    writer: WriteQueue = Depends(get_db_writer)
 ):
     """Add a movie to user's watchlist"""
-    preferences = db.query(UserPreferencesModel).filter(
-        UserPreferencesModel.user_id == current_user.id
-    ).first()
-    
-    if movie_id in preferences.watchlist:
+    if not await writer.submit(lambda db: add_saved_movie(db, WatchlistItem, current_user.id, movie_id)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Movie already in watchlist"
         )
     
-    preferences.watchlist.append(movie_id)
-    db.commit()
+    invalidate_principal(current_user.username)
+    invalidate_user_recommendations(current_user.id)
     return {"message": "Movie added to watchlist"}
 
 @router.delete("/me/watchlist/{movie_id}")
 async def remove_from_watchlist(
     movie_id: int,
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserInDB = Depends(get_current_user),
+    writer: WriteQueue = Depends(get_db_writer)
 ):
     """Remove a movie from user's watchlist"""
-    preferences = db.query(UserPreferencesModel).filter(
-        UserPreferencesModel.user_id == current_user.id
-    ).first()
-    
-    if movie_id not in preferences.watchlist:
+    if not await writer.submit(lambda db: remove_saved_movie(db, WatchlistItem, current_user.id, movie_id)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Movie not in watchlist"
         )
     
-    preferences.watchlist.remove(movie_id)
-    db.commit()
+    invalidate_principal(current_user.username)
+    invalidate_user_recommendations(current_user.id)
     return {"message": "Movie removed from watchlist"} 
\ No newline at end of file
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import List, Optional
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -8,13 +9,110 @@ class Settings(BaseSettings):
     tmdb_api_base_url: str = "https://api.themoviedb.org/3/"
     tmdb_image_base_url: str = "https://image.tmdb.org/t/p"
     
+    # TMDB HTTP connection pool settings
+    tmdb_max_connections: int = 100
+    tmdb_max_keepalive_connections: int = 20
+    tmdb_keepalive_expiry: float = 30.0
+    tmdb_timeout: float = 10.0
+    tmdb_connect_timeout: float = 5.0
+    
+    # TMDB response cache settings (TTLs in seconds)
+    cache_enabled: bool = True
+    cache_max_entries: int = 4096
+    cache_sqlite_path: Optional[str] = None  # Shared second tier, e.g. "./tmdb_cache.db"
+    cache_sqlite_timeout: float = 0.5  # Seconds to wait for another worker's write before skipping the tier
+    cache_ttl_details: int = 6 * 60 * 60
+    cache_ttl_recommendations: int = 60 * 60
+    cache_ttl_search: int = 15 * 60
+    cache_ttl_popular: int = 10 * 60
+    cache_max_stale: int = 24 * 60 * 60  # How long expired entries may be served while TMDB is down
+    response_cache_max_entries: int = 1024  # Serialized TMDB pages and details, 0 to disable
+    
+    # HTTP caching headers for browsers and the CDN, empty to send no Cache-Control
+    cache_control_details: str = "public, max-age=3600, stale-while-revalidate=86400"
+    cache_control_popular: str = "public, max-age=300, stale-while-revalidate=600"
+    cache_control_recommendations: str = "public, max-age=900, stale-while-revalidate=3600"
+    cache_control_search: str = "public, max-age=300, stale-while-revalidate=600"
+    
+    # TMDB rate limiting, retry and circuit breaker settings
+    tmdb_rate_limit: float = 40.0  # Requests per second per worker, 0 to disable
+    tmdb_rate_burst: int = 40
+    tmdb_max_retries: int = 2
+    tmdb_backoff_base: float = 0.25
+    tmdb_backoff_max: float = 5.0
+    tmdb_breaker_threshold: int = 5
+    tmdb_breaker_reset: float = 30.0
+    
+    # Batch movie details settings
+    movie_batch_max_size: int = 100
+    movie_batch_concurrency: int = 10
+    
+    # Streaming export settings
+    export_max_pages: int = 100
+    export_prefetch_pages: int = 2  # Upstream pages fetched ahead of the client
+    
+    # Local movie catalog settings
+    catalog_enabled: bool = True
+    catalog_language: str = "en-US"  # Only details in this language are stored locally
+    catalog_max_age_hours: int = 24
+    
+    # Content-based recommender settings
+    recommender_enabled: bool = True
+    recommender_max_results: int = 100
+    recommender_ann_min_items: int = 20000  # Use the ANN index from this catalog size on
+    recommender_ann_nlist: Optional[int] = None  # Defaults to 4 * sqrt(catalog size)
+    recommender_ann_nprobe: int = 16  # Higher is better recall, slower queries
+    embedding_store_path: Optional[str] = None  # Memory-mapped embeddings shared by all workers
+    embedding_dtype: str = "float32"  # "float16" halves memory at some scoring speed
+    embedding_reload_interval: float = 5.0  # Seconds between background checks for a newly published version, 0 to never reload
+    user_recommendations_cache_size: int = 10000
+    user_recommendations_cache_ttl: int = 15 * 60
+    
+    # Background job settings
+    scheduler_max_concurrency: int = 2  # Jobs allowed to run at the same time
+    cache_warmer_enabled: bool = True
+    cache_warm_interval: float = 5 * 60
+    cache_warm_jitter: float = 30.0
+    cache_warm_languages: List[str] = ["en-US"]  # JSON list in the environment
+    cache_warm_popular_pages: int = 5
+    cache_warm_top_movies: int = 100
+    cache_warm_concurrency: int = 4
+    
+    # Local search settings
+    search_index_enabled: bool = True
+    search_index_refresh_interval: float = 10 * 60  # Seconds between catalog change checks, 0 to build once
+    
+    # Observability settings
+    metrics_enabled: bool = True  # Request, upstream and DB timing plus the /metrics endpoint
+    event_loop_lag_interval: float = 0.5  # Seconds between event loop lag probes
+    log_level: str = "INFO"
+    log_json: bool = True
+    
     # Authentication settings
     secret_key: str = "your-secret-key-here"  # Change this in production!
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    auth_principal_cache_size: int = 10000
+    auth_principal_cache_ttl: int = 60  # Seconds other workers may serve a stale user or preferences
+    password_hash_workers: int = 4
+    password_hash_queue_size: int = 64  # Pending hashes beyond the workers before logins get 503
+    password_hash_processes: bool = False  # Hash in worker processes instead of threads
     
-    # Database settings (to be implemented)
+    # Database settings
     database_url: str = "sqlite:///./movie_recommender.db"
+    async_database_url: Optional[str] = None  # Defaults to database_url with an async driver
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_recycle: int = 30 * 60  # Seconds before a pooled connection is replaced
+    db_pool_pre_ping: bool = True
+    
+    # SQLite tuning, applied to every connection when database_url is SQLite
+    sqlite_tuning: bool = True  # WAL journal plus the pragmas below
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout: int = 5000  # Milliseconds to wait for a lock before "database is locked"
+    sqlite_cache_size: int = -64000  # Negative values are KiB, so about 64 MiB per connection
+    sqlite_write_batch_size: int = 100  # Writes per transaction in the single-writer queue, 0 to disable
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,289 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from .logger import request_id_var
+
+logger = logging.getLogger("app.access")
+
+# Latency buckets in seconds, from cache hits to slow upstream calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{' + pairs + '}'
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metric:
+    """Base class for a named metric with a fixed set of label names"""
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, values: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+    type = 'counter'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, self._labels(labels), value
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+    type = 'gauge'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, self._labels(labels), value
+
+class Histogram(Metric):
+    """Cumulative bucketed distribution with sum and count"""
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return sum(state[0]) if state else 0
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        for labels, counts, total in items:
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield self.name + '_bucket', {**base, 'le': _format_value(bound)}, cumulative
+            yield self.name + '_sum', base, total
+            yield self.name + '_count', base, cumulative
+
+# A collector returns (name, help, type, samples) tuples computed at scrape time
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text format"""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: Dict[str, Collector] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def set_collector(self, name: str, collector: Collector) -> None:
+        """Add or replace a named scrape-time collector"""
+        self._collectors[name] = collector
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(
+                f"{name}{_format_labels(labels)} {_format_value(value)}"
+                for name, labels, value in metric.samples()
+            )
+        for name, collector in list(self._collectors.items()):
+            try:
+                families = list(collector())
+            except Exception:
+                logger.exception("Metrics collector %s failed", name)
+                continue
+            for family, help, type, samples in families:
+                lines.append(f"# HELP {family} {help}")
+                lines.append(f"# TYPE {family} {type}")
+                lines.extend(f"{family}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route', ('method', 'route', 'status')
+)
+TMDB_REQUEST_SECONDS = metrics.histogram(
+    'tmdb_request_duration_seconds', 'TMDB upstream call latency by endpoint', ('endpoint', 'status')
+)
+DB_QUERY_SECONDS = metrics.histogram('db_query_duration_seconds', 'Database statement latency')
+DB_QUERIES_PER_REQUEST = metrics.histogram(
+    'db_queries_per_request', 'Database statements issued per request', ('route',),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50)
+)
+EVENT_LOOP_LAG_SECONDS = metrics.histogram(
+    'event_loop_lag_seconds', 'Delay between a scheduled wake-up and the loop running it',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+class RequestStats:
+    """Work done on behalf of the current request"""
+    __slots__ = ('db_queries', 'db_seconds', 'upstream_calls', 'upstream_seconds')
+
+    def __init__(self) -> None:
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.upstream_calls = 0
+        self.upstream_seconds = 0.0
+
+request_stats_var: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar('request_stats', default=None)
+
+def record_db_query(seconds: float) -> None:
+    DB_QUERY_SECONDS.observe(seconds)
+    stats = request_stats_var.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += seconds
+
+def record_upstream_call(endpoint: str, status: str, seconds: float) -> None:
+    TMDB_REQUEST_SECONDS.observe(seconds, endpoint, status)
+    stats = request_stats_var.get()
+    if stats is not None:
+        stats.upstream_calls += 1
+        stats.upstream_seconds += seconds
+
+def instrument_engine(engine) -> None:
+    """Time every statement run on a sync engine (or an async engine's sync_engine)"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        record_db_query(time.perf_counter() - conn.info['query_start'].pop())
+
+async def monitor_event_loop(interval: float = 0.5) -> None:
+    """Record how late the loop wakes up from a fixed sleep; long CPU work shows up as lag"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(time.perf_counter() - start - interval, 0.0))
+
+class RequestMetricsMiddleware:
+    """Assign request IDs, time requests by route and log one line per request"""
+
+    def __init__(self, app, header: str = "x-request-id") -> None:
+        self.app = app
+        self.header = header.encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = next(
+            (value.decode('latin-1') for name, value in scope["headers"] if name == self.header),
+            None
+        ) or uuid.uuid4().hex
+        stats = RequestStats()
+        id_token = request_id_var.set(request_id)
+        stats_token = request_stats_var.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(self.header, request_id.encode('latin-1'))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration = time.perf_counter() - start
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_SECONDS.observe(duration, scope["method"], route_path, str(status))
+            DB_QUERIES_PER_REQUEST.observe(stats.db_queries, route_path)
+            logger.info(
+                "%s %s %s", scope["method"], scope["path"], status,
+                extra={
+                    'method': scope["method"],
+                    'route': route_path,
+                    'status': status,
+                    'duration_ms': round(duration * 1000, 2),
+                    'db_queries': stats.db_queries,
+                    'db_ms': round(stats.db_seconds * 1000, 2),
+                    'upstream_calls': stats.upstream_calls,
+                    'upstream_ms': round(stats.upstream_seconds * 1000, 2)
+                }
+            )
+            request_stats_var.reset(stats_token)
+            request_id_var.reset(id_token)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Table, JSON
+from sqlalchemy import Boolean, Column, Integer, BigInteger, Float, String, Text, DateTime, ForeignKey, Table, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..db.base_class import Base
@@ -22,9 +22,104 @@ class UserPreferences(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True)
     favorite_genres = Column(JSON, default=list)
-    favorite_movies = Column(JSON, default=list)
-    watchlist = Column(JSON, default=list)
     language_preference = Column(String, default="en-US")
     adult_content = Column(Boolean, default=False)
 
-    user = relationship("User", back_populates="preferences") 
\ No newline at end of file
+    user = relationship("User", back_populates="preferences")
+    favorite_items = relationship(
+        "FavoriteMovie",
+        primaryjoin="UserPreferences.user_id == foreign(FavoriteMovie.user_id)",
+        order_by="(FavoriteMovie.position, FavoriteMovie.movie_id)",
+        viewonly=True,
+        lazy="selectin"
+    )
+    watchlist_items = relationship(
+        "WatchlistItem",
+        primaryjoin="UserPreferences.user_id == foreign(WatchlistItem.user_id)",
+        order_by="(WatchlistItem.position, WatchlistItem.movie_id)",
+        viewonly=True,
+        lazy="selectin"
+    )
+
+    @property
+    def favorite_movies(self):
+        return [item.movie_id for item in self.favorite_items]
+
+    @property
+    def watchlist(self):
+        return [item.movie_id for item in self.watchlist_items]
+
+class FavoriteMovie(Base):
+    """A movie in a user's favorites"""
+    __tablename__ = "favorite_movies"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    movie_id = Column(Integer, primary_key=True, index=True)
+    position = Column(Integer, nullable=False, default=0)  # Order within the user's list
+    added_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class WatchlistItem(Base):
+    """A movie on a user's watchlist"""
+    __tablename__ = "watchlist_items"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    movie_id = Column(Integer, primary_key=True, index=True)
+    position = Column(Integer, nullable=False, default=0)  # Order within the user's list
+    added_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+movie_genres = Table(
+    "movie_genres",
+    Base.metadata,
+    Column("movie_id", Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True),
+    Column("genre_id", Integer, ForeignKey("genres.id"), primary_key=True, index=True),
+    Column("position", Integer, nullable=False, default=0)  # Order within TMDB's genre list
+)
+
+class Genre(Base):
+    __tablename__ = "genres"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+
+class Movie(Base):
+    """Local copy of TMDB movie details, keyed by TMDB movie ID"""
+    __tablename__ = "movies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, nullable=False)
+    original_title = Column(String)
+    overview = Column(Text)
+    tagline = Column(String)
+    poster_url = Column(String)
+    backdrop_url = Column(String)
+    release_date = Column(String)
+    rating = Column(Float)
+    popularity = Column(Float, index=True)
+    runtime = Column(Integer)
+    budget = Column(BigInteger)
+    revenue = Column(BigInteger)
+    status = Column(String)
+    original_language = Column(String, index=True)
+    adult = Column(Boolean, default=False)
+    production_companies = Column(JSON, default=list)
+    language = Column(String, nullable=False)
+    fetched_at = Column(DateTime, nullable=False, index=True)
+    etag = Column(String)  # ETag of the detail response, set on every write
+
+    genres = relationship(
+        "Genre",
+        secondary=movie_genres,
+        order_by=(movie_genres.c.position, movie_genres.c.genre_id),
+        lazy="selectin"
+    )
+
+class MovieNeighbor(Base):
+    """Precomputed collaborative-filtering neighbors of a movie"""
+    __tablename__ = "movie_neighbors"
+
+    movie_id = Column(Integer, primary_key=True)
+    neighbor_id = Column(Integer, primary_key=True)
+    rank = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)
+
+    __table_args__ = (Index("ix_movie_neighbors_movie_id_rank", "movie_id", "rank"),)
@@ -1,19 +1,90 @@
-from sqlalchemy import create_engine
+from typing import AsyncIterator, Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from ..core.config import get_settings
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from ..core.config import Settings, get_settings
+from ..core.metrics import instrument_engine
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+# Async drivers used when no explicit async URL is configured
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg'
+}
+
+def async_database_url(settings: Settings) -> str:
+    """Return the URL for the async engine, switching database_url to an async driver"""
+    if settings.async_database_url:
+        return settings.async_database_url
+    url = make_url(settings.database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(hide_password=False)
+
+def is_sqlite(url: str) -> bool:
+    """Check whether url points at a SQLite database"""
+    return make_url(url).get_backend_name() == 'sqlite'
+
+def engine_options(url: str, settings: Settings) -> Dict:
+    """Pool and driver options for an engine bound to url"""
+    if not is_sqlite(url):
+        return {
+            'pool_size': settings.db_pool_size,
+            'max_overflow': settings.db_max_overflow,
+            'pool_recycle': settings.db_pool_recycle,
+            'pool_pre_ping': settings.db_pool_pre_ping
+        }
+    options = {'connect_args': {'check_same_thread': False}}
+    # aiosqlite defaults to NullPool; keep file connections open so their page cache stays warm
+    if make_url(url).get_dialect().is_async and make_url(url).database not in (None, '', ':memory:'):
+        options['poolclass'] = AsyncAdaptedQueuePool
+    return options
+
+def sqlite_pragmas(settings: Settings) -> Dict[str, object]:
+    """PRAGMA values for SQLite production mode.
+
+    WAL lets readers run alongside the single writer, NORMAL sync is safe
+    with WAL, and the busy timeout makes competing writers wait instead of
+    failing with "database is locked".
+    """
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': settings.sqlite_synchronous,
+        'busy_timeout': settings.sqlite_busy_timeout,
+        'mmap_size': settings.sqlite_mmap_size,
+        'cache_size': settings.sqlite_cache_size
+    }
+
+def configure_sqlite(engine: Engine, pragmas: Dict[str, object]) -> None:
+    """Apply PRAGMAs to every new connection of engine"""
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+# Synchronous engine for CLIs, migrations and startup jobs run in threads
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, settings))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
-    """Dependency for getting DB session"""
-    db = SessionLocal()
-    try:
+# Async engine used by request handlers so DB calls never block the event loop
+async_engine = create_async_engine(
+    async_database_url(settings),
+    **engine_options(async_database_url(settings), settings)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if settings.sqlite_tuning and is_sqlite(settings.database_url):
+    configure_sqlite(engine, sqlite_pragmas(settings))
+    configure_sqlite(async_engine.sync_engine, sqlite_pragmas(settings))
+
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Dependency for getting an async DB session"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close() 
\ No newline at end of file
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+WriteFn = Callable[[AsyncSession], Awaitable[Any]]
+
+class WriteQueue:
+    """Funnel small writes through one task that commits them in batches.
+
+    SQLite allows a single writer at a time, so concurrent requests that
+    each open a write transaction mostly wait on the lock. Queued writes
+    are instead applied back to back on one session and committed
+    together. A write that raises is retried in its own transaction so
+    it cannot take the rest of its batch down with it.
+
+    Until start() is called, or when max_batch is 0, submit() simply
+    runs the write in its own transaction.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, max_batch: int = 100) -> None:
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.batches = 0
+        self.writes = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        """Start the writer task on the running event loop"""
+        if self.max_batch > 0 and not self.running:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Finish queued writes and stop the writer task"""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def submit(self, fn: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """Run fn(session) in a write transaction and return its result"""
+        if not self.running:
+            return await self._run_alone(fn)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((fn, future))
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._run_batch(batch)
+            except Exception as e:  # Never let the writer task die
+                logger.exception("Write batch failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _run_batch(self, batch: List[Tuple[WriteFn, asyncio.Future]]) -> None:
+        results = []
+        try:
+            async with self.session_factory() as db:
+                for fn, _ in batch:
+                    results.append(await fn(db))
+                await db.commit()
+        except Exception:
+            if len(batch) == 1:
+                raise
+            # Replay one by one so only the failing writes report errors
+            for fn, future in batch:
+                await self._settle(future, fn)
+            return
+
+        self.batches += 1
+        self.writes += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _settle(self, future: asyncio.Future, fn: WriteFn) -> None:
+        try:
+            result = await self._run_alone(fn)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    async def _run_alone(self, fn: WriteFn) -> Any:
+        async with self.session_factory() as db:
+            result = await fn(db)
+            await db.commit()
+        self.batches += 1
+        self.writes += 1
+        return result
@@ -1,11 +1,110 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from .api import movies, users
+from .api.routes import metrics, recommendations, scheduler, search
+from .core.config import get_settings
+from .core.logger import configure_logging
+from .core.metrics import RequestMetricsMiddleware, monitor_event_loop
+from .db.session import AsyncSessionLocal, SessionLocal, async_engine, is_sqlite
+from .db.writer import WriteQueue
+from .services.embeddings import EmbeddingStore
+from .services.recommender import RecommenderLoader, load_content_recommender
+from .services.scheduler import Scheduler
+from .services.search import SearchIndexLoader
+from .services.tmbd_services import create_tmdb_client, close_tmdb_client
+from .services.warmer import CacheWarmer
+from .utils.auth import password_hasher
+from .utils.cache import LRUCache
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown"""
+    settings = get_settings()
+    configure_logging(settings.log_level, settings.log_json)
+    app.state.tmdb_client = create_tmdb_client(settings)
+    app.state.response_cache = (
+        LRUCache(settings.response_cache_max_entries)
+        if settings.cache_enabled and settings.response_cache_max_entries > 0 else None
+    )
+    app.state.recommender_loader = RecommenderLoader()
+    # Batch small writes through one writer when SQLite only allows one at a time
+    app.state.db_writer = WriteQueue(
+        AsyncSessionLocal,
+        max_batch=settings.sqlite_write_batch_size if is_sqlite(settings.database_url) else 0
+    )
+    await app.state.db_writer.start()
+    if settings.recommender_enabled:
+        store = EmbeddingStore(settings.embedding_store_path) if settings.embedding_store_path else None
+        app.state.recommender_loader = await asyncio.to_thread(
+            load_content_recommender,
+            SessionLocal,
+            store=store,
+            dtype=settings.embedding_dtype,
+            max_results=settings.recommender_max_results,
+            ann_min_items=settings.recommender_ann_min_items,
+            ann_nlist=settings.recommender_ann_nlist,
+            ann_nprobe=settings.recommender_ann_nprobe
+        )
+    app.state.search_index_loader = SearchIndexLoader(SessionLocal)
+    if settings.search_index_enabled:
+        await asyncio.to_thread(app.state.search_index_loader.refresh)
+
+    app.state.scheduler = Scheduler(settings.scheduler_max_concurrency)
+    if app.state.recommender_loader.store is not None and settings.embedding_reload_interval > 0:
+        app.state.scheduler.add_job(
+            'embeddings',
+            lambda: asyncio.to_thread(app.state.recommender_loader.reload),
+            settings.embedding_reload_interval,
+            run_at_start=False
+        )
+    if settings.search_index_enabled and settings.search_index_refresh_interval > 0:
+        app.state.scheduler.add_job(
+            'search_index',
+            lambda: asyncio.to_thread(app.state.search_index_loader.refresh),
+            settings.search_index_refresh_interval,
+            run_at_start=False
+        )
+    if settings.cache_warmer_enabled:
+        warmer = CacheWarmer(
+            app.state.tmdb_client,
+            languages=settings.cache_warm_languages,
+            popular_pages=settings.cache_warm_popular_pages,
+            top_movies=settings.cache_warm_top_movies,
+            min_ttl=settings.cache_warm_interval + settings.cache_warm_jitter,
+            concurrency=settings.cache_warm_concurrency,
+            catalog_language=settings.catalog_language,
+            catalog_enabled=settings.catalog_enabled,
+            catalog_max_age=timedelta(hours=settings.catalog_max_age_hours),
+            get_recommender=app.state.recommender_loader.get,
+            response_cache=app.state.response_cache
+        )
+        app.state.scheduler.add_job('cache_warmer', warmer.run, settings.cache_warm_interval, settings.cache_warm_jitter)
+    await app.state.scheduler.start()
+    loop_monitor = None
+    if settings.metrics_enabled:
+        metrics.register_collectors(app)
+        loop_monitor = asyncio.create_task(monitor_event_loop(settings.event_loop_lag_interval))
+    try:
+        yield
+    finally:
+        if loop_monitor is not None:
+            loop_monitor.cancel()
+        await app.state.scheduler.close()
+        await app.state.db_writer.close()
+        await close_tmdb_client(app.state.tmdb_client)
+        await async_engine.dispose()
+        password_hasher.shutdown()
 
 app = FastAPI(
     title="Movie Recommender API",
     description="API for movie recommendations and information",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -17,9 +116,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if get_settings().metrics_enabled:
+    app.add_middleware(RequestMetricsMiddleware)
+
 # Include routers
+app.include_router(search.router)  # Before movies, whose /{movie_id} route would shadow /search
 app.include_router(movies.router)
 app.include_router(users.router)
+app.include_router(recommendations.router)
+app.include_router(scheduler.router)
+if get_settings().metrics_enabled:
+    app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
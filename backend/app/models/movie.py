@@ -1,5 +1,5 @@
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class Genre(BaseModel):
     id: int
@@ -10,6 +10,9 @@ class ProductionCompany(BaseModel):
     name: str
 
 class MovieBase(BaseModel):
+    # Formatted TMDB data and catalog rows use "rating"; responses keep "vote_average"
+    model_config = ConfigDict(populate_by_name=True)
+
     id: int
     title: str
     overview: Optional[str] = None
@@ -39,4 +42,25 @@ class MovieRecommendationResponse(BaseModel):
     page: int
     total_pages: int
     total_results: int
-    movies: List[MovieBase] 
\ No newline at end of file
+    movies: List[MovieBase] 
+
+class MovieSuggestion(BaseModel):
+    id: int
+    title: str
+    release_date: Optional[str] = None
+
+class MovieSuggestResponse(BaseModel):
+    query: str
+    suggestions: List[MovieSuggestion]
+
+class MovieBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+    language: str = Field("en-US", min_length=2, max_length=5)
+
+class MovieBatchError(BaseModel):
+    id: int
+    detail: str
+
+class MovieBatchResponse(BaseModel):
+    movies: List[MovieDetail]
+    errors: List[MovieBatchError] = Field(default_factory=list)
@@ -21,7 +21,7 @@ class UserInDB(UserBase):
     hashed_password: str
     preferences: UserPreferences = Field(default_factory=UserPreferences)
     created_at: datetime
-    updated_at: datetime
+    updated_at: Optional[datetime] = None
     is_active: bool = True
 
 class User(UserBase):
@@ -0,0 +1,143 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Union
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
+from ..db.models import Genre, Movie, movie_genres
+from ..db.session import AsyncSessionLocal
+from ..models.movie import MovieDetail
+from ..utils.error_handlers import TMDBError
+from ..utils.responses import make_etag, model_json
+from ..utils.tmdb_client import AsyncTMDBClient
+
+logger = logging.getLogger(__name__)
+
+# Columns copied verbatim between formatted movie details and Movie rows
+MOVIE_FIELDS = (
+    'title', 'original_title', 'overview', 'tagline', 'poster_url', 'backdrop_url',
+    'release_date', 'rating', 'popularity', 'runtime', 'budget', 'revenue', 'status',
+    'original_language', 'adult', 'production_companies'
+)
+
+async def get_movie(db: AsyncSession, movie_id: int) -> Optional[Movie]:
+    """Get a movie from the local catalog"""
+    return await db.get(Movie, movie_id)
+
+def is_stale(movie: Movie, max_age: timedelta) -> bool:
+    """Check whether a catalog row is due for a refresh from TMDB"""
+    return movie.fetched_at + max_age <= datetime.utcnow()
+
+def movie_to_details(movie: Movie) -> Dict:
+    """Convert a catalog row to the shape of TMDBClient._format_movie_details"""
+    details = {field: getattr(movie, field) for field in MOVIE_FIELDS}
+    details['id'] = movie.id
+    details['genres'] = [{'id': genre.id, 'name': genre.name} for genre in movie.genres]
+    details['production_companies'] = movie.production_companies or []
+    return details
+
+def details_json(details: Dict) -> bytes:
+    """The movie detail response body for formatted details or movie_to_details output"""
+    return model_json(MovieDetail.model_validate(details))
+
+def movie_to_summary(movie: Movie) -> Dict:
+    """Convert a catalog row to the shape of TMDBClient._format_movie"""
+    return {
+        'id': movie.id,
+        'title': movie.title,
+        'overview': movie.overview,
+        'poster_url': movie.poster_url,
+        'backdrop_url': movie.backdrop_url,
+        'release_date': movie.release_date,
+        'rating': movie.rating,
+        'genres': [genre.id for genre in movie.genres]
+    }
+
+async def get_movie_summaries(db: AsyncSession, movie_ids: List[int]) -> List[Dict]:
+    """Get list-view data for several movies in one query, keeping the given order"""
+    if not movie_ids:
+        return []
+    movies = {movie.id: movie for movie in await db.scalars(select(Movie).where(Movie.id.in_(movie_ids)))}
+    return [movie_to_summary(movies[movie_id]) for movie_id in movie_ids if movie_id in movies]
+
+def dialect_insert(db: Union[Session, AsyncSession]):
+    """Return the INSERT construct supporting ON CONFLICT for the bound database"""
+    if db.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert
+    return sqlite.insert
+
+def upsert_statements(insert, movies: List[Dict], language: str) -> List[Executable]:
+    """Statements writing movies, their genres and genre links, safe to run concurrently.
+
+    Every write is an INSERT ... ON CONFLICT, so requests racing to store the
+    same movie or a new genre update the row instead of failing on its key.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            **{field: details.get(field) for field in MOVIE_FIELDS},
+            'id': details['id'],
+            'adult': bool(details.get('adult')),
+            'production_companies': details.get('production_companies') or [],
+            'language': language,
+            'fetched_at': now,
+            # Content hash of the detail response, so TMDB and catalog responses share one ETag
+            'etag': make_etag(details_json(details))
+        }
+        for details in movies
+    ]
+    stmt = insert(Movie.__table__).values(rows)
+    statements = [stmt.on_conflict_do_update(
+        index_elements=['id'],
+        set_={column: stmt.excluded[column] for column in rows[0] if column != 'id'}
+    )]
+
+    genres = {genre['id']: genre['name'] for details in movies for genre in details.get('genres', [])}
+    if genres:
+        stmt = insert(Genre.__table__).values([{'id': id, 'name': name} for id, name in genres.items()])
+        statements.append(stmt.on_conflict_do_update(index_elements=['id'], set_={'name': stmt.excluded.name}))
+
+    movie_ids = [details['id'] for details in movies]
+    statements.append(delete(movie_genres).where(movie_genres.c.movie_id.in_(movie_ids)))
+    # Genres keep TMDB's order so catalog bodies match the hashed TMDB body
+    links = [
+        {'movie_id': details['id'], 'genre_id': genre['id'], 'position': position}
+        for details in movies for position, genre in enumerate(details.get('genres', []))
+    ]
+    if links:
+        statements.append(insert(movie_genres).values(links).on_conflict_do_nothing())
+    return statements
+
+async def upsert_movie(db: AsyncSession, details: Dict, language: str) -> None:
+    """Write formatted movie details through to the local catalog"""
+    for stmt in upsert_statements(dialect_insert(db), [details], language):
+        await db.execute(stmt)
+    await db.commit()
+
+def bulk_upsert_movies(db: Session, movies: List[Dict], language: str) -> int:
+    """Insert or update many formatted movies with a few set-based statements"""
+    if not movies:
+        return 0
+    for stmt in upsert_statements(dialect_insert(db), movies, language):
+        db.execute(stmt)
+    db.commit()
+    return len(movies)
+
+async def refresh_movie(client: AsyncTMDBClient, movie_id: int, language: str) -> bool:
+    """Re-fetch a stale movie from TMDB in the background; returns whether it was stored"""
+    try:
+        details = await client.get_movie_details(movie_id, language)
+    except TMDBError as e:
+        logger.warning("Failed to refresh movie %s: %s", movie_id, e)
+        return False
+
+    async with AsyncSessionLocal() as db:
+        try:
+            await upsert_movie(db, details, language)
+        except SQLAlchemyError:
+            logger.exception("Failed to store refreshed movie %s", movie_id)
+            return False
+    return True
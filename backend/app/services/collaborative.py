@@ -0,0 +1,151 @@
+import logging
+from typing import Dict, Iterable, Iterator, List, Tuple
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..db.models import FavoriteMovie, Movie, MovieNeighbor, WatchlistItem
+
+logger = logging.getLogger(__name__)
+
+# Implicit feedback strength of each preference list
+FAVORITE_WEIGHT = 1.0
+WATCHLIST_WEIGHT = 0.5
+
+INTERACTION_DTYPE = np.dtype([('user_id', np.int64), ('movie_id', np.int64), ('weight', np.float32)])
+NEIGHBOR_DTYPE = np.dtype([('movie_id', np.int64), ('neighbor_id', np.int64), ('rank', np.int32), ('score', np.float64)])
+
+class InteractionMatrix:
+    """Sparse user x movie matrix of implicit feedback"""
+
+    def __init__(self, matrix: sp.csr_matrix, movie_ids: np.ndarray) -> None:
+        self.matrix = matrix
+        self.movie_ids = movie_ids
+
+def build_interaction_matrix(interactions: Iterable[Tuple[int, int, float]]) -> InteractionMatrix:
+    """Build a CSR matrix from (user ID, movie ID, weight) triples.
+
+    Repeated (user, movie) pairs keep their highest weight, so a movie that
+    is both a favorite and on the watchlist counts as a favorite.
+    """
+    triples = np.fromiter(interactions, dtype=INTERACTION_DTYPE)
+    user_ids, rows = np.unique(triples['user_id'], return_inverse=True)
+    movie_ids, columns = np.unique(triples['movie_id'], return_inverse=True)
+    weights = triples['weight']
+
+    # Sort by (row, column, -weight) and keep the first entry of each pair
+    order = np.lexsort((-weights, columns, rows))
+    rows, columns, weights = rows[order], columns[order], weights[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1])
+
+    matrix = sp.csr_matrix(
+        (weights[first], (rows[first], columns[first])),
+        shape=(len(user_ids), len(movie_ids))
+    )
+    return InteractionMatrix(matrix, movie_ids)
+
+def item_neighbors(
+    interactions: InteractionMatrix,
+    top_n: int = 50,
+    shrinkage: float = 10.0,
+    block_size: int = 2048
+) -> Iterator[Tuple[int, List[Tuple[int, float]]]]:
+    """Yield (movie ID, [(neighbor ID, score), ...]) from item-item co-occurrence.
+
+    Scores are shrunk cosine similarities between movie columns,
+    c_ij / (|i| |j| + shrinkage), which damps pairs seen by few users. The
+    co-occurrence matrix is computed block by block with sparse products,
+    so memory stays bounded and work grows with the number of
+    co-occurring pairs rather than with movies squared.
+    """
+    matrix = interactions.matrix.tocsc()
+    transposed = matrix.T.tocsr()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    movie_ids = interactions.movie_ids
+
+    for start in range(0, matrix.shape[1], block_size):
+        block = (transposed @ matrix[:, start:start + block_size]).tocsc()
+        for offset in range(block.shape[1]):
+            column = start + offset
+            begin, end = block.indptr[offset], block.indptr[offset + 1]
+            neighbors, counts = block.indices[begin:end], block.data[begin:end]
+            keep = neighbors != column
+            neighbors, counts = neighbors[keep], counts[keep]
+            if not len(neighbors):
+                continue
+            scores = counts / (norms[neighbors] * norms[column] + shrinkage)
+            k = min(top_n, len(scores))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind='stable')]
+            yield int(movie_ids[column]), [
+                (int(movie_ids[neighbors[i]]), float(scores[i])) for i in best
+            ]
+
+def iter_preference_interactions(db: Session, batch_size: int = 10000) -> Iterator[Tuple[int, int, float]]:
+    """Stream implicit feedback triples from every user's saved movies"""
+    for model, weight in ((WatchlistItem, WATCHLIST_WEIGHT), (FavoriteMovie, FAVORITE_WEIGHT)):
+        query = select(model.user_id, model.movie_id).execution_options(yield_per=batch_size)
+        for user_id, movie_id in db.execute(query):
+            yield user_id, movie_id, weight
+
+def collect_neighbors(neighbors: Iterable[Tuple[int, List[Tuple[int, float]]]]) -> np.ndarray:
+    """Materialize ranked neighbors as one compact array of neighbor table rows"""
+    return np.fromiter(
+        (
+            (movie_id, neighbor_id, rank, score)
+            for movie_id, ranked in neighbors
+            for rank, (neighbor_id, score) in enumerate(ranked)
+        ),
+        dtype=NEIGHBOR_DTYPE
+    )
+
+def save_neighbors(db: Session, rows: np.ndarray, batch_size: int = 5000) -> int:
+    """Replace the neighbor table with precomputed rows in one short transaction.
+
+    Nothing is computed between the DELETE and the commit, so SQLite's write
+    lock is held only for the inserts.
+    """
+    db.execute(delete(MovieNeighbor))
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        db.execute(MovieNeighbor.__table__.insert(), [
+            dict(zip(NEIGHBOR_DTYPE.names, row)) for row in batch.tolist()
+        ])
+    db.commit()
+    return len(rows)
+
+def train_item_neighbors(db: Session, top_n: int = 50, shrinkage: float = 10.0) -> Dict[str, int]:
+    """Rebuild the neighbor table from all user preferences"""
+    interactions = build_interaction_matrix(iter_preference_interactions(db))
+    # End the read transaction and score everything before taking the write lock
+    db.commit()
+    rows = save_neighbors(db, collect_neighbors(item_neighbors(interactions, top_n, shrinkage)))
+    stats = {
+        'users': interactions.matrix.shape[0],
+        'movies': interactions.matrix.shape[1],
+        'interactions': interactions.matrix.nnz,
+        'neighbors': rows
+    }
+    logger.info("Trained item neighbors: %s", stats)
+    return stats
+
+async def get_neighbors_page(db: AsyncSession, movie_id: int, page: int, page_size: int) -> Tuple[List[int], int]:
+    """Return one page of precomputed neighbor IDs and the total count.
+
+    Neighbors come from users' saved TMDB IDs, so only those present in the
+    catalog are counted and returned; the rest could not be rendered.
+    """
+    neighbors = (
+        select(MovieNeighbor.neighbor_id)
+        .join(Movie, Movie.id == MovieNeighbor.neighbor_id)
+        .where(MovieNeighbor.movie_id == movie_id)
+    )
+    total = await db.scalar(select(func.count()).select_from(neighbors.subquery()))
+    if not total:
+        return [], 0
+    movie_ids = await db.scalars(
+        neighbors.order_by(MovieNeighbor.rank).offset((page - 1) * page_size).limit(page_size)
+    )
+    return list(movie_ids), total
@@ -0,0 +1,414 @@
+import json
+import math
+import os
+import re
+import shutil
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+a about after all an and are as at be been but by for from has have he her his in into is it its
+of on or she that the their them they this to was were when which who will with
+""".split())
+
+# Relative weight of each feature block in the final movie vector
+DEFAULT_BLOCK_WEIGHTS = {
+    'genres': 1.0,
+    'text': 1.0,
+    'language': 0.3,
+    'rating': 0.2
+}
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase text and split it into terms, dropping stop words"""
+    if not text:
+        return []
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS and len(token) > 1]
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class MovieFeatures:
+    """Dense, L2-normalized movie vectors so cosine similarity is a dot product.
+
+    Movie IDs are mapped to rows through a sorted ID array and binary
+    search rather than a dict, so memory-mapped features need no per-worker
+    lookup table.
+    """
+
+    def __init__(
+        self,
+        movie_ids: np.ndarray,
+        vectors: np.ndarray,
+        sorted_ids: Optional[np.ndarray] = None,
+        sorted_rows: Optional[np.ndarray] = None,
+        genre_columns: Optional[Dict[int, int]] = None
+    ) -> None:
+        self.movie_ids = movie_ids
+        self.vectors = vectors
+        # Vector column of each genre's one-hot feature, for genre-based queries
+        self.genre_columns = genre_columns or {}
+        if sorted_ids is None or sorted_rows is None:
+            sorted_rows = np.argsort(movie_ids, kind='stable')
+            sorted_ids = movie_ids[sorted_rows]
+        self.sorted_ids = sorted_ids
+        self.sorted_rows = sorted_rows
+
+    def __len__(self) -> int:
+        return len(self.movie_ids)
+
+    def __contains__(self, movie_id: int) -> bool:
+        return self.row(movie_id) is not None
+
+    def row(self, movie_id: int) -> Optional[int]:
+        """Return the row of a movie, or None if it has no vector"""
+        position = int(np.searchsorted(self.sorted_ids, movie_id))
+        if position < len(self.sorted_ids) and self.sorted_ids[position] == movie_id:
+            return int(self.sorted_rows[position])
+        return None
+
+    def vector(self, movie_id: int) -> np.ndarray:
+        return self.vectors[self.row(movie_id)]
+
+def build_movie_features(
+    movies: Sequence[Dict],
+    text_dim: int = 128,
+    max_vocab: int = 50000,
+    min_df: int = 2,
+    weights: Optional[Dict[str, float]] = None,
+    seed: int = 42
+) -> MovieFeatures:
+    """Build movie vectors from catalog rows.
+
+    Each row needs id, genres (list of genre IDs), original_language,
+    rating, overview and tagline. The vector concatenates a genre one-hot
+    block, an original-language one-hot block, a TF-IDF block over
+    overview and tagline, and the rating scaled to [0, 1]. The TF-IDF
+    block is reduced to text_dim columns with a fixed random projection so
+    the matrix stays dense and small regardless of vocabulary size. Each
+    block is normalized and weighted before the whole row is normalized.
+    """
+    weights = {**DEFAULT_BLOCK_WEIGHTS, **(weights or {})}
+    n = len(movies)
+    movie_ids = np.fromiter((movie['id'] for movie in movies), dtype=np.int64, count=n)
+
+    genre_index = {genre: i for i, genre in enumerate(sorted({g for m in movies for g in m.get('genres') or []}))}
+    genres = np.zeros((n, max(len(genre_index), 1)), dtype=np.float32)
+    for row, movie in enumerate(movies):
+        for genre in movie.get('genres') or []:
+            genres[row, genre_index[genre]] = 1.0
+
+    language_index = {lang: i for i, lang in enumerate(sorted({m.get('original_language') or '' for m in movies}))}
+    languages = np.zeros((n, max(len(language_index), 1)), dtype=np.float32)
+    for row, movie in enumerate(movies):
+        languages[row, language_index[movie.get('original_language') or '']] = 1.0
+
+    ratings = np.fromiter(((movie.get('rating') or 0.0) / 10.0 for movie in movies), dtype=np.float32, count=n)
+
+    text = _tfidf_projection(
+        [tokenize(movie.get('overview')) + tokenize(movie.get('tagline')) for movie in movies],
+        text_dim, max_vocab, min_df, seed
+    )
+
+    # The genre block comes first so genre_index doubles as genre_columns
+    vectors = np.hstack([
+        _normalize_rows(genres) * weights['genres'],
+        _normalize_rows(languages) * weights['language'],
+        _normalize_rows(text) * weights['text'],
+        ratings[:, None] * weights['rating']
+    ]).astype(np.float32)
+    return MovieFeatures(movie_ids, _normalize_rows(vectors), genre_columns=genre_index)
+
+def _tfidf_projection(documents: List[List[str]], dim: int, max_vocab: int, min_df: int, seed: int) -> np.ndarray:
+    """TF-IDF weight each document and project it onto dim random directions"""
+    n = len(documents)
+    document_frequency = Counter(term for terms in documents for term in set(terms))
+    vocab = [term for term, df in document_frequency.most_common(max_vocab) if df >= min_df]
+    term_index = {term: i for i, term in enumerate(vocab)}
+    idf = np.log((1 + n) / (1 + np.array([document_frequency[t] for t in vocab], dtype=np.float32))) + 1
+
+    rng = np.random.default_rng(seed)
+    projection = rng.standard_normal((max(len(vocab), 1), dim)).astype(np.float32) / math.sqrt(dim)
+
+    text = np.zeros((n, dim), dtype=np.float32)
+    for row, terms in enumerate(documents):
+        counts = Counter(term_index[t] for t in terms if t in term_index)
+        if not counts:
+            continue
+        columns = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        text[row] = (tf * idf[columns]) @ projection[columns]
+    return text
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the k highest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+class IVFIndex:
+    """Inverted-file index for approximate cosine search over unit vectors.
+
+    Vectors are clustered around nlist centroids with spherical k-means and
+    stored contiguously by cluster. A query is scored against the centroids
+    first and then only against the vectors of the nprobe closest clusters,
+    so nprobe trades recall for latency. Vectors added after the index was
+    built are kept in a small pending buffer that is scanned exhaustively
+    until merge_threshold is reached.
+    """
+
+    def __init__(self, centroids: np.ndarray, nprobe: int = 16, merge_threshold: int = 10000) -> None:
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.nprobe = nprobe
+        self.merge_threshold = merge_threshold
+        dim = self.centroids.shape[1]
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.offsets = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+        self._pending_ids: List[np.ndarray] = []
+        self._pending_vectors: List[np.ndarray] = []
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        return len(self.ids) + sum(len(ids) for ids in self._pending_ids)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        centroids: np.ndarray,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        offsets: np.ndarray,
+        nprobe: int = 16
+    ) -> "IVFIndex":
+        """Wrap already clustered arrays, e.g. memory-mapped ones, without copying"""
+        index = cls(centroids, nprobe)
+        index.ids = ids
+        index.vectors = vectors
+        index.offsets = offsets
+        return index
+
+    @classmethod
+    def build(
+        cls,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        nlist: Optional[int] = None,
+        nprobe: int = 16,
+        iterations: int = 10,
+        sample_size: Optional[int] = None,
+        seed: int = 42
+    ) -> "IVFIndex":
+        """Train centroids on a sample of vectors and index all of them"""
+        nlist = nlist or max(int(4 * math.sqrt(len(vectors))), 1)
+        nlist = min(nlist, len(vectors))
+        centroids = spherical_kmeans(vectors, nlist, iterations, sample_size or nlist * 16, seed)
+        index = cls(centroids, nprobe)
+        index.add(ids, vectors)
+        index.merge()
+        return index
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        """Add vectors to the index; they are searchable immediately"""
+        self._pending_ids.append(np.asarray(ids, dtype=np.int64))
+        self._pending_vectors.append(np.asarray(vectors, dtype=np.float32))
+        if sum(len(ids) for ids in self._pending_ids) >= self.merge_threshold:
+            self.merge()
+
+    def merge(self) -> None:
+        """Move pending vectors into the clustered layout"""
+        if not self._pending_ids:
+            return
+        ids = np.concatenate([self.ids, *self._pending_ids])
+        vectors = np.concatenate([self.vectors, *self._pending_vectors])
+        assignments = _assign(vectors, self.centroids)
+        order = np.argsort(assignments, kind='stable')
+        self.ids = ids[order]
+        self.vectors = np.ascontiguousarray(vectors[order])
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=self.nlist))])
+        self._pending_ids, self._pending_vectors = [], []
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the IDs and scores of approximately the k nearest vectors"""
+        probes = top_k(self.centroids @ query, min(nprobe or self.nprobe, self.nlist))
+        id_parts, score_parts = [], []
+        for probe in probes:
+            start, end = self.offsets[probe], self.offsets[probe + 1]
+            if start < end:
+                id_parts.append(self.ids[start:end])
+                score_parts.append(self.vectors[start:end] @ query)
+        for ids, vectors in zip(self._pending_ids, self._pending_vectors):
+            id_parts.append(ids)
+            score_parts.append(vectors @ query)
+        if not id_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        ids = np.concatenate(id_parts)
+        scores = np.concatenate(score_parts)
+        best = top_k(scores, k)
+        return ids[best], scores[best]
+
+    def save(self, path: str) -> None:
+        """Save the index to a .npz file"""
+        self.merge()
+        np.savez(
+            path,
+            centroids=self.centroids,
+            ids=self.ids,
+            vectors=self.vectors,
+            offsets=self.offsets,
+            nprobe=np.array(self.nprobe)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """Load an index saved with save()"""
+        with np.load(path) as data:
+            return cls.from_arrays(
+                data['centroids'], data['ids'], data['vectors'], data['offsets'], int(data['nprobe'])
+            )
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """Return the closest centroid for every vector, in chunks to bound memory"""
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        assignments[start:start + chunk_size] = np.argmax(vectors[start:start + chunk_size] @ centroids.T, axis=1)
+    return assignments
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 10, sample_size: int = 65536, seed: int = 42) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity and return unit centroids"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].astype(np.float32)
+
+    for _ in range(iterations):
+        assignments = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty clusters so every list stays useful
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = _normalize_rows(sums).astype(np.float32)
+    return centroids
+
+class EmbeddingStore:
+    """Versioned on-disk movie vectors, opened with np.memmap.
+
+    Each published version is a directory of .npy files plus a manifest.
+    Opening a version maps the files read-only, so it costs O(1) regardless
+    of catalog size and every worker process shares the same page cache.
+    The CURRENT file names the live version and is replaced atomically, so
+    a rebuilt index can be published while workers are serving.
+
+    When an IVF index is published, vectors are stored in cluster order and
+    the index reads the very same mapped arrays.
+    """
+
+    FORMAT_VERSION = 1
+    POINTER = 'CURRENT'
+
+    def __init__(self, root: str, keep: int = 2) -> None:
+        self.root = root
+        self.keep = keep
+
+    def current_version(self) -> Optional[str]:
+        """Return the name of the published version, if any"""
+        try:
+            with open(os.path.join(self.root, self.POINTER), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def publish(self, features: MovieFeatures, index: Optional[IVFIndex] = None, dtype: str = 'float32') -> str:
+        """Write a new version and atomically make it current"""
+        os.makedirs(self.root, exist_ok=True)
+        # Sortable by publication time, unique across concurrent publishers
+        now = time.time_ns()
+        version = f"v{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now // 10**9))}.{now % 10**9:09d}-{os.getpid()}"
+        tmp_dir = os.path.join(self.root, f".{version}.tmp")
+        os.makedirs(tmp_dir)
+
+        ids, vectors = features.movie_ids, features.vectors
+        if index is not None:
+            index.merge()
+            ids, vectors = index.ids, index.vectors
+            np.save(os.path.join(tmp_dir, 'centroids.npy'), index.centroids)
+            np.save(os.path.join(tmp_dir, 'offsets.npy'), index.offsets)
+        sorted_rows = np.argsort(ids, kind='stable')
+        np.save(os.path.join(tmp_dir, 'ids.npy'), np.asarray(ids, dtype=np.int64))
+        np.save(os.path.join(tmp_dir, 'vectors.npy'), np.asarray(vectors, dtype=dtype))
+        np.save(os.path.join(tmp_dir, 'sorted_ids.npy'), np.asarray(ids, dtype=np.int64)[sorted_rows])
+        np.save(os.path.join(tmp_dir, 'sorted_rows.npy'), sorted_rows.astype(np.int64))
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'format_version': self.FORMAT_VERSION,
+                'count': int(len(ids)),
+                'dim': int(vectors.shape[1]),
+                'dtype': dtype,
+                'has_index': index is not None,
+                'nprobe': index.nprobe if index is not None else None,
+                'genre_columns': {str(genre): column for genre, column in features.genre_columns.items()},
+                'created_at': time.time()
+            }, f)
+
+        os.replace(tmp_dir, os.path.join(self.root, version))
+        pointer_tmp = os.path.join(self.root, f".{self.POINTER}.{version}.tmp")
+        with open(pointer_tmp, 'w', encoding='utf-8') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer_tmp, os.path.join(self.root, self.POINTER))
+        self._prune(version)
+        return version
+
+    def open(self, version: Optional[str] = None) -> Tuple[MovieFeatures, Optional[IVFIndex]]:
+        """Map a version (the current one by default) into memory"""
+        version = version or self.current_version()
+        if version is None:
+            raise FileNotFoundError(f"No embeddings published in {self.root}")
+        path = os.path.join(self.root, version)
+        with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest['format_version'] != self.FORMAT_VERSION:
+            raise ValueError(f"Unsupported embedding format {manifest['format_version']}")
+
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, name), mmap_mode='r')
+
+        ids, vectors = load('ids.npy'), load('vectors.npy')
+        features = MovieFeatures(
+            ids, vectors, load('sorted_ids.npy'), load('sorted_rows.npy'),
+            {int(genre): column for genre, column in manifest.get('genre_columns', {}).items()}
+        )
+        index = None
+        if manifest['has_index']:
+            index = IVFIndex.from_arrays(
+                load('centroids.npy'), ids, vectors, load('offsets.npy'), manifest['nprobe']
+            )
+        return features, index
+
+    def _prune(self, current: str) -> None:
+        """Delete all but the newest `keep` versions.
+
+        Workers still mapping a deleted version keep reading it safely until
+        they switch, since the files live on until they are unmapped.
+        """
+        versions = sorted(
+            name for name in os.listdir(self.root)
+            if name.startswith('v') and os.path.isdir(os.path.join(self.root, name))
+        )
+        for name in versions[:-self.keep]:
+            if name != current:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
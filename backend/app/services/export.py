@@ -0,0 +1,62 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable
+from ..models.movie import MovieBase
+from ..utils.responses import model_json
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+PageFetcher = Callable[[int], Awaitable[Dict]]
+
+async def prefetch_pages(fetch_page: PageFetcher, first: Dict, max_pages: int, prefetch: int = 2) -> AsyncIterator[Dict]:
+    """Yield first and the pages after it in order, fetching up to prefetch pages ahead.
+
+    New fetches are only started when the consumer asks for the next page,
+    so a slow reader holds at most prefetch pages in memory and pauses
+    upstream traffic instead of buffering the whole export. Fetches still
+    pending when the consumer stops are cancelled.
+    """
+    last_page = min(first['total_pages'], max_pages)
+    next_page = first['page'] + 1
+    pending: Deque[asyncio.Task] = deque()
+
+    def schedule() -> None:
+        nonlocal next_page
+        while len(pending) < prefetch and next_page <= last_page:
+            pending.append(asyncio.ensure_future(fetch_page(next_page)))
+            next_page += 1
+
+    try:
+        schedule()
+        yield first
+        while pending:
+            page = await pending.popleft()
+            schedule()
+            yield page
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def fixed_pages(pages: Iterable[Dict]) -> AsyncIterator[Dict]:
+    """Adapt pages that are already in memory to the streaming pipeline"""
+    for page in pages:
+        yield page
+
+async def ndjson_movies(pages: AsyncGenerator[Dict, None]) -> AsyncIterator[bytes]:
+    """Encode the movies of each page as JSON lines, one chunk per page.
+
+    The status line has already been sent when a later page fails, so the
+    failure is reported as a final {"error": ...} line instead.
+    """
+    try:
+        async for page in pages:
+            yield b''.join(model_json(MovieBase.model_validate(movie)) + b'\n' for movie in page['movies'])
+    except Exception as e:
+        logger.warning("Export stopped early: %s", e)
+        yield json.dumps({'error': str(e)}).encode() + b'\n'
+    finally:
+        await pages.aclose()
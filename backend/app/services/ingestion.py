@@ -0,0 +1,172 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from .catalog import bulk_upsert_movies
+from ..utils.tmdb_client import AsyncTMDBClient
+
+logger = logging.getLogger(__name__)
+
+class IngestionStats:
+    """Counters for an ingestion run"""
+
+    def __init__(self) -> None:
+        self.read = 0
+        self.skipped = 0
+        self.stored = 0
+        self.failed = 0
+        self.retry = 0
+        self.last_line = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'read': self.read,
+            'skipped': self.skipped,
+            'stored': self.stored,
+            'failed': self.failed,
+            'retry': self.retry,
+            'last_line': self.last_line
+        }
+
+def iter_export(path: str, start_line: int = 0) -> Iterator[Tuple[int, Dict]]:
+    """Stream (line number, record) pairs from a TMDB daily ID export.
+
+    Exports are JSON lines, usually gzipped. Lines up to and including
+    start_line are skipped so an interrupted run can resume.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as export:
+        for line_no, line in enumerate(export, 1):
+            if line_no <= start_line:
+                continue
+            line = line.strip()
+            if line:
+                yield line_no, json.loads(line)
+
+def load_checkpoint(path: Optional[str]) -> int:
+    """Return the last fully ingested line number, or 0"""
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path, encoding='utf-8') as f:
+        return int(json.load(f).get('line', 0))
+
+def load_retry_ids(path: Optional[str]) -> List[int]:
+    """Return the IDs that failed transiently before the checkpoint"""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [int(movie_id) for movie_id in json.load(f).get('retry', [])]
+
+def save_checkpoint(path: Optional[str], line: int, retry_ids: Iterable[int] = ()) -> None:
+    """Atomically record the last fully ingested line number and the IDs to retry"""
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'line': line, 'retry': list(retry_ids)}, f)
+    os.replace(tmp_path, path)
+
+async def ingest_export(
+    client: AsyncTMDBClient,
+    session_factory: Callable[[], Session],
+    path: str,
+    checkpoint_path: Optional[str] = None,
+    language: str = 'en-US',
+    batch_size: int = 200,
+    concurrency: int = 8,
+    include_adult: bool = False,
+    limit: Optional[int] = None,
+    max_retry_ids: int = 10000
+) -> IngestionStats:
+    """Hydrate every movie in an export through TMDB into the catalog.
+
+    The export is read in batches of batch_size lines. Details for a batch
+    are fetched with bounded concurrency while the previous batch is being
+    written, and the checkpoint only advances once a batch is committed.
+    IDs that fail transiently (rate limits, outages, network errors) are
+    saved with the checkpoint and fetched again first on the next run;
+    only IDs TMDB rejects outright count as failed. While TMDB's circuit
+    breaker is open the run pauses instead of advancing, and it stops once
+    more than max_retry_ids IDs are waiting to be retried.
+    """
+    stats = IngestionStats()
+    stats.last_line = start_line = load_checkpoint(checkpoint_path)
+    retry_ids = dict.fromkeys(load_retry_ids(checkpoint_path))
+    records = iter_export(path, start_line)
+    if limit is not None:
+        records = islice(records, limit)
+
+    def batches() -> Iterator[Tuple[List[int], int]]:
+        """Yield (movie IDs, last export line covered), starting with earlier failures"""
+        retrying = list(retry_ids)
+        for offset in range(0, len(retrying), batch_size):
+            yield retrying[offset:offset + batch_size], start_line
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                return
+            stats.read += len(batch)
+            movie_ids = [
+                record['id'] for _, record in batch
+                if include_adult or not record.get('adult')
+            ]
+            stats.skipped += len(batch) - len(movie_ids)
+            yield movie_ids, batch[-1][0]
+
+    async def fetch(movie_ids: List[int]) -> Tuple[List[Dict], List[Dict]]:
+        """Fetch a batch, waiting out an open circuit breaker instead of failing every ID"""
+        breaker = client.circuit_breaker
+        movies, errors = [], []
+        while True:
+            paused = breaker.state != breaker.CLOSED
+            if paused:
+                delay = breaker.retry_after()
+                logger.warning("TMDB is unavailable, pausing %.1fs with %s movies pending", delay, len(movie_ids))
+                await asyncio.sleep(delay)
+            result = await client.get_movie_details_many(movie_ids, language, concurrency=concurrency)
+            movies.extend(result['movies'])
+            transient = [error for error in result['errors'] if error['transient']]
+            errors.extend(error for error in result['errors'] if not error['transient'])
+            # Isolated failures wait for the next run; those the breaker rejected are fetched again
+            if not transient or (not paused and breaker.state == breaker.CLOSED):
+                return movies, errors + transient
+            movie_ids = [error['id'] for error in transient]
+
+    def write(movies, last_line: int, retry: List[int]) -> None:
+        db = session_factory()
+        try:
+            stats.stored += bulk_upsert_movies(db, movies, language)
+        finally:
+            db.close()
+        save_checkpoint(checkpoint_path, last_line, retry)
+        stats.last_line = last_line
+
+    pending_write = None
+    for movie_ids, last_line in batches():
+        movies, errors = await fetch(movie_ids)
+        for movie_id in movie_ids:
+            retry_ids.pop(movie_id, None)
+        for error in errors:
+            if error['transient']:
+                retry_ids[error['id']] = None
+                logger.debug("Will retry movie %s: %s", error['id'], error['detail'])
+            else:
+                stats.failed += 1
+                logger.debug("Skipping movie %s: %s", error['id'], error['detail'])
+
+        if pending_write is not None:
+            await pending_write
+        pending_write = asyncio.ensure_future(asyncio.to_thread(write, movies, last_line, list(retry_ids)))
+        logger.info("Ingested through line %s: %s", last_line, stats.as_dict())
+        if len(retry_ids) > max_retry_ids:
+            logger.warning("Stopping with %s movies to retry; run again once TMDB recovers", len(retry_ids))
+            break
+
+    if pending_write is not None:
+        await pending_write
+    stats.retry = len(retry_ids)
+    return stats
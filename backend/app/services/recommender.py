@@ -0,0 +1,225 @@
+import logging
+import math
+from collections import defaultdict
+from typing import AbstractSet, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..db.models import Movie, movie_genres
+from .embeddings import EmbeddingStore, IVFIndex, MovieFeatures, build_movie_features, top_k
+
+logger = logging.getLogger(__name__)
+
+# Results per page, matching TMDB list endpoints
+PAGE_SIZE = 20
+
+class ContentRecommender:
+    """Content-based "similar movies" over the local catalog.
+
+    Similarity is the cosine between movie feature vectors. Small catalogs
+    are scored exhaustively with one matrix-vector product; when an ANN
+    index is given only the clusters it probes are scored.
+    """
+
+    def __init__(
+        self,
+        features: MovieFeatures,
+        max_results: int = 100,
+        index: Optional[IVFIndex] = None,
+        version: Optional[str] = None
+    ) -> None:
+        self.features = features
+        self.max_results = max_results
+        self.index = index
+        self.version = version  # Published embedding version, None when built in process
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def __contains__(self, movie_id: int) -> bool:
+        return movie_id in self.features
+
+    def similar(self, movie_id: int, k: int = 20) -> List[Tuple[int, float]]:
+        """Return up to k (movie ID, score) pairs most similar to a movie"""
+        row = self.features.row(movie_id)
+        if self.index is not None:
+            ids, scores = self.index.search(self.features.vectors[row], k + 1)
+            return [(int(i), float(score)) for i, score in zip(ids, scores) if i != movie_id][:k]
+
+        scores = self.features.vectors @ self.features.vectors[row]
+        scores[row] = -np.inf
+        best = top_k(scores, min(k, len(scores) - 1))
+        return [(int(self.features.movie_ids[i]), float(scores[i])) for i in best]
+
+    def profile_vector(self, movie_weights: Dict[int, float], genre_ids: Sequence[int] = (), genre_weight: float = 0.5) -> Optional[np.ndarray]:
+        """Combine liked movies and favorite genres into one query vector"""
+        rows = [(self.features.row(movie_id), weight) for movie_id, weight in movie_weights.items()]
+        rows = [(row, weight) for row, weight in rows if row is not None]
+        columns = [self.features.genre_columns[g] for g in genre_ids if g in self.features.genre_columns]
+        if not rows and not columns:
+            return None
+
+        profile = np.zeros(self.features.vectors.shape[1], dtype=np.float32)
+        if rows:
+            weights = np.array([weight for _, weight in rows], dtype=np.float32)
+            profile += weights @ self.features.vectors[[row for row, _ in rows]].astype(np.float32)
+            profile /= np.linalg.norm(profile) or 1.0
+        if columns:
+            profile[columns] += genre_weight / math.sqrt(len(columns))
+        return (profile / (np.linalg.norm(profile) or 1.0)).astype(self.features.vectors.dtype)
+
+    def recommend_for_profile(
+        self,
+        movie_weights: Dict[int, float],
+        genre_ids: Sequence[int] = (),
+        exclude: AbstractSet[int] = frozenset(),
+        k: int = 100
+    ) -> List[Tuple[int, float]]:
+        """Rank movies for a user profile, skipping excluded movie IDs"""
+        profile = self.profile_vector(movie_weights, genre_ids)
+        if profile is None:
+            return []
+        limit = k + len(exclude)
+        if self.index is not None:
+            ids, scores = self.index.search(profile, limit)
+        else:
+            scores = self.features.vectors @ profile
+            best = top_k(scores, limit)
+            ids, scores = self.features.movie_ids[best], scores[best]
+        return [(int(i), float(score)) for i, score in zip(ids, scores) if int(i) not in exclude][:k]
+
+    def recommend_page(self, movie_id: int, page: int = 1, page_size: int = PAGE_SIZE) -> Tuple[List[int], int]:
+        """Return one page of similar movie IDs and the total number of results"""
+        total_results = min(self.max_results, len(self) - 1)
+        ranked = self.similar(movie_id, min(page * page_size, total_results))
+        return [movie_id for movie_id, _ in ranked[(page - 1) * page_size:]], total_results
+
+def load_catalog_rows(db: Session) -> List[Dict]:
+    """Load the columns used for movie features from the catalog"""
+    genres = defaultdict(list)
+    for movie_id, genre_id in db.execute(select(movie_genres.c.movie_id, movie_genres.c.genre_id)):
+        genres[movie_id].append(genre_id)
+
+    query = select(Movie.id, Movie.overview, Movie.tagline, Movie.original_language, Movie.rating).order_by(Movie.id)
+    return [
+        {
+            'id': row.id,
+            'overview': row.overview,
+            'tagline': row.tagline,
+            'original_language': row.original_language,
+            'rating': row.rating,
+            'genres': genres.get(row.id, [])
+        }
+        for row in db.execute(query)
+    ]
+
+def build_catalog_embeddings(
+    db: Session,
+    ann_min_items: int = 20000,
+    ann_nlist: Optional[int] = None,
+    ann_nprobe: int = 16
+) -> Optional[Tuple[MovieFeatures, Optional[IVFIndex]]]:
+    """Build movie vectors from the catalog, or None if it is too small.
+
+    Catalogs with at least ann_min_items movies also get an IVF index.
+    """
+    rows = load_catalog_rows(db)
+    if len(rows) < 2:
+        return None
+    features = build_movie_features(rows)
+    index = None
+    if len(features) >= ann_min_items:
+        index = IVFIndex.build(features.movie_ids, features.vectors, nlist=ann_nlist, nprobe=ann_nprobe)
+    logger.info("Built embeddings for %s movies (ann=%s)", len(features), index is not None)
+    return features, index
+
+def build_content_recommender(db: Session, max_results: int = 100, **ann_options) -> Optional[ContentRecommender]:
+    """Build an in-memory recommender straight from the catalog"""
+    embeddings = build_catalog_embeddings(db, **ann_options)
+    if embeddings is None:
+        return None
+    return ContentRecommender(embeddings[0], max_results, embeddings[1])
+
+class RecommenderLoader:
+    """Hand out the recommender for the currently published embeddings.
+
+    With an EmbeddingStore, reload() re-reads the CURRENT pointer and maps
+    a newly published version in place of the old one, so rebuilt indexes
+    go live without a restart. It does file I/O, so it runs from a
+    scheduler job on a worker thread; get() only returns the reference.
+    Without a store, the loader simply holds a fixed recommender.
+    """
+
+    def __init__(
+        self,
+        store: Optional[EmbeddingStore] = None,
+        recommender: Optional[ContentRecommender] = None,
+        max_results: int = 100
+    ) -> None:
+        self.store = store
+        self.recommender = recommender
+        self.max_results = max_results
+        self.version: Optional[str] = None
+
+    def get(self) -> Optional[ContentRecommender]:
+        return self.recommender
+
+    def reload(self) -> bool:
+        """Map the published version if it changed since the last check; returns whether it did"""
+        if self.store is None:
+            return False
+        version = self.store.current_version()
+        if version is None or version == self.version:
+            return False
+        try:
+            features, index = self.store.open(version)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not open embeddings %s: %s", version, e)
+            return False
+        self.recommender = ContentRecommender(features, self.max_results, index, version)
+        self.version = version
+        logger.info("Loaded embeddings %s (%s movies)", version, len(features))
+        return True
+
+def load_content_recommender(
+    session_factory,
+    store: Optional[EmbeddingStore] = None,
+    dtype: str = 'float32',
+    max_results: int = 100,
+    **ann_options
+) -> RecommenderLoader:
+    """Prepare the recommender at startup, logging instead of failing.
+
+    With a store, embeddings are built and published only if no version
+    exists yet; otherwise the published one is mapped as is.
+    """
+    loader = RecommenderLoader(store, max_results=max_results)
+    if store is not None and store.current_version() is not None:
+        loader.reload()
+        return loader
+
+    db = session_factory()
+    try:
+        embeddings = build_catalog_embeddings(db, **ann_options)
+    except Exception as e:
+        logger.warning("Content recommender unavailable: %s", e)
+        return loader
+    finally:
+        db.close()
+
+    if embeddings is not None:
+        if store is not None:
+            store.publish(*embeddings, dtype=dtype)
+            loader.reload()
+        else:
+            loader.recommender = ContentRecommender(embeddings[0], max_results, embeddings[1])
+    return loader
+
+def paginate(movies: List[Dict], page: int, total_results: int, page_size: int = PAGE_SIZE) -> Dict:
+    """Shape a page of movies like TMDBClient._format_movie_list"""
+    return {
+        'page': page,
+        'total_pages': max(math.ceil(total_results / page_size), 1),
+        'total_results': total_results,
+        'movies': movies
+    }
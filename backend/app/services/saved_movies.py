@@ -0,0 +1,38 @@
+from typing import Iterable, List, Type, Union
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db.models import FavoriteMovie, WatchlistItem
+from .catalog import dialect_insert
+
+SavedMovie = Type[Union[FavoriteMovie, WatchlistItem]]
+
+async def add_saved_movie(db: AsyncSession, model: SavedMovie, user_id: int, movie_id: int) -> bool:
+    """Save a movie for a user; returns False if it was already saved. The caller commits."""
+    insert = dialect_insert(db)
+    # Appended after the user's last movie; writes are serialized by the write queue
+    position = select(func.coalesce(func.max(model.position), -1) + 1).where(model.user_id == user_id)
+    result = await db.execute(
+        insert(model.__table__)
+        .values(user_id=user_id, movie_id=movie_id, position=position.scalar_subquery())
+        .on_conflict_do_nothing()
+    )
+    return result.rowcount == 1
+
+async def remove_saved_movie(db: AsyncSession, model: SavedMovie, user_id: int, movie_id: int) -> bool:
+    """Remove a saved movie; returns False if it was not saved. The caller commits."""
+    result = await db.execute(delete(model).where(model.user_id == user_id, model.movie_id == movie_id))
+    return result.rowcount == 1
+
+async def replace_saved_movies(db: AsyncSession, model: SavedMovie, user_id: int, movie_ids: Iterable[int]) -> None:
+    """Replace a user's saved movies, keeping their order. The caller commits."""
+    await db.execute(delete(model).where(model.user_id == user_id))
+    rows = [
+        {'user_id': user_id, 'movie_id': movie_id, 'position': position}
+        for position, movie_id in enumerate(dict.fromkeys(movie_ids))
+    ]
+    if rows:
+        await db.execute(model.__table__.insert(), rows)
+
+async def get_users_who_saved(db: AsyncSession, model: SavedMovie, movie_id: int) -> List[int]:
+    """Return the IDs of users who saved a movie"""
+    return list(await db.scalars(select(model.user_id).where(model.movie_id == movie_id).order_by(model.user_id)))
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JobFn = Callable[[], Awaitable[Any]]
+
+class Job:
+    """A periodic job and what happened the last time it ran"""
+
+    def __init__(self, name: str, fn: JobFn, interval: float, jitter: float = 0.0, run_at_start: bool = True) -> None:
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.jitter = jitter
+        self.run_at_start = run_at_start
+        self.runs = 0
+        self.failures = 0
+        self.running = False
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_result: Any = None
+        self.next_run: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'interval': self.interval,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_started': self.last_started,
+            'last_duration': round(self.last_duration, 6) if self.last_duration is not None else None,
+            'last_error': self.last_error,
+            'last_result': self.last_result,
+            'next_run': self.next_run
+        }
+
+class Scheduler:
+    """Run coroutine jobs periodically on the event loop.
+
+    Each job sleeps interval seconds, plus or minus up to jitter, between
+    the end of one run and the start of the next, so jobs never overlap
+    themselves and workers started together drift apart. At most
+    max_concurrency jobs run at once; a failing job is logged and retried
+    at its next slot.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 2,
+        clock: Callable[[], float] = time.time,
+        rng: Optional[random.Random] = None
+    ) -> None:
+        self.jobs: Dict[str, Job] = {}
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, fn: JobFn, interval: float, jitter: float = 0.0, run_at_start: bool = True) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"Job {name} is already scheduled")
+        job = self.jobs[name] = Job(name, fn, interval, jitter, run_at_start)
+        return job
+
+    async def start(self) -> None:
+        """Start one loop task per job on the running event loop"""
+        self._tasks = [asyncio.create_task(self._loop(job)) for job in self.jobs.values()]
+
+    async def close(self) -> None:
+        """Cancel every job, including runs in progress"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [job.as_dict() for job in self.jobs.values()]
+
+    async def run_job(self, name: str) -> Any:
+        """Run a job now, waiting for a free slot; errors are recorded, not raised"""
+        job = self.jobs[name]
+        async with self._semaphore:
+            job.running = True
+            job.last_started = self.clock()
+            start = time.perf_counter()
+            try:
+                job.last_result = await job.fn()
+                job.last_error = None
+            except Exception as e:
+                job.failures += 1
+                job.last_error = str(e) or type(e).__name__
+                logger.exception("Scheduled job %s failed", name)
+            finally:
+                job.runs += 1
+                job.running = False
+                job.last_duration = time.perf_counter() - start
+        return job.last_result
+
+    def _delay(self, job: Job, base: float) -> float:
+        return max(base + self.rng.uniform(-job.jitter, job.jitter), 0.0)
+
+    async def _loop(self, job: Job) -> None:
+        delay = self.rng.uniform(0, job.jitter) if job.run_at_start else self._delay(job, job.interval)
+        while True:
+            job.next_run = self.clock() + delay
+            await asyncio.sleep(delay)
+            await self.run_job(job.name)
+            delay = self._delay(job, job.interval)
@@ -0,0 +1,190 @@
+import logging
+import math
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..db.models import Movie
+from ..utils.text import search_terms
+from .embeddings import top_k
+from .recommender import PAGE_SIZE
+from .suggest import SuggestIndex
+
+logger = logging.getLogger(__name__)
+
+# How much a term in each field counts towards a movie's match
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'original_title': 2.0,
+    'tagline': 1.0,
+    'overview': 1.0
+}
+
+class SearchIndex:
+    """In-memory BM25 index over the title, original title, tagline and overview.
+
+    Term counts are length-normalized per field, scaled by FIELD_WEIGHTS
+    and summed before BM25 saturation (BM25F). Every posting stores its
+    final weight, so a query only adds up the postings of its terms. A
+    movie matches when it contains every query term; popularity breaks
+    near-ties.
+    """
+
+    def __init__(
+        self,
+        movie_ids: np.ndarray,
+        languages: np.ndarray,
+        postings: Dict[str, Tuple[np.ndarray, np.ndarray]],
+        prior: np.ndarray
+    ) -> None:
+        self.movie_ids = movie_ids
+        self.languages = languages
+        self.postings = postings
+        self.prior = prior
+        self._language_masks: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.movie_ids)
+
+    @classmethod
+    def build(
+        cls,
+        rows: Iterable[Dict],
+        k1: float = 1.2,
+        b: float = 0.75,
+        popularity_boost: float = 0.1,
+        field_weights: Dict[str, float] = FIELD_WEIGHTS
+    ) -> "SearchIndex":
+        """Index catalog rows with id, original_language, popularity and the text fields"""
+        movie_ids, languages, popularity = [], [], []
+        field_counts: Dict[str, List[Counter]] = {field: [] for field in field_weights}
+        for row in rows:
+            for field, counts in field_counts.items():
+                counts.append(Counter(search_terms(row.get(field))))
+            movie_ids.append(row['id'])
+            languages.append(row.get('original_language') or '')
+            popularity.append(row.get('popularity') or 0.0)
+
+        # Each field is length-normalized against its own average, then weighted
+        frequencies: Dict[str, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+        for field, counts in field_counts.items():
+            lengths = [sum(terms.values()) for terms in counts]
+            average = sum(lengths) / len(lengths) if lengths else 0.0
+            for doc, (terms, length) in enumerate(zip(counts, lengths)):
+                norm = field_weights[field] / (1 - b + b * length / average) if length else 0.0
+                for term, count in terms.items():
+                    frequencies[term][doc] += count * norm
+
+        n = len(movie_ids)
+        postings = {}
+        for term, docs in frequencies.items():
+            frequency = np.fromiter(docs.values(), dtype=np.float32, count=len(docs))
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            postings[term] = (
+                np.fromiter(docs.keys(), dtype=np.int32, count=len(docs)),
+                (idf * frequency * (k1 + 1) / (frequency + k1)).astype(np.float32)
+            )
+
+        popularity = np.log1p(np.array(popularity, dtype=np.float32))
+        prior = 1 + popularity_boost * popularity / (popularity.max() or 1.0) if n else popularity
+        return cls(np.array(movie_ids, dtype=np.int64), np.array(languages, dtype=object), postings, prior)
+
+    def language_mask(self, language: str) -> np.ndarray:
+        mask = self._language_masks.get(language)
+        if mask is None:
+            mask = self._language_masks[language] = self.languages == language
+        return mask
+
+    def search(self, query: str, k: int = PAGE_SIZE, original_language: Optional[str] = None) -> Tuple[List[Tuple[int, float]], int]:
+        """Return the k best (movie ID, score) pairs and the number of matching movies"""
+        terms = set(search_terms(query))
+        if not terms or not len(self):
+            return [], 0
+        scores = np.zeros(len(self), dtype=np.float32)
+        matched = np.zeros(len(self), dtype=np.int16)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                return [], 0
+            docs, weights = posting
+            scores[docs] += weights
+            matched[docs] += 1
+
+        candidates = matched == len(terms)
+        if original_language:
+            candidates &= self.language_mask(original_language)
+        total = int(np.count_nonzero(candidates))
+        if not total:
+            return [], 0
+        scores = np.where(candidates, scores * self.prior, -np.inf)
+        best = top_k(scores, min(k, total))
+        return [(int(self.movie_ids[i]), float(scores[i])) for i in best], total
+
+    def search_page(
+        self,
+        query: str,
+        page: int = 1,
+        page_size: int = PAGE_SIZE,
+        original_language: Optional[str] = None
+    ) -> Tuple[List[int], int]:
+        """Return one page of matching movie IDs and the total number of matches"""
+        ranked, total = self.search(query, page * page_size, original_language)
+        return [movie_id for movie_id, _ in ranked[(page - 1) * page_size:]], total
+
+def load_search_rows(db: Session) -> List[Dict]:
+    """Load the columns indexed for search, skipping adult titles like TMDB search does"""
+    query = select(
+        Movie.id, Movie.title, Movie.original_title, Movie.tagline, Movie.overview,
+        Movie.original_language, Movie.popularity, Movie.release_date
+    ).where(Movie.adult.is_not(True)).order_by(Movie.id)
+    return [row._asdict() for row in db.execute(query)]
+
+def search_catalog_version(db: Session) -> Tuple:
+    """A cheap fingerprint of the indexed rows: their count and latest write"""
+    query = select(func.count(), func.max(Movie.fetched_at)).where(Movie.adult.is_not(True))
+    return tuple(db.execute(query).one())
+
+class SearchIndexLoader:
+    """Hold the current search and suggestion indexes and swap in rebuilt ones.
+
+    refresh() builds complete new indexes before replacing the references,
+    so requests always see either an old index or a new one. Rebuilds hold
+    the GIL for a while at catalog scale, so they are skipped while the
+    catalog is unchanged since the last build.
+    """
+
+    def __init__(self, session_factory) -> None:
+        self.session_factory = session_factory
+        self.index: Optional[SearchIndex] = None
+        self.suggest_index: Optional[SuggestIndex] = None
+        self.version: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Rebuild the indexes if the catalog changed, keeping the old ones on failure.
+
+        Returns whether new indexes were swapped in.
+        """
+        with self._lock:
+            db = self.session_factory()
+            try:
+                version = search_catalog_version(db)
+                if version == self.version:
+                    return False
+                rows = load_search_rows(db)
+                if not rows:
+                    return False
+                index = SearchIndex.build(rows)
+                suggest_index = SuggestIndex.build(rows)
+            except Exception as e:
+                logger.warning("Search index unavailable: %s", e)
+                return False
+            finally:
+                db.close()
+            self.index = index
+            self.suggest_index = suggest_index
+            self.version = version
+            logger.info("Built search indexes for %s movies (%s terms)", len(index), len(index.postings))
+            return True
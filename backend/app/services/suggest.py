@@ -0,0 +1,122 @@
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from ..utils.text import search_terms
+
+# Most suggestions one query can ask for
+MAX_SUGGESTIONS = 20
+
+# Bytes of folded title kept per entry; longer prefixes are matched on these
+KEY_WIDTH = 32
+
+# Titles are also found from their second and third word ("matrix" -> "The Matrix")
+MAX_ENTRIES_PER_TITLE = 3
+
+# Ranges up to this size are ranked on the fly; larger ones are precomputed
+SCAN_LIMIT = 2048
+
+def suggest_key(text: str) -> bytes:
+    """Folded words of text joined by single spaces, as UTF-8.
+
+    A trailing space is kept so "up " stops matching "upgrade".
+    """
+    key = ' '.join(search_terms(text))
+    if key and text[-1:].isspace():
+        key += ' '
+    return key.encode()
+
+class SuggestIndex:
+    """Typeahead over catalog titles, ranked by popularity.
+
+    Each title is stored under up to MAX_ENTRIES_PER_TITLE word-start
+    suffixes in one sorted fixed-width byte array, so a prefix maps to a
+    contiguous range found by binary search. Small ranges are ranked on
+    the fly; for prefixes matching more than SCAN_LIMIT entries the best
+    movies are precomputed. Memory is bounded by the number of entries
+    times KEY_WIDTH + 4 bytes, plus the titles themselves.
+    """
+
+    def __init__(
+        self,
+        keys: np.ndarray,
+        rows: np.ndarray,
+        movie_ids: np.ndarray,
+        titles: List[str],
+        release_dates: List[str],
+        popularity: np.ndarray
+    ) -> None:
+        self.keys = keys
+        self.rows = rows
+        self.movie_ids = movie_ids
+        self.titles = titles
+        self.release_dates = release_dates
+        self.popularity = popularity
+        self.heads = self._build_heads()
+
+    def __len__(self) -> int:
+        return len(self.movie_ids)
+
+    @classmethod
+    def build(cls, movies: Iterable[Dict]) -> "SuggestIndex":
+        """Index movies with id, title, release_date and popularity"""
+        movie_ids, titles, release_dates, popularity = [], [], [], []
+        keys, rows = [], []
+        for row, movie in enumerate(movies):
+            words = search_terms(movie.get('title'))
+            for start in range(min(len(words), MAX_ENTRIES_PER_TITLE)):
+                keys.append(' '.join(words[start:]).encode()[:KEY_WIDTH])
+                rows.append(row)
+            movie_ids.append(movie['id'])
+            titles.append(movie.get('title') or '')
+            release_dates.append(movie.get('release_date'))
+            popularity.append(movie.get('popularity') or 0.0)
+
+        keys = np.array(keys, dtype=f'S{KEY_WIDTH}')
+        order = np.argsort(keys, kind='stable')
+        return cls(
+            keys[order],
+            np.array(rows, dtype=np.int32)[order],
+            np.array(movie_ids, dtype=np.int64),
+            titles,
+            release_dates,
+            np.array(popularity, dtype=np.float32)
+        )
+
+    def _top_rows(self, lo: int, hi: int, k: int) -> np.ndarray:
+        """The k most popular distinct movies among entries lo:hi"""
+        rows = self.rows[lo:hi]
+        scores = self.popularity[rows]
+        n = min(k * MAX_ENTRIES_PER_TITLE, len(rows))
+        best = np.argpartition(-scores, n - 1)[:n] if n < len(rows) else np.arange(len(rows))
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return np.fromiter(dict.fromkeys(rows[best].tolist()), dtype=np.int32)[:k]
+
+    def _build_heads(self) -> Dict[bytes, np.ndarray]:
+        """Precompute results for every prefix whose range exceeds SCAN_LIMIT"""
+        heads = {}
+        pending = [(b'', 0, len(self.keys))]
+        while pending:
+            prefix, lo, hi = pending.pop()
+            width = len(prefix) + 1
+            if width >= KEY_WIDTH:
+                continue
+            truncated = self.keys[lo:hi].astype(f'S{width}')
+            values, starts = np.unique(truncated, return_index=True)
+            ends = np.append(starts[1:], len(truncated))
+            for value, start, end in zip(values.tolist(), starts.tolist(), ends.tolist()):
+                if end - start > SCAN_LIMIT and len(value) == width:
+                    heads[value] = self._top_rows(lo + start, lo + end, MAX_SUGGESTIONS)
+                    pending.append((value, lo + start, lo + end))
+        return heads
+
+    def suggest(self, query: str, limit: int = 10) -> List[Tuple[int, str, str]]:
+        """Return up to limit (movie ID, title, release date) triples for a typed prefix"""
+        prefix = suggest_key(query)[:KEY_WIDTH - 1]
+        if not prefix:
+            return []
+        lo = int(np.searchsorted(self.keys, prefix, 'left'))
+        hi = int(np.searchsorted(self.keys, prefix + b'\xff', 'left'))
+        if hi <= lo:
+            return []
+        rows = self.heads.get(prefix) if hi - lo > SCAN_LIMIT else None
+        rows = rows[:limit] if rows is not None else self._top_rows(lo, hi, limit)
+        return [(int(self.movie_ids[row]), self.titles[row], self.release_dates[row]) for row in rows.tolist()]
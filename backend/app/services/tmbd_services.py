@@ -0,0 +1,56 @@
+from ..core.config import Settings
+from ..utils.cache import LRUCache, SQLiteCache, TieredCache
+from ..utils.resilience import CircuitBreaker, RetryPolicy, TokenBucket
+from ..utils.tmdb_client import AsyncTMDBClient, create_http_client
+
+def create_response_cache(settings: Settings) -> TieredCache:
+    """Build the TMDB response cache from settings"""
+    shared = None
+    if settings.cache_sqlite_path:
+        shared = SQLiteCache(
+            settings.cache_sqlite_path,
+            max_stale=settings.cache_max_stale,
+            timeout=settings.cache_sqlite_timeout
+        )
+    return TieredCache(LRUCache(settings.cache_max_entries, max_stale=settings.cache_max_stale), shared)
+
+def create_tmdb_client(settings: Settings) -> AsyncTMDBClient:
+    """Build a pooled, cached and rate-limited TMDB client from settings"""
+    http_client = create_http_client(
+        max_connections=settings.tmdb_max_connections,
+        max_keepalive_connections=settings.tmdb_max_keepalive_connections,
+        keepalive_expiry=settings.tmdb_keepalive_expiry,
+        timeout=settings.tmdb_timeout,
+        connect_timeout=settings.tmdb_connect_timeout
+    )
+    return AsyncTMDBClient(
+        settings.tmdb_api_key,
+        http_client=http_client,
+        base_url=settings.tmdb_api_base_url,
+        cache=create_response_cache(settings) if settings.cache_enabled else None,
+        cache_ttls={
+            'details': settings.cache_ttl_details,
+            'recommendations': settings.cache_ttl_recommendations,
+            'search': settings.cache_ttl_search,
+            'popular': settings.cache_ttl_popular
+        },
+        rate_limiter=(
+            TokenBucket(settings.tmdb_rate_limit, settings.tmdb_rate_burst)
+            if settings.tmdb_rate_limit > 0 else None
+        ),
+        retry_policy=RetryPolicy(
+            max_retries=settings.tmdb_max_retries,
+            base_delay=settings.tmdb_backoff_base,
+            max_delay=settings.tmdb_backoff_max
+        ),
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=settings.tmdb_breaker_threshold,
+            reset_timeout=settings.tmdb_breaker_reset
+        )
+    )
+
+async def close_tmdb_client(client: AsyncTMDBClient) -> None:
+    """Release the connection pool and shared cache of a client"""
+    await client.aclose()
+    if client.cache is not None and client.cache.shared is not None:
+        client.cache.shared.close()
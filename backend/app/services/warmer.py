@@ -0,0 +1,188 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import select
+from ..db.models import Movie, MovieNeighbor
+from ..db.session import AsyncSessionLocal
+from ..models.movie import MovieRecommendationResponse, MovieSearchResponse
+from ..utils.cache import LRUCache, make_cache_key
+from ..utils.error_handlers import TMDBError
+from ..utils.responses import CachedBody, page_json
+from ..utils.tmdb_client import AsyncTMDBClient, endpoint_category
+from . import catalog
+from .recommender import ContentRecommender
+
+logger = logging.getLogger(__name__)
+
+class CacheWarmer:
+    """Keep the head of the traffic distribution cached before anyone asks.
+
+    A run refreshes the first popular pages in every configured language.
+    It then takes the top_movies titles from the catalog language's
+    popular list and refreshes their catalog rows (or cached details when
+    the catalog is off). For titles that have no local recommendations,
+    it also refreshes their first TMDB recommendations page. Anything
+    that will still be fresh in min_ttl seconds is left alone, so a warmer
+    running every min_ttl seconds keeps these entries from ever expiring.
+    With a response_cache, the encoded bodies the routes serve for those
+    TMDB responses are refreshed too.
+    """
+
+    def __init__(
+        self,
+        client: AsyncTMDBClient,
+        languages: Sequence[str] = ('en-US',),
+        popular_pages: int = 5,
+        top_movies: int = 100,
+        min_ttl: float = 0.0,
+        concurrency: int = 4,
+        catalog_language: str = 'en-US',
+        catalog_enabled: bool = True,
+        catalog_max_age: timedelta = timedelta(hours=24),
+        get_recommender: Callable[[], Optional[ContentRecommender]] = lambda: None,
+        session_factory=AsyncSessionLocal,
+        response_cache: Optional[LRUCache] = None
+    ) -> None:
+        self.client = client
+        self.languages = list(languages)
+        self.popular_pages = popular_pages
+        self.top_movies = top_movies
+        self.min_ttl = min_ttl
+        self.concurrency = concurrency
+        self.catalog_language = catalog_language
+        self.catalog_enabled = catalog_enabled
+        self.catalog_max_age = catalog_max_age
+        self.get_recommender = get_recommender
+        self.session_factory = session_factory
+        self.response_cache = response_cache
+
+    async def run(self) -> Dict[str, int]:
+        """Warm everything that is due; return how many entries of each kind were refreshed"""
+        counts: Counter = Counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def warm(kind: str, fn: Callable[[], Awaitable[bool]]) -> None:
+            async with semaphore:
+                if await fn():
+                    counts[kind] += 1
+
+        async def warm_all(steps: List[Tuple[str, Callable[[], Awaitable[bool]]]]) -> None:
+            # One failing lookup or catalog write must not abort the rest of the run
+            results = await asyncio.gather(*(warm(kind, fn) for kind, fn in steps), return_exceptions=True)
+            for (kind, _), result in zip(steps, results):
+                if isinstance(result, Exception):
+                    counts['failed'] += 1
+                    logger.warning("Failed to warm %s: %s", kind, result)
+
+        await warm_all([
+            ('popular', lambda page=page, language=language: self.warm_response(
+                'movie/popular', {'page': page, 'language': language},
+                lambda: self.client.get_popular_movies(page, language),
+                lambda result: page_json(result, MovieSearchResponse)
+            ))
+            for language in self.languages
+            for page in range(1, self.popular_pages + 1)
+        ])
+
+        movie_ids = await self.top_movie_ids()
+        language = self.catalog_language
+        if self.catalog_enabled:
+            details = [
+                lambda movie_id=movie_id: self.refresh_catalog_movie(movie_id)
+                for movie_id in await self.stale_catalog_ids(movie_ids)
+            ]
+        else:
+            details = [
+                lambda movie_id=movie_id: self.warm_response(
+                    f"movie/{movie_id}", {'language': language},
+                    lambda: self.client.get_movie_details(movie_id, language),
+                    catalog.details_json
+                )
+                for movie_id in movie_ids
+            ]
+        local = await self.locally_recommended_ids(movie_ids)
+        await warm_all([('details', fn) for fn in details] + [
+            ('recommendations', lambda movie_id=movie_id: self.warm_response(
+                f"movie/{movie_id}/recommendations", {'page': 1, 'language': language},
+                lambda: self.client.get_movie_recommendations(movie_id, 1, language),
+                lambda result: page_json(result, MovieRecommendationResponse)
+            ))
+            for movie_id in movie_ids if movie_id not in local
+        ])
+        return dict(counts)
+
+    async def warm_response(
+        self,
+        endpoint: str,
+        params: Dict,
+        fetch: Callable[[], Awaitable[Dict]],
+        encode: Callable[[Dict], bytes]
+    ) -> bool:
+        """Refresh a TMDB response, then the encoded body the routes cache for it.
+
+        The body is stored under the key and TTL the routes use, so the
+        first request after the old entry expires does not re-encode it.
+        """
+        warmed = await self.client.warm(endpoint, params, self.min_ttl)
+        if self.response_cache is None:
+            return warmed
+        key = make_cache_key(endpoint, params)
+        ttl = self.response_cache.ttl(key)
+        if not warmed and ttl is not None and ttl > self.min_ttl:
+            return False
+        # Served from the client cache the warm call just refreshed
+        result = await fetch()
+        self.response_cache.set(
+            key,
+            CachedBody.of(encode(result), last_modified=datetime.utcnow()),
+            self.client.cache_ttls.get(endpoint_category(endpoint), 0)
+        )
+        return True
+
+    async def top_movie_ids(self) -> List[int]:
+        """The most popular movie IDs in the catalog language, read from the warmed pages"""
+        movie_ids: Dict[int, None] = {}
+        page, total_pages = 1, 1
+        while len(movie_ids) < self.top_movies and page <= total_pages:
+            try:
+                result = await self.client.get_popular_movies(page, self.catalog_language)
+            except TMDBError as e:
+                logger.warning("Could not read popular page %s: %s", page, e)
+                break
+            movie_ids.update(dict.fromkeys(movie['id'] for movie in result['movies']))
+            page, total_pages = page + 1, result['total_pages']
+        return list(movie_ids)[:self.top_movies]
+
+    async def stale_catalog_ids(self, movie_ids: List[int]) -> List[int]:
+        """IDs that are missing from the catalog or will be stale within min_ttl"""
+        if not movie_ids:
+            return []
+        cutoff = datetime.utcnow() - self.catalog_max_age + timedelta(seconds=self.min_ttl)
+        async with self.session_factory() as db:
+            fresh = set(await db.scalars(
+                select(Movie.id).where(Movie.id.in_(movie_ids), Movie.fetched_at > cutoff)
+            ))
+        return [movie_id for movie_id in movie_ids if movie_id not in fresh]
+
+    async def locally_recommended_ids(self, movie_ids: List[int]) -> Set[int]:
+        """IDs whose recommendations are served from neighbors or the content recommender"""
+        if not movie_ids:
+            return set()
+        async with self.session_factory() as db:
+            local = set(await db.scalars(
+                select(MovieNeighbor.movie_id)
+                .join(Movie, Movie.id == MovieNeighbor.neighbor_id)
+                .where(MovieNeighbor.movie_id.in_(movie_ids))
+                .distinct()
+            ))
+        recommender = self.get_recommender()
+        if recommender is not None:
+            local.update(movie_id for movie_id in movie_ids if movie_id in recommender)
+        return local
+
+    async def refresh_catalog_movie(self, movie_id: int) -> bool:
+        if not await catalog.refresh_movie(self.client, movie_id, self.catalog_language):
+            raise TMDBError(f"Movie {movie_id} could not be refreshed")
+        return True
@@ -4,11 +4,15 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from ..models.user import TokenData, UserInDB
 from ..core.config import get_settings
 from ..db.session import get_db
 from ..db.models import User
+from .cache import LRUCache
+from .hashing import PasswordHasher
 
 settings = get_settings()
 
@@ -16,12 +20,26 @@ settings = get_settings()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Authenticated users and their preferences by token subject. Entries are
+# snapshots, so writes on this worker must call invalidate_principal; other
+# workers see changes once the short TTL runs out.
+principal_cache = LRUCache(settings.auth_principal_cache_size)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+# Request handlers hash through this pool so bcrypt never blocks the event loop
+password_hasher = PasswordHasher(
+    get_password_hash,
+    verify_password,
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_queue_size,
+    use_processes=settings.password_hash_processes
+)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -32,10 +50,25 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
+def invalidate_principal(username: str) -> None:
+    """Drop a cached user after their account or preferences change"""
+    principal_cache.delete(username)
+
+async def load_principal(db: AsyncSession, username: str) -> Optional[UserInDB]:
+    """Load a user and their preferences as a detached snapshot"""
+    user = await db.scalar(
+        select(User)
+        .options(joinedload(User.preferences))
+        .where(User.username == username)
+    )
+    if user is None:
+        return None
+    return UserInDB.model_validate(user, from_attributes=True)
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> UserInDB:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -50,7 +83,12 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == token_data.username).first()
+    user = principal_cache.get(token_data.username)
     if user is None:
-        raise credentials_exception
+        user = await load_principal(db, token_data.username)
+        if user is None:
+            raise credentials_exception
+        principal_cache.set(token_data.username, user, settings.auth_principal_cache_ttl)
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
     return user 
\ No newline at end of file
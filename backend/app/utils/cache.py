@@ -0,0 +1,296 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlencode
+
+class CacheStats:
+    """Hit/miss/eviction counters for a cache tier"""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'stale_hits': self.stale_hits,
+            'hit_ratio': round(self.hit_ratio, 4)
+        }
+
+class LRUCache:
+    """In-process LRU cache with a per-entry TTL.
+
+    Expired entries are kept for up to max_stale seconds so they can still
+    be served through get_stale() while the upstream is unavailable.
+    """
+
+    def __init__(self, max_size: int = 1024, clock: Callable[[], float] = time.monotonic, max_stale: float = 0) -> None:
+        if max_size < 1:
+            raise ValueError("Cache size must be a positive integer")
+        self.max_size = max_size
+        self.clock = clock
+        self.max_stale = max_stale
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, value = entry
+            now = self.clock()
+            if expires_at <= now:
+                if expires_at + self.max_stale <= now:
+                    del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Return the cached value even if expired, within max_stale"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] + self.max_stale <= self.clock():
+                return None
+            self.stats.stale_hits += 1
+            return entry[1]
+
+    def ttl(self, key: str) -> Optional[float]:
+        """Return the remaining lifetime of an entry in seconds"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return max(entry[0] - self.clock(), 0.0)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a value for ttl seconds, evicting the least recently used entry when full"""
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class SQLiteCache:
+    """On-disk cache tier shared by every worker process on the host.
+
+    Calls block on disk I/O and on other workers' writes for up to timeout
+    seconds, so async code should go through TieredCache's async methods.
+    A tier that stays locked past the timeout reads as a miss and skips
+    the write rather than failing the request.
+    """
+
+    PURGE_INTERVAL = 500
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time, max_stale: float = 0, timeout: float = 0.5) -> None:
+        self.path = path
+        self.clock = clock
+        self.max_stale = max_stale
+        self.stats = CacheStats()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[tuple]:
+        """Return (value, remaining ttl), or None if missing or expired"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        if row is None:
+            self.stats.misses += 1
+            return None
+        remaining = row[1] - self.clock()
+        if remaining <= 0:
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return json.loads(row[0]), remaining
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Return the cached value even if expired, within max_stale"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM response_cache WHERE key = ? AND expires_at > ?",
+                    (key, self.clock() - self.max_stale)
+                ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        if row is None:
+            return None
+        self.stats.stale_hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        data = json.dumps(value)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, data, self.clock() + ttl)
+                )
+                self._writes += 1
+                if self._writes % self.PURGE_INTERVAL == 0:
+                    cursor = self._conn.execute(
+                        "DELETE FROM response_cache WHERE expires_at <= ?",
+                        (self.clock() - self.max_stale,)
+                    )
+                    self.stats.evictions += cursor.rowcount
+        except sqlite3.OperationalError:
+            pass  # Another worker holds the write lock; the memory tier still has the value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+
+    def close(self) -> None:
+        self._conn.close()
+
+class TieredCache:
+    """In-process LRU in front of an optional shared SQLite tier.
+
+    The a-prefixed methods serve the memory tier inline and run the shared
+    tier in a worker thread, so event loop code never waits on SQLite.
+    """
+
+    def __init__(self, memory: LRUCache, shared: Optional[SQLiteCache] = None) -> None:
+        self.memory = memory
+        self.shared = shared
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None or self.shared is None:
+            return value
+        entry = self.shared.get(key)
+        if entry is None:
+            return None
+        value, remaining = entry
+        self.memory.set(key, value, remaining)
+        return value
+
+    async def aget(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None or self.shared is None:
+            return value
+        entry = await asyncio.to_thread(self.shared.get, key)
+        if entry is None:
+            return None
+        value, remaining = entry
+        self.memory.set(key, value, remaining)
+        return value
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Return a possibly expired value from either tier"""
+        value = self.memory.get_stale(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get_stale(key)
+        return value
+
+    async def aget_stale(self, key: str) -> Optional[Any]:
+        value = self.memory.get_stale(key)
+        if value is None and self.shared is not None:
+            value = await asyncio.to_thread(self.shared.get_stale, key)
+        return value
+
+    def ttl(self, key: str) -> Optional[float]:
+        """Remaining lifetime of the in-process entry, if there is one"""
+        return self.memory.ttl(key)
+
+    async def attl(self, key: str) -> Optional[float]:
+        """Remaining lifetime in either tier, copying a fresher shared entry into memory.
+
+        Another worker may have refreshed the shared tier since this one
+        last read the key, in which case its entry outlives the local one.
+        """
+        remaining = self.memory.ttl(key)
+        if self.shared is None:
+            return remaining
+        entry = await asyncio.to_thread(self.shared.get, key)
+        if entry is None or (remaining is not None and entry[1] <= remaining):
+            return remaining
+        value, remaining = entry
+        self.memory.set(key, value, remaining)
+        return remaining
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.memory.set(key, value, ttl)
+        if self.shared is not None:
+            self.shared.set(key, value, ttl)
+
+    async def aset(self, key: str, value: Any, ttl: float) -> None:
+        self.memory.set(key, value, ttl)
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.set, key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {'memory': self.memory.stats.as_dict()}
+        if self.shared is not None:
+            stats['shared'] = self.shared.stats.as_dict()
+        return stats
+
+def make_cache_key(endpoint: str, params: Optional[Dict] = None) -> str:
+    """Build a stable key from an endpoint and its query parameters"""
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if k != 'api_key')
+    return f"{endpoint}?{urlencode(items)}"
@@ -1,5 +1,6 @@
 import requests
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from .resilience import parse_retry_after
 
 class TMDBError(Exception):
     """Base exception for TMDB API errors"""
@@ -7,7 +8,25 @@ class TMDBError(Exception):
 
 class TMDBAPIError(TMDBError):
     """Exception for API-related errors"""
-    pass
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        transient: bool = False
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        # Transient errors (network, rate limiting, server errors) are worth retrying
+        self.transient = transient or status_code == 429 or (status_code or 0) >= 500
+
+class TMDBUnavailableError(TMDBAPIError):
+    """Exception raised while the TMDB circuit breaker is open"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message, retry_after=retry_after, transient=True)
 
 class TMDBInvalidIDError(TMDBError):
     """Exception for invalid movie ID"""
@@ -19,14 +38,21 @@ class TMDBInvalidQueryError(TMDBError):
 
 def handle_api_response(response: requests.Response) -> None:
     """Handle common API response errors"""
-    if response.status_code == 401:
-        raise TMDBAPIError("Invalid API key")
-    elif response.status_code == 404:
-        raise TMDBAPIError("Resource not found")
-    elif response.status_code >= 500:
-        raise TMDBAPIError("TMDB API server error")
-    elif response.status_code >= 400:
-        raise TMDBAPIError(f"API error: {response.status_code}")
+    status_code = response.status_code
+    if status_code == 401:
+        raise TMDBAPIError("Invalid API key", status_code)
+    elif status_code == 404:
+        raise TMDBAPIError("Resource not found", status_code)
+    elif status_code == 429:
+        raise TMDBAPIError(
+            "TMDB API rate limit exceeded",
+            status_code,
+            retry_after=parse_retry_after(response.headers.get("Retry-After"))
+        )
+    elif status_code >= 500:
+        raise TMDBAPIError("TMDB API server error", status_code)
+    elif status_code >= 400:
+        raise TMDBAPIError(f"API error: {status_code}", status_code)
 
 def validate_movie_id(movie_id: int) -> None:
     """Validate movie ID"""
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+class HasherStats:
+    """Counters for password hashing load and latency"""
+
+    def __init__(self) -> None:
+        self.completed = 0
+        self.rejected = 0
+        self.max_pending = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.completed += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'max_pending': self.max_pending,
+            'mean_seconds': round(self.total_seconds / self.completed, 6) if self.completed else 0.0,
+            'max_seconds': round(self.max_seconds, 6)
+        }
+
+class PasswordHasher:
+    """Run bcrypt off the event loop on a bounded worker pool.
+
+    bcrypt releases the GIL, so threads hash in parallel; a process pool
+    can be used instead when hashing competes with other CPU work. At most
+    max_workers + max_queue calls may be pending at once, and further calls
+    fail fast with PasswordHasherBusy so a login storm turns into quick 503s
+    instead of an ever-growing backlog.
+    """
+
+    def __init__(
+        self,
+        hash_fn: Callable[[str], str],
+        verify_fn: Callable[[str, str], bool],
+        max_workers: int = 4,
+        max_queue: int = 64,
+        use_processes: bool = False
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.hash_fn = hash_fn
+        self.verify_fn = verify_fn
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self.pending = 0
+        self.stats = HasherStats()
+        self._executor: Optional[Executor] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a free worker"""
+        return max(self.pending - self.max_workers, 0)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.hash_fn, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self.verify_fn, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            pool = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = pool(max_workers=self.max_workers)
+        return self._executor
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        if self.pending >= self.max_workers + self.max_queue:
+            self.stats.rejected += 1
+            raise PasswordHasherBusy("Password hashing queue is full")
+        self.pending += 1
+        self.stats.max_pending = max(self.stats.max_pending, self.pending)
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+            self.stats.record(time.perf_counter() - start)
@@ -0,0 +1,87 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional, Type
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize an already validated model straight to JSON.
+
+    Returning a Response skips FastAPI's response_model handling, which
+    would dump the model, validate the dump again and encode the result.
+    Aliases are used so the output matches the declared response_model.
+    """
+    return Response(model_json(model), status_code=status_code, media_type="application/json")
+
+def model_json(model: BaseModel) -> bytes:
+    """JSON bytes for model, as FastAPI would render it"""
+    return model.__pydantic_serializer__.to_json(model, by_alias=True)
+
+def page_json(result: Dict, model: Type[BaseModel]) -> bytes:
+    """JSON bytes for a formatted TMDB movie list page rendered as model"""
+    return model_json(model(
+        page=result["page"],
+        total_pages=result["total_pages"],
+        total_results=result["total_results"],
+        movies=result["movies"]
+    ))
+
+def make_etag(data: bytes) -> str:
+    """A strong ETag that only depends on data, so every worker agrees on it"""
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+class CachedBody(NamedTuple):
+    """An encoded JSON body with its validators, cached so a 304 needs no serialization"""
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    @classmethod
+    def of(cls, body: bytes, last_modified: Optional[datetime] = None) -> 'CachedBody':
+        return cls(body, make_etag(body), last_modified)
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC or aware datetime as an HTTP date"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None, cache_control: str = '') -> Dict[str, str]:
+    """Validator and freshness headers, sent with both 200 and 304 responses"""
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    if cache_control:
+        headers['Cache-Control'] = cache_control
+    return headers
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when there is none, as RFC 9110 orders them"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        # GET uses the weak comparison, so W/ prefixes are ignored
+        return '*' in tags or etag.removeprefix('W/') in (tag.removeprefix('W/') for tag in tags)
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have no fractional seconds
+    return last_modified.replace(microsecond=0) <= since
+
+def conditional_response(request: Request, cached: CachedBody, cache_control: str = '') -> Response:
+    """Send cached as JSON, or an empty 304 when the client already has it"""
+    headers = cache_headers(cached.etag, cached.last_modified, cache_control)
+    if is_not_modified(request, cached.etag, cached.last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
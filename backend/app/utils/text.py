@@ -0,0 +1,18 @@
+import re
+import unicodedata
+from typing import List, Optional
+
+WORD_PATTERN = re.compile(r"\w+")
+
+def fold(text: str) -> str:
+    """Case-fold text and strip accents, so "Amélie" matches "amelie" """
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+def search_terms(text: Optional[str]) -> List[str]:
+    """Split folded text into words. Stop words are kept, since titles are full of them."""
+    if not text:
+        return []
+    return WORD_PATTERN.findall(fold(text))
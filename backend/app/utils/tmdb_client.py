@@ -1,37 +1,93 @@
+import asyncio
 import os
+import time
+import httpx
 import requests
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from .error_handlers import (
     TMDBError,
     TMDBAPIError,
     TMDBInvalidIDError,
     TMDBInvalidQueryError,
+    TMDBUnavailableError,
     handle_api_response,
     validate_movie_id,
     validate_search_query,
     validate_page_number,
     validate_response_data
 )
+from .cache import TieredCache, make_cache_key
+from .resilience import CircuitBreaker, RetryPolicy, TokenBucket
+from .singleflight import SingleFlight
+from ..core.metrics import record_upstream_call
+
+# Cache lifetimes in seconds per endpoint category
+DEFAULT_CACHE_TTLS = {
+    'details': 6 * 60 * 60,
+    'recommendations': 60 * 60,
+    'search': 15 * 60,
+    'popular': 10 * 60
+}
+
+def endpoint_category(endpoint: str) -> str:
+    """Classify a TMDB endpoint for cache TTL lookup"""
+    if endpoint.startswith('search/'):
+        return 'search'
+    if endpoint == 'movie/popular':
+        return 'popular'
+    if endpoint.endswith('/recommendations'):
+        return 'recommendations'
+    return 'details'
 
 class TMDBClient:
-    def __init__(self, api_key: str) -> None:
-        self.base_url = 'https://api.themoviedb.org/3/'
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = 'https://api.themoviedb.org/3/',
+        cache: Optional[TieredCache] = None,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        timeout: float = 10.0
+    ) -> None:
+        self.base_url = base_url
         self.params = {
             'api_key': api_key
         }
+        self.timeout = timeout
+        self.cache = cache
+        self.cache_ttls = {**DEFAULT_CACHE_TTLS, **(cache_ttls or {})}
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
+
+    def _cache_set(self, key: str, endpoint: str, data: Dict) -> None:
+        if self.cache is not None:
+            self.cache.set(key, data, self.cache_ttls.get(endpoint_category(endpoint), 0))
 
     def _make_request(self, endpoint: str, params: Dict = None) -> Dict:
+        """Make API request, serving repeated calls from the cache"""
+        key = make_cache_key(endpoint, params)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        data = self._fetch(endpoint, params)
+        self._cache_set(key, endpoint, data)
+        return data
+
+    def _fetch(self, endpoint: str, params: Dict = None) -> Dict:
         """Make API request with error handling"""
         try:
             url = f"{self.base_url}{endpoint}"
             request_params = {**self.params, **(params or {})}
             
-            response = requests.get(url, params=request_params)
+            response = requests.get(url, params=request_params, timeout=self.timeout)
             handle_api_response(response)
             
             return response.json()
         except requests.exceptions.RequestException as e:
-            raise TMDBAPIError(f"Network error: {str(e)}")
+            raise TMDBAPIError(f"Network error: {str(e)}", transient=True)
         except TMDBAPIError:
             raise
         except Exception as e:
@@ -53,6 +109,15 @@ class TMDBClient:
             'genres': movie.get('genre_ids', [])
         }
 
+    def _format_movie_list(self, data: Dict) -> Dict:
+        """Format a paginated list of movies"""
+        return {
+            'page': data.get('page'),
+            'total_pages': data.get('total_pages'),
+            'total_results': data.get('total_results'),
+            'movies': [self._format_movie(movie) for movie in data.get('results', [])]
+        }
+
     def _format_movie_details(self, movie: Dict) -> Dict:
         """Format detailed movie data"""
         basic_info = self._format_movie(movie)
@@ -65,7 +130,10 @@ class TMDBClient:
             'genres': [{'id': g['id'], 'name': g['name']} for g in movie.get('genres', [])],
             'production_companies': [{'id': c['id'], 'name': c['name']} for c in movie.get('production_companies', [])],
             'status': movie.get('status'),
-            'original_language': movie.get('original_language')
+            'original_language': movie.get('original_language'),
+            'original_title': movie.get('original_title'),
+            'popularity': movie.get('popularity'),
+            'adult': movie.get('adult', False)
         }
 
     def search_movies(self, query: str, page: int = 1, language: str = 'en-US') -> Dict:
@@ -82,12 +150,7 @@ class TMDBClient:
             
             validate_response_data(data, ['results', 'page'])
             
-            return {
-                'page': data.get('page'),
-                'total_pages': data.get('total_pages'),
-                'total_results': data.get('total_results'),
-                'movies': [self._format_movie(movie) for movie in data.get('results', [])]
-            }
+            return self._format_movie_list(data)
         except (TMDBAPIError, TMDBInvalidQueryError) as e:
             raise
         except Exception as e:
@@ -119,12 +182,7 @@ class TMDBClient:
             
             validate_response_data(data, ['results', 'page'])
             
-            return {
-                'page': data.get('page'),
-                'total_pages': data.get('total_pages'),
-                'total_results': data.get('total_results'),
-                'movies': [self._format_movie(movie) for movie in data.get('results', [])]
-            }
+            return self._format_movie_list(data)
         except (TMDBAPIError, ValueError) as e:
             raise
         except Exception as e:
@@ -143,13 +201,247 @@ class TMDBClient:
             
             validate_response_data(data, ['results', 'page'])
             
-            return {
-                'page': data.get('page'),
-                'total_pages': data.get('total_pages'),
-                'total_results': data.get('total_results'),
-                'movies': [self._format_movie(movie) for movie in data.get('results', [])]
-            }
+            return self._format_movie_list(data)
+        except (TMDBAPIError, TMDBInvalidIDError) as e:
+            raise
+        except Exception as e:
+            raise TMDBError(f"Error getting movie recommendations: {str(e)}") 
+
+def create_http_client(
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    timeout: float = 10.0,
+    connect_timeout: float = 5.0
+) -> httpx.AsyncClient:
+    """Create a pooled HTTP client to be shared by all AsyncTMDBClient users"""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        ),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout)
+    )
+
+
+class AsyncTMDBClient(TMDBClient):
+    """Non-blocking TMDB client backed by a shared httpx.AsyncClient.
+
+    The HTTP client owns the connection pool, so one instance should be
+    created at startup and reused for every request. Upstream calls go
+    through an optional token-bucket rate limiter, are retried with
+    jittered backoff on transient errors, and are short-circuited while
+    TMDB is failing, in which case stale cache entries are served.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        base_url: str = 'https://api.themoviedb.org/3/',
+        cache: Optional[TieredCache] = None,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ) -> None:
+        super().__init__(api_key, base_url, cache, cache_ttls)
+        self.http_client = http_client or create_http_client()
+        self.inflight = SingleFlight()
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=0)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool"""
+        await self.http_client.aclose()
+
+    async def _make_request(self, endpoint: str, params: Dict = None) -> Dict:
+        """Make API request, serving repeated calls from the cache.
+
+        Concurrent identical requests that miss the cache share a single
+        upstream call and its result or error.
+        """
+        key = make_cache_key(endpoint, params)
+        cached = await self.cache.aget(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+
+        return await self.inflight.do(key, lambda: self._fetch_and_cache(key, endpoint, params))
+
+    async def warm(self, endpoint: str, params: Dict = None, min_ttl: float = 0.0) -> bool:
+        """Fetch a response into the cache unless it stays fresh for min_ttl more seconds.
+
+        The shared tier is consulted before calling TMDB, so a key another
+        worker just refreshed is not fetched again. Returns whether TMDB was called.
+        """
+        if self.cache is None:
+            return False
+        key = make_cache_key(endpoint, params)
+        ttl = self.cache.ttl(key)
+        if ttl is None or ttl <= min_ttl:
+            ttl = await self.cache.attl(key)
+        if ttl is not None and ttl > min_ttl:
+            return False
+        await self.inflight.do(key, lambda: self._fetch_and_cache(key, endpoint, params))
+        return True
+
+    async def _fetch_and_cache(self, key: str, endpoint: str, params: Dict = None) -> Dict:
+        try:
+            data = await self._fetch_with_retry(endpoint, params)
+        except TMDBAPIError as e:
+            stale = await self.cache.aget_stale(key) if e.transient and self.cache is not None else None
+            if stale is not None:
+                return stale
+            raise
+        if self.cache is not None:
+            await self.cache.aset(key, data, self.cache_ttls.get(endpoint_category(endpoint), 0))
+        return data
+
+    async def _fetch_with_retry(self, endpoint: str, params: Dict = None) -> Dict:
+        """Fetch with rate limiting, bounded retries and circuit breaking"""
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow():
+                raise TMDBUnavailableError(
+                    "TMDB API temporarily unavailable",
+                    retry_after=self.circuit_breaker.retry_after()
+                )
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            try:
+                data = await self._fetch(endpoint, params)
+            except TMDBAPIError as e:
+                if not e.transient:
+                    self.circuit_breaker.record_success()
+                    raise
+                self.circuit_breaker.record_failure()
+                delay = self.retry_policy.delay(attempt, e.retry_after)
+                if attempt >= self.retry_policy.max_retries or delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.circuit_breaker.record_success()
+            return data
+
+    async def _fetch(self, endpoint: str, params: Dict = None) -> Dict:
+        """Make API request with error handling"""
+        status = "error"
+        start = time.perf_counter()
+        try:
+            url = f"{self.base_url}{endpoint}"
+            request_params = {**self.params, **(params or {})}
+
+            try:
+                response = await self.http_client.get(url, params=request_params)
+                status = str(response.status_code)
+            finally:
+                record_upstream_call(endpoint_category(endpoint), status, time.perf_counter() - start)
+            handle_api_response(response)
+
+            return response.json()
+        except httpx.HTTPError as e:
+            raise TMDBAPIError(f"Network error: {str(e)}", transient=True)
+        except TMDBAPIError:
+            raise
+        except Exception as e:
+            raise TMDBError(f"Unexpected error: {str(e)}")
+
+    async def search_movies(self, query: str, page: int = 1, language: str = 'en-US') -> Dict:
+        """Search for movies"""
+        try:
+            validate_search_query(query)
+            validate_page_number(page)
+
+            data = await self._make_request('search/movie', {
+                'query': query,
+                'page': page,
+                'language': language
+            })
+
+            validate_response_data(data, ['results', 'page'])
+
+            return self._format_movie_list(data)
+        except (TMDBAPIError, TMDBInvalidQueryError) as e:
+            raise
+        except Exception as e:
+            raise TMDBError(f"Error searching movies: {str(e)}")
+
+    async def get_movie_details(self, movie_id: int, language: str = 'en-US') -> Dict:
+        """Get detailed information about a specific movie"""
+        try:
+            validate_movie_id(movie_id)
+
+            data = await self._make_request(f"movie/{movie_id}", {'language': language})
+            validate_response_data(data, ['id', 'title'])
+
+            return self._format_movie_details(data)
+        except (TMDBAPIError, TMDBInvalidIDError) as e:
+            raise
+        except Exception as e:
+            raise TMDBError(f"Error getting movie details: {str(e)}")
+
+    async def get_movie_details_many(self, movie_ids: List[int], language: str = 'en-US', concurrency: int = 10) -> Dict:
+        """Get details for several movies concurrently.
+
+        At most `concurrency` lookups run at once. Duplicate IDs are fetched
+        once, and a failing ID is reported in `errors` instead of failing
+        the whole batch, flagged transient when a later retry could succeed.
+        """
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        unique_ids = list(dict.fromkeys(movie_ids))
+
+        async def fetch(movie_id: int) -> Dict:
+            async with semaphore:
+                return await self.get_movie_details(movie_id, language)
+
+        results = await asyncio.gather(*(fetch(movie_id) for movie_id in unique_ids), return_exceptions=True)
+
+        movies, errors = [], []
+        for movie_id, result in zip(unique_ids, results):
+            if isinstance(result, Exception):
+                # Invalid IDs and TMDB client errors fail again; anything else may not
+                transient = getattr(result, 'transient', not isinstance(result, TMDBInvalidIDError))
+                errors.append({'id': movie_id, 'detail': str(result), 'transient': transient})
+            else:
+                movies.append(result)
+        return {'movies': movies, 'errors': errors}
+
+    async def get_popular_movies(self, page: int = 1, language: str = 'en-US') -> Dict:
+        """Get popular movies"""
+        try:
+            validate_page_number(page)
+
+            data = await self._make_request('movie/popular', {
+                'page': page,
+                'language': language
+            })
+
+            validate_response_data(data, ['results', 'page'])
+
+            return self._format_movie_list(data)
+        except (TMDBAPIError, ValueError) as e:
+            raise
+        except Exception as e:
+            raise TMDBError(f"Error getting popular movies: {str(e)}")
+
+    async def get_movie_recommendations(self, movie_id: int, page: int = 1, language: str = 'en-US') -> Dict:
+        """Get movie recommendations based on a movie"""
+        try:
+            validate_movie_id(movie_id)
+            validate_page_number(page)
+
+            data = await self._make_request(f"movie/{movie_id}/recommendations", {
+                'page': page,
+                'language': language
+            })
+
+            validate_response_data(data, ['results', 'page'])
+
+            return self._format_movie_list(data)
         except (TMDBAPIError, TMDBInvalidIDError) as e:
             raise
         except Exception as e:
-            raise TMDBError(f"Error getting movie recommendations: {str(e)}") 
\ No newline at end of file
+            raise TMDBError(f"Error getting movie recommendations: {str(e)}")
@@ -0,0 +1,158 @@
+"""Local stand-in for the TMDB API used by the benchmarks.
+
+Usage:
+    python -m benchmarks.fake_tmdb --port 8765 --latency-ms 40 --error-rate 0.01
+
+Serves deterministic movies for the endpoints the app calls, with
+configurable latency, error rate and payload size, so benchmark runs do
+not depend on the network or on TMDB quotas.
+"""
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Dict, List
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+GENRES = [
+    (28, "Action"), (12, "Adventure"), (16, "Animation"), (35, "Comedy"), (80, "Crime"),
+    (99, "Documentary"), (18, "Drama"), (10751, "Family"), (14, "Fantasy"), (36, "History"),
+    (27, "Horror"), (10402, "Music"), (9648, "Mystery"), (10749, "Romance"), (878, "Science Fiction"),
+    (53, "Thriller"), (10752, "War"), (37, "Western")
+]
+WORDS = (
+    "night city last star river ghost iron summer shadow king dream storm empire silent "
+    "return secret road heart winter blood lost house journey fire moon island war edge"
+).split()
+
+@dataclass
+class FakeTMDBConfig:
+    """How the fake server behaves"""
+    latency_ms: float = 40.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    results_per_page: int = 20
+    overview_words: int = 60
+    total_movies: int = 100000
+    seed: int = 0
+
+def fake_movie(movie_id: int, overview_words: int = 60) -> Dict:
+    """Raw TMDB details for movie_id, identical on every call"""
+    rng = random.Random(movie_id)
+    genres = rng.sample(GENRES, rng.randint(1, 3))
+    title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+    return {
+        'id': movie_id,
+        'title': title,
+        'original_title': title,
+        'overview': ' '.join(rng.choice(WORDS) for _ in range(overview_words)),
+        'tagline': ' '.join(rng.choice(WORDS) for _ in range(5)),
+        'poster_path': f"/poster{movie_id}.jpg",
+        'backdrop_path': f"/backdrop{movie_id}.jpg",
+        'release_date': f"{rng.randint(1950, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        'vote_average': round(rng.uniform(1, 10), 1),
+        'popularity': round(rng.uniform(0, 500), 3),
+        'runtime': rng.randint(70, 200),
+        'budget': rng.randint(0, 200) * 1000000,
+        'revenue': rng.randint(0, 800) * 1000000,
+        'status': "Released",
+        'original_language': "en",
+        'adult': False,
+        'genre_ids': [id for id, _ in genres],
+        'genres': [{'id': id, 'name': name} for id, name in genres],
+        'production_companies': [{'id': movie_id % 997 + 1, 'name': f"Studio {movie_id % 997 + 1}"}]
+    }
+
+def movie_summary(movie: Dict) -> Dict:
+    """The subset of details TMDB returns in list endpoints"""
+    return {
+        key: movie[key] for key in (
+            'id', 'title', 'overview', 'poster_path', 'backdrop_path', 'release_date', 'vote_average', 'genre_ids'
+        )
+    }
+
+def create_app(config: FakeTMDBConfig) -> FastAPI:
+    """Build the fake TMDB app for config"""
+    app = FastAPI(title="Fake TMDB")
+    rng = random.Random(config.seed)
+    total_pages = max(config.total_movies // config.results_per_page, 1)
+
+    async def respond(payload) -> JSONResponse:
+        delay = max(rng.gauss(config.latency_ms, config.jitter_ms), 0.0) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+        if config.error_rate and rng.random() < config.error_rate:
+            headers = {'Retry-After': '1'} if config.error_status == 429 else None
+            return JSONResponse({'status_message': "Injected failure"}, config.error_status, headers)
+        return JSONResponse(payload)
+
+    def page_of(ids: List[int], page: int) -> Dict:
+        return {
+            'page': page,
+            'total_pages': total_pages,
+            'total_results': total_pages * config.results_per_page,
+            'results': [movie_summary(fake_movie(id, config.overview_words)) for id in ids]
+        }
+
+    def ids_for(key: int, page: int) -> List[int]:
+        page_rng = random.Random(key * 100003 + page)
+        return [page_rng.randint(1, config.total_movies) for _ in range(config.results_per_page)]
+
+    @app.get("/3/search/movie")
+    async def search(query: str, page: int = Query(1, ge=1)):
+        return await respond(page_of(ids_for(sum(map(ord, query)), page), page))
+
+    @app.get("/3/movie/popular")
+    async def popular(page: int = Query(1, ge=1)):
+        start = (page - 1) * config.results_per_page + 1
+        return await respond(page_of(list(range(start, start + config.results_per_page)), page))
+
+    @app.get("/3/movie/{movie_id}/recommendations")
+    async def recommendations(movie_id: int, page: int = Query(1, ge=1)):
+        return await respond(page_of(ids_for(movie_id, page), page))
+
+    @app.get("/3/movie/{movie_id}")
+    async def details(movie_id: int):
+        if not 0 < movie_id <= config.total_movies:
+            return JSONResponse({'status_message': "Not found"}, 404)
+        return await respond(fake_movie(movie_id, config.overview_words))
+
+    return app
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Mean upstream response time")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Standard deviation of the response time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of responses that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="Status code of injected failures")
+    parser.add_argument("--results-per-page", type=int, default=20, help="Movies in each list response")
+    parser.add_argument("--overview-words", type=int, default=60, help="Words per overview, to scale payloads")
+    parser.add_argument("--total-movies", type=int, default=100000, help="Size of the fake catalog")
+
+def config_from_args(args: argparse.Namespace) -> FakeTMDBConfig:
+    return FakeTMDBConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        results_per_page=args.results_per_page,
+        overview_words=args.overview_words,
+        total_movies=args.total_movies,
+        seed=args.seed
+    )
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve a fake TMDB API for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency and failure injection")
+    add_config_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = parse_args()
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,383 @@
+"""Drive the API with concurrent load against a local TMDB stand-in.
+
+Usage:
+    python -m benchmarks.run --requests 1000 --concurrency 32
+    python -m benchmarks.run --scenarios details,search --baseline benchmarks/results/<earlier>.json
+
+Starts benchmarks.fake_tmdb in a subprocess, seeds a throwaway SQLite
+catalog, and runs each scenario in-process against the app through an
+ASGI transport. Every scenario reports throughput, latency percentiles
+and, unless --no-allocations is given, memory allocated while serving a
+sample of its requests under tracemalloc. Results are written as JSON
+with the current git commit so runs can be compared across commits.
+
+Any application setting can be overridden through its environment
+variable as usual, e.g. tmdb_rate_limit=0 to take the client-side rate
+limiter out of the measurement.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from .fake_tmdb import WORDS, add_config_arguments, fake_movie
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# A request is (method, path, headers)
+Request = Tuple[str, str, Optional[Dict[str, str]]]
+
+@dataclass
+class Scenario:
+    """A named request mix; scale shrinks the request count for expensive endpoints"""
+    name: str
+    make_request: Callable[[random.Random, "BenchmarkState"], Request]
+    scale: float = 1.0
+
+class BenchmarkState:
+    """Data shared by the request generators"""
+
+    def __init__(self, id_space: int) -> None:
+        self.id_space = id_space
+        self.users: List[Tuple[str, str]] = []  # (username, password)
+        self.tokens: List[str] = []
+
+    def auth(self, rng: random.Random) -> Dict[str, str]:
+        return {'Authorization': f"Bearer {rng.choice(self.tokens)}"}
+
+def search_request(rng: random.Random, state: BenchmarkState) -> Request:
+    query = ' '.join(rng.sample(WORDS, 2))
+    return 'GET', f"/movies/search?query={query}&page={rng.randint(1, 3)}", None
+
+def details_request(rng: random.Random, state: BenchmarkState) -> Request:
+    return 'GET', f"/movies/{rng.randint(1, state.id_space)}", None
+
+def popular_request(rng: random.Random, state: BenchmarkState) -> Request:
+    return 'GET', f"/movies/popular?page={rng.randint(1, 10)}", None
+
+def recommendations_request(rng: random.Random, state: BenchmarkState) -> Request:
+    return 'GET', f"/movies/{rng.randint(1, state.id_space)}/recommendations", None
+
+def user_request(rng: random.Random, state: BenchmarkState) -> Request:
+    roll = rng.random()
+    if roll < 0.3:
+        path, method = "/users/me", 'GET'
+    elif roll < 0.5:
+        path, method = "/users/me/preferences", 'GET'
+    elif roll < 0.7:
+        path, method = "/users/me/recommendations", 'GET'
+    elif roll < 0.85:
+        path, method = f"/users/me/watchlist/{rng.randint(1, state.id_space)}", 'POST'
+    else:
+        path, method = f"/users/me/watchlist/{rng.randint(1, state.id_space)}", 'DELETE'
+    return method, path, state.auth(rng)
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in (
+        Scenario('search', search_request),
+        Scenario('details', details_request),
+        Scenario('popular', popular_request),
+        Scenario('recommendations', recommendations_request),
+        Scenario('users', user_request),
+        # Logins are dominated by bcrypt, so fewer of them keep runs short
+        Scenario('login', lambda rng, state: ('POST', "/users/token", None), scale=0.1)
+    )
+}
+
+def summarize(latencies: List[float], statuses: Counter, wall_seconds: float) -> Dict:
+    """Throughput and latency percentiles (in milliseconds) for one scenario"""
+    millis = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(millis, [50, 95, 99]) if len(millis) else (0.0, 0.0, 0.0)
+    return {
+        'requests': len(latencies),
+        'errors': sum(count for status, count in statuses.items() if status == 'error' or int(status) >= 500),
+        'statuses': dict(sorted(statuses.items())),
+        'duration_s': round(wall_seconds, 3),
+        'throughput_rps': round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        'mean_ms': round(float(millis.mean()), 3) if len(millis) else 0.0,
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'max_ms': round(float(millis.max()), 3) if len(millis) else 0.0
+    }
+
+def compare_results(baseline: Dict, current: Dict) -> List[Dict]:
+    """Relative change of throughput and latency per scenario present in both runs"""
+    rows = []
+    for name, result in current['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            continue
+        row = {'scenario': name}
+        for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            row[key] = round((result[key] - base[key]) / base[key] * 100, 1) if base[key] else None
+        rows.append(row)
+    return rows
+
+async def run_requests(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    state: BenchmarkState,
+    count: int,
+    concurrency: int,
+    seed: int
+) -> Tuple[List[float], Counter, float]:
+    """Issue count requests from concurrency workers; return latencies, status counts and wall time"""
+    rng = random.Random(f"{seed}:{scenario.name}")
+    requests = [scenario.make_request(rng, state) for _ in range(count)]
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    position = 0
+
+    async def worker():
+        nonlocal position
+        while position < len(requests):
+            method, path, headers = requests[position]
+            position += 1
+            data = None
+            if scenario.name == 'login':
+                username, password = state.users[position % len(state.users)]
+                data = {'username': username, 'password': password}
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, headers=headers, data=data)
+                statuses[str(response.status_code)] += 1
+            except Exception:
+                statuses['error'] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, count))))
+    return latencies, statuses, time.perf_counter() - start
+
+async def measure_allocations(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    state: BenchmarkState,
+    count: int,
+    concurrency: int,
+    seed: int,
+    top: int = 5
+) -> Dict:
+    """Memory allocated while serving count requests, with the largest allocation sites"""
+    tracemalloc.start(1)
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await run_requests(client, scenario, state, count, concurrency, seed + 1)
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+    return {
+        'requests': count,
+        'peak_kib': round((peak - baseline) / 1024, 1),
+        'retained_kib': round((current - baseline) / 1024, 1),
+        'peak_kib_per_request': round((peak - baseline) / 1024 / count, 2),
+        'top_sites': [
+            {'site': str(stat.traceback), 'size_diff_kib': round(stat.size_diff / 1024, 1), 'count_diff': stat.count_diff}
+            for stat in diff[:top]
+        ]
+    }
+
+async def create_users(client: httpx.AsyncClient, state: BenchmarkState, count: int) -> None:
+    for i in range(count):
+        username, password = f"bench{i}", f"bench-password-{i}"
+        response = await client.post("/users/register", json={
+            'username': username, 'email': f"bench{i}@example.com", 'password': password
+        })
+        response.raise_for_status()
+        response = await client.post("/users/token", data={'username': username, 'password': password})
+        response.raise_for_status()
+        state.users.append((username, password))
+        state.tokens.append(response.json()['access_token'])
+
+def seed_catalog(count: int, overview_words: int, batch_size: int = 500) -> None:
+    """Fill the local catalog with the first count fake movies"""
+    from app.core.config import get_settings
+    from app.db.models import Base
+    from app.db.session import SessionLocal, engine
+    from app.services.catalog import bulk_upsert_movies
+    from app.utils.tmdb_client import TMDBClient
+
+    Base.metadata.create_all(bind=engine)
+    formatter = TMDBClient('benchmark')
+    language = get_settings().catalog_language
+    db = SessionLocal()
+    try:
+        for start in range(1, count + 1, batch_size):
+            movies = [
+                formatter._format_movie_details(fake_movie(movie_id, overview_words))
+                for movie_id in range(start, min(start + batch_size, count + 1))
+            ]
+            bulk_upsert_movies(db, movies, language)
+    finally:
+        db.close()
+
+async def run_benchmark(args: argparse.Namespace) -> Dict:
+    from app.main import app
+
+    scenarios = [SCENARIOS[name] for name in args.scenarios]
+    state = BenchmarkState(id_space=args.id_space or max(args.catalog_size * 2, 1000))
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            await create_users(client, state, args.users)
+            for scenario in scenarios:
+                count = max(int(args.requests * scenario.scale), 1)
+                # Warm caches and connection pools before timing
+                await run_requests(client, scenario, state, max(count // 10, 1), args.concurrency, args.seed - 1)
+                latencies, statuses, wall = await run_requests(
+                    client, scenario, state, count, args.concurrency, args.seed
+                )
+                results[scenario.name] = summarize(latencies, statuses, wall)
+                if args.allocations:
+                    results[scenario.name]['allocations'] = await measure_allocations(
+                        client, scenario, state, max(int(args.allocation_requests * scenario.scale), 1),
+                        args.concurrency, args.seed
+                    )
+                print(format_row(scenario.name, results[scenario.name]), flush=True)
+    return results
+
+def format_row(name: str, result: Dict) -> str:
+    row = (
+        f"{name:<16} {result['requests']:>6} req  {result['throughput_rps']:>9.1f} req/s  "
+        f"p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  "
+        f"errors {result['errors']}"
+    )
+    if 'allocations' in result:
+        row += f"  peak {result['allocations']['peak_kib_per_request']:.1f} KiB/req"
+    return row
+
+def git_revision() -> Dict:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ['git', *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    try:
+        return {'commit': git('rev-parse', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--', '.'))}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_fake_tmdb(args: argparse.Namespace, port: int) -> subprocess.Popen:
+    """Launch the fake TMDB server and wait until it accepts requests"""
+    command = [
+        sys.executable, '-m', 'benchmarks.fake_tmdb', '--port', str(port), '--seed', str(args.seed),
+        '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms),
+        '--error-rate', str(args.error_rate), '--error-status', str(args.error_status),
+        '--results-per-page', str(args.results_per_page), '--overview-words', str(args.overview_words),
+        '--total-movies', str(args.total_movies)
+    ]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Fake TMDB server exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/3/movie/1", timeout=1.0)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Fake TMDB server did not start")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the API against a local TMDB stand-in")
+    parser.add_argument(
+        "--scenarios", type=lambda value: value.split(','), default=list(SCENARIOS),
+        help=f"Comma-separated scenarios to run (default: {','.join(SCENARIOS)})"
+    )
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once")
+    parser.add_argument("--users", type=int, default=8, help="Accounts created for the user scenarios")
+    parser.add_argument("--catalog-size", type=int, default=2000, help="Movies seeded into the local catalog")
+    parser.add_argument("--id-space", type=int, help="Highest movie ID requested (default: twice the catalog)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for request mixes and failure injection")
+    parser.add_argument("--no-allocations", dest="allocations", action="store_false", help="Skip tracemalloc passes")
+    parser.add_argument("--allocation-requests", type=int, default=100, help="Requests traced per scenario")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/)")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+def main() -> None:
+    args = parse_args()
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="movie-benchmark-") as workdir:
+        # Settings are read at import time, so configure them before importing the app
+        os.environ['tmdb_api_key'] = 'benchmark'
+        os.environ['tmdb_api_base_url'] = f"http://127.0.0.1:{port}/3/"
+        os.environ['database_url'] = f"sqlite:///{workdir}/benchmark.db"
+        os.environ.pop('async_database_url', None)
+        os.environ.pop('cache_sqlite_path', None)
+        os.environ.pop('embedding_store_path', None)
+        os.environ.setdefault('log_level', 'WARNING')
+
+        seed_catalog(args.catalog_size, args.overview_words)
+        fake_tmdb = start_fake_tmdb(args, port)
+        try:
+            scenarios = asyncio.run(run_benchmark(args))
+        finally:
+            fake_tmdb.terminate()
+            fake_tmdb.wait()
+
+    from app.core.config import get_settings
+
+    results = {
+        'git': git_revision(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'settings': get_settings().model_dump(exclude={'tmdb_api_key', 'secret_key', 'database_url', 'tmdb_api_base_url'}),
+        'scenarios': scenarios
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / "{}-{}.json".format(
+        datetime.now().strftime('%Y%m%d-%H%M%S'), (results['git']['commit'] or 'unknown')[:10]
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, default=str))
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        print(f"\nChange against {baseline.get('git', {}).get('commit') or args.baseline} (%):")
+        for row in compare_results(baseline, results):
+            changes = {key: 'n/a' if value is None else f"{value:+.1f}" for key, value in row.items() if key != 'scenario'}
+            print("{:<16} throughput {throughput_rps:>7}  p50 {p50_ms:>7}  p95 {p95_ms:>7}  p99 {p99_ms:>7}".format(
+                row['scenario'], **changes
+            ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Rebuild movie embeddings from the catalog and publish them.
+
+Usage:
+    python build_embeddings.py [--store ./embeddings]
+
+Running workers pick up the new version on their next reload check
+without restarting.
+"""
+import argparse
+import logging
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.services.embeddings import EmbeddingStore
+from app.services.recommender import build_catalog_embeddings
+
+def parse_args() -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Build and publish memory-mapped movie embeddings")
+    parser.add_argument("--store", default=settings.embedding_store_path, help="Embedding store directory")
+    parser.add_argument("--dtype", default=settings.embedding_dtype, choices=["float32", "float16"])
+    return parser.parse_args()
+
+def main(args: argparse.Namespace) -> None:
+    if not args.store:
+        raise SystemExit("No embedding store configured; pass --store or set embedding_store_path")
+    settings = get_settings()
+    db = SessionLocal()
+    try:
+        embeddings = build_catalog_embeddings(
+            db,
+            ann_min_items=settings.recommender_ann_min_items,
+            ann_nlist=settings.recommender_ann_nlist,
+            ann_nprobe=settings.recommender_ann_nprobe
+        )
+    finally:
+        db.close()
+    if embeddings is None:
+        raise SystemExit("The catalog needs at least two movies")
+    version = EmbeddingStore(args.store).publish(*embeddings, dtype=args.dtype)
+    print(version)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    main(parse_args())
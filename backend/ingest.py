@@ -0,0 +1,57 @@
+"""Bulk-load the local movie catalog from a TMDB daily ID export.
+
+Usage:
+    python ingest.py movie_ids_05_15_2024.json.gz --checkpoint ingest.checkpoint
+
+Exports can be downloaded from http://files.tmdb.org/p/exports/. Re-running
+with the same checkpoint file resumes after the last committed batch, first
+retrying IDs that failed because TMDB was rate limiting or unavailable.
+The job pauses while TMDB is down and stops early if too many IDs pile up
+for retry.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.services.ingestion import ingest_export
+from app.services.tmbd_services import create_tmdb_client, close_tmdb_client
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ingest a TMDB daily ID export into the movie catalog")
+    parser.add_argument("path", help="Path to the export file (.json or .json.gz)")
+    parser.add_argument("--checkpoint", help="File recording progress so the job can resume")
+    parser.add_argument("--language", help="Language to fetch details in (defaults to the catalog language)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Movies written per transaction")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent TMDB lookups")
+    parser.add_argument("--limit", type=int, help="Stop after this many export lines")
+    parser.add_argument("--max-retry-ids", type=int, default=10000, help="Stop once this many IDs await a retry")
+    parser.add_argument("--include-adult", action="store_true", help="Also ingest adult titles")
+    return parser.parse_args()
+
+async def main(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    # Every ID is fetched once, so the response cache would only churn
+    client = create_tmdb_client(settings.model_copy(update={"cache_enabled": False}))
+    try:
+        stats = await ingest_export(
+            client,
+            SessionLocal,
+            args.path,
+            checkpoint_path=args.checkpoint,
+            language=args.language or settings.catalog_language,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            include_adult=args.include_adult,
+            limit=args.limit,
+            max_retry_ids=args.max_retry_ids
+        )
+    finally:
+        await close_tmdb_client(client)
+    print(json.dumps(stats.as_dict()))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main(parse_args()))
@@ -3,4 +3,95 @@ import os
 import sys
 
 # Add the backend directory to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) 
\ No newline at end of file
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) 
+# Settings require a TMDB key; tests never talk to the real API
+os.environ.setdefault('tmdb_api_key', 'test_api_key')
+
+@pytest.fixture
+def database_path(tmp_path):
+    """Create a fresh SQLite database file with every table"""
+    from sqlalchemy import create_engine
+    from app.db.base_class import Base
+
+    path = tmp_path / 'test.db'
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return path
+
+@pytest.fixture
+def session_factory(database_path):
+    """Create a sync session factory bound to the test database"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_engine(f"sqlite:///{database_path}", connect_args={"check_same_thread": False})
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def async_session_factory(database_path):
+    """Create an async session factory bound to the same test database"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+@pytest.fixture
+def make_client():
+    """Build an AsyncTMDBClient whose HTTP traffic is served by handler"""
+    import httpx
+    from app.utils.tmdb_client import AsyncTMDBClient
+
+    def make(handler, **kwargs):
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return AsyncTMDBClient('test_api_key', http_client=http_client, **kwargs)
+    return make
+
+@pytest.fixture
+def api_user():
+    """Preferences of the user the api client logs in as, or None for an anonymous client.
+
+    Override this fixture in a module, or parametrize it in a test.
+    """
+    return None
+
+@pytest.fixture
+def tmdb_client():
+    """TMDB client the api client uses instead of the app's own, if any"""
+    return None
+
+@pytest.fixture
+def api(session_factory, async_session_factory, api_user, tmdb_client, monkeypatch):
+    """Create a test client whose database, writes and TMDB traffic are local"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.api.movies import get_tmdb_client
+    from app.api.users import get_db_writer
+    from app.db.models import User, UserPreferences
+    from app.db.session import get_db
+    from app.db.writer import WriteQueue
+    from app.services import catalog
+    from app.utils.auth import create_access_token, principal_cache
+
+    async def override_get_db():
+        async with async_session_factory() as db:
+            yield db
+
+    headers = {}
+    if api_user is not None:
+        db = session_factory()
+        db.add(User(id=1, email='test@example.com', username='tester', hashed_password='x'))
+        db.add(UserPreferences(user_id=1, **api_user))
+        db.commit()
+        db.close()
+        headers['Authorization'] = f"Bearer {create_access_token({'sub': 'tester'})}"
+
+    principal_cache.clear()
+    monkeypatch.setattr(catalog, 'AsyncSessionLocal', async_session_factory)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_db_writer] = lambda: WriteQueue(async_session_factory)
+    if tmdb_client is not None:
+        app.dependency_overrides[get_tmdb_client] = lambda: tmdb_client
+    yield TestClient(app, headers=headers)
+    app.dependency_overrides.clear()
@@ -0,0 +1,121 @@
+import asyncio
+import httpx
+import pytest
+from app.utils.error_handlers import TMDBAPIError, TMDBInvalidIDError
+
+SAMPLE_MOVIE = {
+    'id': 27205,
+    'title': 'Inception',
+    'overview': 'A thief who steals corporate secrets...',
+    'poster_path': '/poster.jpg',
+    'release_date': '2010-07-15',
+    'vote_average': 8.4,
+    'genre_ids': [28, 878],
+    'genres': [{'id': 28, 'name': 'Action'}, {'id': 878, 'name': 'Science Fiction'}],
+    'runtime': 148
+}
+
+SAMPLE_LIST_RESPONSE = {
+    'page': 1,
+    'results': [SAMPLE_MOVIE],
+    'total_pages': 1,
+    'total_results': 1
+}
+
+def test_get_movie_details(make_client):
+    """Test getting movie details through the async client"""
+    requests_seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        return httpx.Response(200, json=SAMPLE_MOVIE)
+
+    client = make_client(handler)
+    result = asyncio.run(client.get_movie_details(27205))
+
+    assert result['title'] == 'Inception'
+    assert result['genres'][0]['name'] == 'Action'
+    assert requests_seen[0].url.path == '/3/movie/27205'
+    assert requests_seen[0].url.params['api_key'] == 'test_api_key'
+
+def test_get_popular_movies(make_client):
+    """Test getting popular movies through the async client"""
+    client = make_client(lambda request: httpx.Response(200, json=SAMPLE_LIST_RESPONSE))
+    result = asyncio.run(client.get_popular_movies())
+
+    assert result['page'] == 1
+    assert result['movies'][0]['title'] == 'Inception'
+
+def test_invalid_movie_id(make_client):
+    """Test validation happens before any request is made"""
+    client = make_client(lambda request: pytest.fail("unexpected request"))
+    with pytest.raises(TMDBInvalidIDError):
+        asyncio.run(client.get_movie_details(-1))
+
+def test_api_error_handling(make_client):
+    """Test API error handling"""
+    client = make_client(lambda request: httpx.Response(401))
+    with pytest.raises(TMDBAPIError):
+        asyncio.run(client.search_movies("Inception"))
+
+def test_network_error_handling(make_client):
+    """Test network error handling"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("Network error", request=request)
+
+    client = make_client(handler)
+    with pytest.raises(TMDBAPIError):
+        asyncio.run(client.search_movies("Inception"))
+
+def test_concurrent_identical_requests_share_one_call(make_client):
+    """Test concurrent lookups for the same movie make a single upstream call"""
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=SAMPLE_MOVIE)
+
+    async def run():
+        client = make_client(handler)
+        return await asyncio.gather(*(client.get_movie_details(27205) for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result['title'] == 'Inception' for result in results)
+
+def test_concurrent_identical_requests_share_errors(make_client):
+    """Test every coalesced caller receives the upstream error"""
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(404)
+
+    async def run():
+        client = make_client(handler)
+        return await asyncio.gather(
+            *(client.get_movie_details(27205) for _ in range(5)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(isinstance(result, TMDBAPIError) for result in results)
+
+def test_get_movie_details_many_returns_partial_results(make_client):
+    """Test batch lookups report failing IDs without failing the batch"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith('/404'):
+            return httpx.Response(404)
+        movie_id = int(request.url.path.rsplit('/', 1)[1])
+        return httpx.Response(200, json={**SAMPLE_MOVIE, 'id': movie_id})
+
+    client = make_client(handler)
+    result = asyncio.run(client.get_movie_details_many([1, 404, 2, 1], concurrency=2))
+
+    assert [movie['id'] for movie in result['movies']] == [1, 2]
+    assert result['errors'] == [{'id': 404, 'detail': 'Resource not found', 'transient': False}]
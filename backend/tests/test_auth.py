@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import event, update
+from app.db.models import User
+from app.utils.auth import create_access_token, invalidate_principal
+
+@pytest.fixture
+def queries(async_session_factory):
+    """Record SQL statements issued through the async engine"""
+    statements = []
+    engine = async_session_factory.kw['bind'].sync_engine
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', listener)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', listener)
+
+@pytest.fixture
+def api_user():
+    return {'favorite_genres': [28]}
+
+def test_authenticated_reads_are_served_from_cache(api, queries):
+    """Test the user and preferences are loaded once and then cached"""
+    assert api.get('/users/me').json()['preferences']['favorite_genres'] == [28]
+    first = len(queries)
+
+    response = api.get('/users/me/preferences')
+
+    assert response.json()['favorite_genres'] == [28]
+    assert first > 0
+    assert len(queries) == first
+
+def test_preference_updates_invalidate_cached_user(api):
+    """Test a write is visible on the next read from the same worker"""
+    api.get('/users/me/preferences')
+    api.put('/users/me/preferences', json={'favorite_genres': [18]})
+
+    assert api.get('/users/me/preferences').json()['favorite_genres'] == [18]
+
+def test_deactivated_users_are_rejected(api, session_factory):
+    """Test deactivation takes effect once the cached user is invalidated"""
+    api.get('/users/me')
+    db = session_factory()
+    db.execute(update(User).where(User.id == 1).values(is_active=False))
+    db.commit()
+    db.close()
+    invalidate_principal('tester')
+
+    response = api.get('/users/me')
+
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'Inactive user'
+
+def test_unknown_user_is_unauthorized(api):
+    """Test a valid token for a missing user is rejected"""
+    token = create_access_token({'sub': 'nobody'})
+
+    response = api.get('/users/me', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 401
@@ -0,0 +1,35 @@
+from collections import Counter
+from fastapi.testclient import TestClient
+
+from benchmarks.fake_tmdb import FakeTMDBConfig, create_app, fake_movie
+from benchmarks.run import compare_results, summarize
+
+def test_fake_movies_are_deterministic():
+    assert fake_movie(42) == fake_movie(42)
+    assert fake_movie(42)['id'] == 42
+    assert len(fake_movie(42, overview_words=10)['overview'].split()) == 10
+
+def test_fake_tmdb_serves_pages_and_injects_errors():
+    client = TestClient(create_app(FakeTMDBConfig(latency_ms=0, jitter_ms=0, results_per_page=5)))
+    popular = client.get("/3/movie/popular", params={'page': 2}).json()
+    assert [movie['id'] for movie in popular['results']] == [6, 7, 8, 9, 10]
+    assert client.get("/3/movie/7").json()['title'] == fake_movie(7)['title']
+    assert client.get("/3/movie/0").status_code == 404
+
+    failing = TestClient(create_app(FakeTMDBConfig(latency_ms=0, jitter_ms=0, error_rate=1.0, error_status=429)))
+    response = failing.get("/3/search/movie", params={'query': 'night'})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+
+def test_summarize_and_compare():
+    result = summarize([0.01] * 98 + [0.1, 0.2], Counter({'200': 99, '503': 1}), wall_seconds=2.0)
+    assert result['requests'] == 100
+    assert result['errors'] == 1
+    assert result['throughput_rps'] == 50.0
+    assert result['p50_ms'] == 10.0
+
+    faster = {**result, 'throughput_rps': 75.0, 'p50_ms': 5.0}
+    [row] = compare_results({'scenarios': {'details': result}}, {'scenarios': {'details': faster, 'new': faster}})
+    assert row['scenario'] == 'details'
+    assert row['throughput_rps'] == 50.0
+    assert row['p50_ms'] == -50.0
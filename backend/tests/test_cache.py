@@ -0,0 +1,125 @@
+import asyncio
+import sqlite3
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from app.utils.cache import LRUCache, SQLiteCache, TieredCache, make_cache_key
+from app.utils.tmdb_client import TMDBClient, endpoint_category
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def test_lru_expires_entries(clock):
+    """Test entries are dropped once their TTL has passed"""
+    cache = LRUCache(max_size=2, clock=clock)
+    cache.set('a', 1, ttl=10)
+
+    assert cache.get('a') == 1
+    clock.now += 11
+    assert cache.get('a') is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.expirations == 1
+
+def test_lru_evicts_least_recently_used(clock):
+    """Test the least recently used entry is evicted when full"""
+    cache = LRUCache(max_size=2, clock=clock)
+    cache.set('a', 1, ttl=10)
+    cache.set('b', 2, ttl=10)
+    cache.get('a')
+    cache.set('c', 3, ttl=10)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats.evictions == 1
+
+def test_tiered_cache_promotes_shared_hits(tmp_path, clock):
+    """Test a hit in the shared tier is copied into memory"""
+    shared = SQLiteCache(str(tmp_path / 'cache.db'))
+    shared.set('key', {'id': 1}, ttl=60)
+    cache = TieredCache(LRUCache(clock=clock), shared)
+
+    assert cache.get('key') == {'id': 1}
+    assert cache.memory.get('key') == {'id': 1}
+    assert shared.stats.hits == 1
+    shared.close()
+
+def test_async_tiered_cache_uses_a_worker_thread_for_sqlite(tmp_path, clock):
+    """Test the async methods never touch the shared tier on the event loop thread"""
+    shared = SQLiteCache(str(tmp_path / 'cache.db'))
+    threads = []
+    for name in ('get', 'set'):
+        method = getattr(shared, name)
+        def traced(*args, method=method):
+            threads.append(threading.get_ident())
+            return method(*args)
+        setattr(shared, name, traced)
+    cache = TieredCache(LRUCache(clock=clock), shared)
+
+    async def run():
+        await cache.aset('key', {'id': 1}, 60)
+        cache.memory.clear()
+        return await cache.aget('key'), threading.get_ident()
+
+    value, loop_thread = asyncio.run(run())
+
+    assert value == {'id': 1}
+    assert len(threads) == 2 and loop_thread not in threads
+    shared.close()
+
+def test_locked_shared_tier_skips_writes(tmp_path):
+    """Test another worker's long write lock costs a short timeout, not an error"""
+    path = str(tmp_path / 'cache.db')
+    shared = SQLiteCache(path, timeout=0.05)
+    shared.set('key', {'id': 1}, ttl=60)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+
+    shared.set('other', {'id': 2}, ttl=60)
+    assert shared.get('key')[0] == {'id': 1}
+
+    other.rollback()
+    other.close()
+    assert shared.get('other') is None
+    shared.close()
+
+def test_cache_key_ignores_api_key_and_param_order():
+    """Test cache keys are stable and never contain credentials"""
+    first = make_cache_key('movie/1', {'api_key': 'secret', 'language': 'en-US', 'page': 1})
+    second = make_cache_key('movie/1', {'page': 1, 'language': 'en-US'})
+
+    assert first == second
+    assert 'secret' not in first
+
+def test_endpoint_category():
+    """Test endpoints are mapped to their TTL category"""
+    assert endpoint_category('movie/27205') == 'details'
+    assert endpoint_category('movie/popular') == 'popular'
+    assert endpoint_category('search/movie') == 'search'
+    assert endpoint_category('movie/27205/recommendations') == 'recommendations'
+
+@patch('requests.get')
+def test_client_serves_repeated_requests_from_cache(mock_get):
+    """Test the client only calls TMDB once for identical requests"""
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {'id': 27205, 'title': 'Inception'}
+    mock_get.return_value = mock_response
+    client = TMDBClient('test_api_key', cache=TieredCache(LRUCache()))
+
+    client.get_movie_details(27205)
+    result = client.get_movie_details(27205)
+
+    assert result['title'] == 'Inception'
+    mock_get.assert_called_once()
@@ -0,0 +1,97 @@
+import asyncio
+import sqlite3
+import numpy as np
+import pytest
+from app.db.models import FavoriteMovie, MovieNeighbor, User, WatchlistItem
+from app.services import collaborative
+from app.services.catalog import bulk_upsert_movies
+from app.services.collaborative import (
+    build_interaction_matrix,
+    get_neighbors_page,
+    item_neighbors,
+    train_item_neighbors
+)
+
+def test_interaction_matrix_keeps_strongest_signal():
+    """Test a movie saved twice by one user keeps its highest weight"""
+    interactions = build_interaction_matrix([(7, 10, 0.5), (7, 10, 1.0), (8, 20, 0.5)])
+
+    assert interactions.movie_ids.tolist() == [10, 20]
+    assert interactions.matrix.shape == (2, 2)
+    assert interactions.matrix.toarray().tolist() == [[1.0, 0.0], [0.0, 0.5]]
+
+def test_item_neighbors_rank_co_occurring_movies():
+    """Test neighbors are ordered by co-occurrence and exclude the movie itself"""
+    interactions = build_interaction_matrix([
+        (1, 10, 1.0), (1, 20, 1.0),
+        (2, 10, 1.0), (2, 20, 1.0), (2, 30, 1.0),
+        (3, 30, 1.0), (3, 40, 1.0)
+    ])
+
+    neighbors = dict(item_neighbors(interactions, top_n=2, shrinkage=0, block_size=3))
+
+    assert [movie_id for movie_id, _ in neighbors[10]] == [20, 30]
+    assert neighbors[10][0][1] == pytest.approx(1.0)
+    assert [movie_id for movie_id, _ in neighbors[40]] == [30]
+
+def test_item_neighbors_blocks_match_single_pass():
+    """Test blocking the co-occurrence product does not change the result"""
+    rng = np.random.default_rng(0)
+    interactions = build_interaction_matrix(
+        (int(user), int(movie), 1.0) for user, movie in rng.integers(0, 50, size=(400, 2))
+    )
+
+    blocked = dict(item_neighbors(interactions, top_n=5, block_size=7))
+    single = dict(item_neighbors(interactions, top_n=5, block_size=1000))
+
+    assert blocked.keys() == single.keys()
+    for movie_id, ranked in single.items():
+        assert np.allclose([score for _, score in blocked[movie_id]], [score for _, score in ranked])
+
+def test_train_item_neighbors_replaces_table(session_factory, async_session_factory):
+    """Test training reads saved movies and serves pages from the neighbor table"""
+    db = session_factory()
+    for user_id, favorites, watchlist in [(1, [10, 20], [30]), (2, [10, 20], []), (3, [30], [40])]:
+        db.add(User(id=user_id, email=f'{user_id}@example.com', username=f'user{user_id}', hashed_password='x'))
+        db.add_all(FavoriteMovie(user_id=user_id, movie_id=movie_id) for movie_id in favorites)
+        db.add_all(WatchlistItem(user_id=user_id, movie_id=movie_id) for movie_id in watchlist)
+    db.add(MovieNeighbor(movie_id=99, neighbor_id=98, rank=0, score=1.0))
+    db.commit()
+    bulk_upsert_movies(db, [{'id': movie_id, 'title': f'Movie {movie_id}'} for movie_id in (10, 20, 30, 40)], 'en-US')
+
+    stats = train_item_neighbors(db, top_n=10, shrinkage=0)
+
+    assert stats['users'] == 3
+    assert stats['interactions'] == 7
+    db.close()
+
+    async def pages():
+        async with async_session_factory() as db:
+            return [
+                await get_neighbors_page(db, 99, 1, 20),
+                await get_neighbors_page(db, 10, 1, 20),
+                await get_neighbors_page(db, 10, 2, 1)
+            ]
+
+    assert asyncio.run(pages()) == [([], 0), ([20, 30], 2), ([30], 2)]
+
+def test_training_does_not_lock_the_database_while_scoring(session_factory, database_path, monkeypatch):
+    """Test other writers can commit while neighbors are being computed"""
+    db = session_factory()
+    db.add(User(id=1, email='1@example.com', username='user1', hashed_password='x'))
+    db.add_all(FavoriteMovie(user_id=1, movie_id=movie_id) for movie_id in (10, 20))
+    db.add(MovieNeighbor(movie_id=99, neighbor_id=98, rank=0, score=1.0))
+    db.commit()
+
+    def scoring_with_a_concurrent_write(*args):
+        writer = sqlite3.connect(database_path, timeout=0)
+        writer.execute("INSERT INTO watchlist_items (user_id, movie_id, position) VALUES (1, 30, 0)")
+        writer.commit()
+        writer.close()
+        yield from item_neighbors(*args)
+
+    monkeypatch.setattr(collaborative, 'item_neighbors', scoring_with_a_concurrent_write)
+    stats = train_item_neighbors(db, top_n=10, shrinkage=0)
+    db.close()
+
+    assert stats['neighbors'] == 2
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from app.core.config import Settings
+from app.db.models import User, WatchlistItem
+from app.db.session import configure_sqlite, sqlite_pragmas
+from app.db.writer import WriteQueue
+from app.services.saved_movies import add_saved_movie
+
+@pytest.fixture
+def user(session_factory):
+    db = session_factory()
+    db.add(User(id=1, email='test@example.com', username='tester', hashed_password='x'))
+    db.commit()
+    db.close()
+
+def count_watchlist(session_factory):
+    db = session_factory()
+    try:
+        return db.scalar(select(func.count()).select_from(WatchlistItem))
+    finally:
+        db.close()
+
+def test_concurrent_writes_share_a_transaction(user, session_factory, async_session_factory):
+    """Test writes queued together are committed as one batch"""
+    writer = WriteQueue(async_session_factory, max_batch=50)
+
+    async def run():
+        await writer.start()
+        results = await asyncio.gather(*[
+            writer.submit(lambda db, movie_id=movie_id: add_saved_movie(db, WatchlistItem, 1, movie_id))
+            for movie_id in [1, 2, 3, 1, 4]
+        ])
+        await writer.close()
+        return results
+
+    assert asyncio.run(run()) == [True, True, True, False, True]
+    assert writer.writes == 5
+    assert writer.batches == 1
+    assert count_watchlist(session_factory) == 4
+
+def test_failed_write_does_not_sink_its_batch(user, session_factory, async_session_factory):
+    """Test a raising write is isolated and the rest of its batch commits"""
+    writer = WriteQueue(async_session_factory)
+
+    async def fail(db):
+        await add_saved_movie(db, WatchlistItem, 1, 99)
+        raise ValueError("bad write")
+
+    async def run():
+        await writer.start()
+        results = await asyncio.gather(
+            writer.submit(lambda db: add_saved_movie(db, WatchlistItem, 1, 1)),
+            writer.submit(fail),
+            writer.submit(lambda db: add_saved_movie(db, WatchlistItem, 1, 2)),
+            return_exceptions=True
+        )
+        await writer.close()
+        return results
+
+    results = asyncio.run(run())
+
+    assert results[0] is True and results[2] is True
+    assert isinstance(results[1], ValueError)
+    assert count_watchlist(session_factory) == 2
+
+def test_sqlite_pragmas_are_applied_on_connect(tmp_path):
+    """Test production pragmas are set on every new connection"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    configure_sqlite(engine, sqlite_pragmas(Settings(sqlite_busy_timeout=1234)))
+
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+    engine.dispose()
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import httpx
+import pytest
+from app.services.export import ndjson_movies, prefetch_pages
+
+def make_page(page, total_pages=5):
+    return {'page': page, 'total_pages': total_pages, 'movies': [{'id': page * 10 + i, 'title': f"Movie {page}.{i}"} for i in range(2)]}
+
+def test_pages_are_prefetched_in_order_with_bounded_lookahead():
+    started = []
+
+    async def fetch_page(page):
+        started.append(page)
+        await asyncio.sleep(0.01 * (5 - page))  # Later pages finish first
+        return make_page(page)
+
+    async def consume():
+        pages = []
+        async for page in prefetch_pages(fetch_page, make_page(1), max_pages=4, prefetch=2):
+            # Never more than two pages ahead of the consumer
+            assert max(started, default=1) <= page['page'] + 2
+            pages.append(page['page'])
+        return pages
+
+    assert asyncio.run(consume()) == [1, 2, 3, 4]
+    assert started == [2, 3, 4]
+
+def test_closing_the_stream_cancels_pending_fetches():
+    cancelled = []
+
+    async def fetch_page(page):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(page)
+            raise
+
+    async def consume():
+        stream = ndjson_movies(prefetch_pages(fetch_page, make_page(1), max_pages=5, prefetch=2))
+        first = await stream.__anext__()
+        await asyncio.sleep(0)  # Let the prefetches start
+        await stream.aclose()
+        await asyncio.sleep(0)
+        return first
+
+    lines = asyncio.run(consume()).splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [10, 11]
+    assert cancelled == [2, 3]
+
+def tmdb_handler(request: httpx.Request) -> httpx.Response:
+    page = int(request.url.params['page'])
+    if page == 3:
+        return httpx.Response(404)
+    return httpx.Response(200, json={
+        'page': page, 'total_pages': 500, 'total_results': 10000,
+        'results': [{'id': page * 100 + i, 'title': f"Popular {page}.{i}", 'vote_average': 7.0} for i in range(20)]
+    })
+
+@pytest.fixture
+def tmdb_client(make_client):
+    return make_client(tmdb_handler)
+
+def test_popular_export_streams_ndjson(api):
+    response = api.get('/movies/popular/export', params={'pages': 2})
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    movies = [json.loads(line) for line in response.text.splitlines()]
+    assert [movie['id'] for movie in movies] == [100 + i for i in range(20)] + [200 + i for i in range(20)]
+    assert movies[0]['vote_average'] == 7.0
+
+def test_export_reports_failures_after_the_first_page_in_band(api):
+    lines = api.get('/movies/popular/export', params={'pages': 4}).text.splitlines()
+
+    assert len(lines) == 41
+    assert json.loads(lines[-1]) == {'error': 'Resource not found'}
+
+def test_export_size_is_limited(api):
+    assert api.get('/movies/popular/export', params={'pages': 1000}).status_code == 400
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import pytest
+from app.utils import auth
+from app.utils.hashing import PasswordHasher, PasswordHasherBusy
+
+def test_hasher_runs_off_the_event_loop():
+    """Test hashing runs on a worker thread and reports latency"""
+    loop_thread = threading.get_ident()
+    threads = []
+
+    def fake_hash(password):
+        threads.append(threading.get_ident())
+        return password[::-1]
+
+    hasher = PasswordHasher(fake_hash, lambda plain, hashed: plain[::-1] == hashed, max_workers=2)
+
+    async def run():
+        return await hasher.hash('secret'), await hasher.verify('secret', 'terces')
+
+    assert asyncio.run(run()) == ('terces', True)
+    assert threads and threads[0] != loop_thread
+    assert hasher.stats.completed == 2
+    hasher.shutdown()
+
+def test_hasher_rejects_when_saturated():
+    """Test calls beyond workers plus queue fail fast instead of piling up"""
+    release = threading.Event()
+
+    def slow_hash(password):
+        release.wait(5)
+        return password
+
+    hasher = PasswordHasher(slow_hash, lambda plain, hashed: True, max_workers=1, max_queue=1)
+
+    async def run():
+        running = [asyncio.create_task(hasher.hash(str(i))) for i in range(2)]
+        await asyncio.sleep(0)
+        depth = hasher.queue_depth
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.hash('overflow')
+        release.set()
+        return depth, await asyncio.gather(*running)
+
+    depth, results = asyncio.run(run())
+
+    assert depth == 1
+    assert results == ['0', '1']
+    assert hasher.stats.rejected == 1
+    assert hasher.stats.max_pending == 2
+    hasher.shutdown()
+
+def test_register_and_login(api):
+    """Test registration and login hash and verify through the pool"""
+    user = {'email': 'new@example.com', 'username': 'newbie', 'password': 'password123'}
+
+    assert api.post('/users/register', json=user).status_code == 200
+    assert api.post('/users/token', data={'username': 'newbie', 'password': 'wrong-password'}).status_code == 401
+    response = api.post('/users/token', data={'username': 'newbie', 'password': 'password123'})
+
+    assert response.status_code == 200
+    assert response.json()['token_type'] == 'bearer'
+
+def test_login_returns_503_when_hasher_is_saturated(api, monkeypatch):
+    """Test a full hashing queue sheds load with a retryable error"""
+    async def busy(*args):
+        raise PasswordHasherBusy("Password hashing queue is full")
+
+    monkeypatch.setattr(auth.password_hasher, 'hash', busy)
+
+    response = api.post('/users/register', json={'email': 'a@example.com', 'username': 'alice', 'password': 'password123'})
+
+    assert response.status_code == 503
+    assert response.headers['retry-after'] == '1'
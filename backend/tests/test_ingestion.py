@@ -0,0 +1,113 @@
+import asyncio
+import gzip
+import json
+import httpx
+import pytest
+from app.db.models import Genre, Movie
+from app.services.ingestion import ingest_export, load_checkpoint, load_retry_ids
+from app.utils.resilience import CircuitBreaker
+
+def tmdb_handler(request: httpx.Request) -> httpx.Response:
+    """Serve details for every movie ID except 3"""
+    movie_id = int(request.url.path.rsplit('/', 1)[1])
+    if movie_id == 3:
+        return httpx.Response(404)
+    return httpx.Response(200, json={
+        'id': movie_id,
+        'title': f'Movie {movie_id}',
+        'popularity': float(movie_id),
+        'genres': [{'id': 18, 'name': 'Drama'}]
+    })
+
+@pytest.fixture
+def client(make_client):
+    return make_client(tmdb_handler)
+
+@pytest.fixture
+def export_path(tmp_path):
+    """Write a small gzipped export in TMDB's daily format"""
+    path = tmp_path / 'movie_ids.json.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for movie_id in range(1, 8):
+            f.write(json.dumps({'id': movie_id, 'adult': movie_id == 5, 'original_title': f'Movie {movie_id}'}) + '\n')
+    return str(path)
+
+def test_ingest_export(client, session_factory, export_path, tmp_path):
+    """Test an export is hydrated into the catalog in batches"""
+    checkpoint = str(tmp_path / 'ingest.checkpoint')
+
+    stats = asyncio.run(ingest_export(client, session_factory, export_path, checkpoint, batch_size=3))
+
+    assert stats.as_dict() == {'read': 7, 'skipped': 1, 'stored': 5, 'failed': 1, 'retry': 0, 'last_line': 7}
+    assert load_checkpoint(checkpoint) == 7
+    db = session_factory()
+    assert sorted(movie.id for movie in db.query(Movie)) == [1, 2, 4, 6, 7]
+    assert [genre.name for genre in db.get(Movie, 1).genres] == ['Drama']
+    assert db.query(Genre).count() == 1
+    db.close()
+
+def test_ingest_export_resumes_from_checkpoint(client, session_factory, export_path, tmp_path):
+    """Test a second run only processes lines after the checkpoint"""
+    checkpoint = str(tmp_path / 'ingest.checkpoint')
+
+    first = asyncio.run(ingest_export(client, session_factory, export_path, checkpoint, batch_size=2, limit=4))
+    second = asyncio.run(ingest_export(client, session_factory, export_path, checkpoint, batch_size=2))
+
+    assert first.last_line == 4
+    assert second.read == 3
+    db = session_factory()
+    assert db.query(Movie).count() == 5
+    db.close()
+
+def test_transient_failures_are_retried_on_the_next_run(make_client, session_factory, export_path, tmp_path):
+    """Test IDs that failed while TMDB was unavailable are not skipped by the checkpoint"""
+    checkpoint = str(tmp_path / 'ingest.checkpoint')
+    unavailable = {4, 6}
+
+    def flaky_handler(request: httpx.Request) -> httpx.Response:
+        movie_id = int(request.url.path.rsplit('/', 1)[1])
+        if movie_id in unavailable:
+            return httpx.Response(503)
+        return tmdb_handler(request)
+
+    def run():
+        client = make_client(flaky_handler)
+        return asyncio.run(ingest_export(client, session_factory, export_path, checkpoint, batch_size=3))
+
+    first = run()
+    assert (first.failed, first.retry, first.last_line) == (1, 2, 7)
+    assert load_checkpoint(checkpoint) == 7
+    assert load_retry_ids(checkpoint) == [4, 6]
+
+    unavailable.clear()
+    second = run()
+    assert (second.read, second.stored, second.retry) == (0, 2, 0)
+    assert load_retry_ids(checkpoint) == []
+    db = session_factory()
+    assert sorted(movie.id for movie in db.query(Movie)) == [1, 2, 4, 6, 7]
+    db.close()
+
+def test_ingestion_pauses_while_the_circuit_breaker_is_open(make_client, session_factory, export_path, tmp_path):
+    """Test an open breaker delays the run instead of moving every ID to the retry list"""
+    checkpoint = str(tmp_path / 'ingest.checkpoint')
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    client = make_client(tmdb_handler, circuit_breaker=breaker)
+
+    stats = asyncio.run(ingest_export(client, session_factory, export_path, checkpoint, batch_size=3))
+
+    assert stats.as_dict() == {'read': 7, 'skipped': 1, 'stored': 5, 'failed': 1, 'retry': 0, 'last_line': 7}
+    assert load_retry_ids(checkpoint) == []
+
+def test_ingestion_stops_when_too_many_ids_await_retry(make_client, session_factory, export_path, tmp_path):
+    """Test the retry list stays bounded while TMDB keeps failing"""
+    checkpoint = str(tmp_path / 'ingest.checkpoint')
+    client = make_client(lambda request: httpx.Response(503))
+
+    stats = asyncio.run(ingest_export(
+        client, session_factory, export_path, checkpoint, batch_size=2, max_retry_ids=1
+    ))
+
+    assert (stats.read, stats.retry, stats.last_line) == (2, 2, 2)
+    assert load_checkpoint(checkpoint) == 2
+    assert load_retry_ids(checkpoint) == [1, 2]
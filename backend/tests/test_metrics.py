@@ -0,0 +1,89 @@
+import json
+import logging
+from types import SimpleNamespace
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.routes.metrics import register_collectors
+from app.core.logger import JSONFormatter, RequestIdFilter, request_id_var
+from app.core.metrics import MetricsRegistry, RequestMetricsMiddleware, metrics
+from app.db.writer import WriteQueue
+from app.utils.cache import LRUCache
+
+def test_registry_renders_prometheus_text():
+    """Test counters and histograms use the Prometheus exposition format"""
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests', ('route',))
+    latency = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    requests.inc('/a')
+    requests.inc('/a')
+    latency.observe(0.05)
+    latency.observe(2.0)
+
+    text = registry.render()
+
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{route="/a"} 2' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert 'latency_seconds_count 2' in text
+
+@pytest.fixture
+def client(make_client):
+    """A small app behind the metrics middleware that calls a mocked TMDB"""
+    tmdb = make_client(lambda request: httpx.Response(200, json={'id': 1}))
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get('/things/{thing_id}')
+    async def get_thing(thing_id: int):
+        return await tmdb._make_request(f'movie/{thing_id}')
+
+    return TestClient(app)
+
+def test_middleware_tracks_routes_upstream_calls_and_request_ids(client, caplog):
+    """Test a request is timed by route template and logged with its upstream work"""
+    with caplog.at_level(logging.INFO, logger='app.access'):
+        response = client.get('/things/7', headers={'X-Request-ID': 'req-1'})
+
+    assert response.headers['x-request-id'] == 'req-1'
+    record = next(record for record in caplog.records if record.name == 'app.access')
+    assert record.route == '/things/{thing_id}'
+    assert record.upstream_calls == 1
+    text = metrics.render()
+    assert 'http_request_duration_seconds_count{method="GET",route="/things/{thing_id}",status="200"}' in text
+    assert 'tmdb_request_duration_seconds_count{endpoint="details",status="200"}' in text
+
+def test_json_formatter_includes_request_id_and_extras():
+    """Test log records become one JSON object with the request ID attached"""
+    record = logging.LogRecord('app.test', logging.INFO, __file__, 1, 'hello %s', ('world',), None)
+    record.duration_ms = 12.5
+    token = request_id_var.set('req-2')
+    try:
+        RequestIdFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+
+    entry = json.loads(JSONFormatter().format(record))
+
+    assert entry['message'] == 'hello world'
+    assert entry['request_id'] == 'req-2'
+    assert entry['duration_ms'] == 12.5
+
+def test_app_collectors_report_caches_and_queues(async_session_factory):
+    """Test scrape-time collectors read caches, the hasher and the write queue"""
+    app = SimpleNamespace(state=SimpleNamespace(
+        tmdb_client=SimpleNamespace(cache=None),
+        response_cache=LRUCache(4),
+        db_writer=WriteQueue(async_session_factory)
+    ))
+    register_collectors(app)
+
+    text = metrics.render()
+
+    assert 'cache_hit_ratio{cache="principal"}' in text
+    assert 'cache_misses_total{cache="movie_responses"} 0' in text
+    assert 'password_hash_queue_depth 0' in text
+    assert 'db_write_batches_total 0' in text
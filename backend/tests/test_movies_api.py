@@ -0,0 +1,260 @@
+import asyncio
+import httpx
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.exc import OperationalError
+from app.main import app
+from app.api import movies
+from app.api.movies import get_response_cache, get_recommender
+from app.db.models import Movie, MovieNeighbor
+from app.core.config import get_settings
+from app.services import catalog
+from app.services.recommender import build_content_recommender
+from app.utils.cache import LRUCache
+
+SAMPLE_MOVIE = {
+    'id': 27205,
+    'title': 'Inception',
+    'vote_average': 8.4,
+    'genres': [{'id': 28, 'name': 'Action'}]
+}
+
+# Genres deliberately out of ID order, as TMDB lists them by relevance
+MATRIX = {
+    'id': 603,
+    'title': 'The Matrix',
+    'vote_average': 8.2,
+    'genres': [{'id': 878, 'name': 'Science Fiction'}, {'id': 28, 'name': 'Action'}]
+}
+
+UPSTREAM_CALLS = []
+
+def tmdb_handler(request: httpx.Request) -> httpx.Response:
+    """Serve search results, and movie details for any ID except 404"""
+    UPSTREAM_CALLS.append(request)
+    if request.url.path.endswith('search/movie'):
+        return httpx.Response(200, json={'page': 1, 'total_pages': 1, 'total_results': 1, 'results': [SAMPLE_MOVIE]})
+    movie_id = int(request.url.path.rsplit('/', 1)[1])
+    if movie_id == 404:
+        return httpx.Response(404)
+    if movie_id == MATRIX['id']:
+        return httpx.Response(200, json=MATRIX)
+    return httpx.Response(200, json={**SAMPLE_MOVIE, 'id': movie_id})
+
+@pytest.fixture
+def tmdb_client(make_client):
+    return make_client(tmdb_handler)
+
+@pytest.fixture
+def api(api):
+    """Create a test client whose TMDB traffic and database are local"""
+    UPSTREAM_CALLS.clear()
+    return api
+
+def test_movie_details_are_written_through_to_catalog(api, session_factory):
+    """Test a fetched movie is stored and then served locally"""
+    first = api.get('/movies/27205')
+    second = api.get('/movies/27205')
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()['title'] == 'Inception'
+    assert second.json()['genres'] == [{'id': 28, 'name': 'Action'}]
+    assert len(UPSTREAM_CALLS) == 1
+    db = session_factory()
+    assert db.get(Movie, 27205).title == 'Inception'
+    db.close()
+
+def test_stale_catalog_rows_are_refreshed_in_background(api, session_factory):
+    """Test a stale row is served immediately and refreshed afterwards"""
+    api.get('/movies/27205')
+    db = session_factory()
+    movie = db.get(Movie, 27205)
+    movie.title = 'Old Title'
+    movie.fetched_at = datetime.utcnow() - timedelta(days=30)
+    db.commit()
+    db.close()
+
+    response = api.get('/movies/27205')
+
+    assert response.json()['title'] == 'Old Title'
+    db = session_factory()
+    assert db.get(Movie, 27205).title == 'Inception'
+    db.close()
+
+def test_search_pages_are_served_from_the_response_cache(api):
+    """Test a repeated search reuses the serialized page without calling TMDB"""
+    response_cache = LRUCache(16)
+    app.dependency_overrides[get_response_cache] = lambda: response_cache
+
+    first = api.get('/movies/search', params={'query': 'inception'})
+    second = api.get('/movies/search', params={'query': 'inception'})
+
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert first.json()['movies'][0]['vote_average'] == 8.4
+    assert len(UPSTREAM_CALLS) == 1
+    assert response_cache.stats.hits == 1
+
+def test_concurrent_catalog_writes_do_not_conflict(async_session_factory, session_factory):
+    """Test racing writes of the same new movie and a shared new genre all succeed"""
+    async def write(details):
+        async with async_session_factory() as db:
+            await catalog.upsert_movie(db, details, 'en-US')
+
+    async def race():
+        await asyncio.gather(*(write({**SAMPLE_MOVIE, 'id': 77 + i % 2}) for i in range(6)))
+
+    asyncio.run(race())
+
+    db = session_factory()
+    assert [genre.name for genre in db.get(Movie, 77).genres] == ['Action']
+    assert [genre.name for genre in db.get(Movie, 78).genres] == ['Action']
+    db.close()
+
+def test_failed_catalog_writes_still_return_details(api, monkeypatch):
+    """Test a catalog error is logged instead of failing a successful TMDB read"""
+    async def broken_upsert(db, details, language):
+        raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(catalog, 'upsert_movie', broken_upsert)
+    response = api.get('/movies/77')
+
+    assert response.status_code == 200
+    assert response.json()['title'] == 'Inception'
+
+def test_other_languages_bypass_catalog(api, session_factory):
+    """Test only the catalog language is stored locally"""
+    api.get('/movies/27205', params={'language': 'fr-FR'})
+
+    db = session_factory()
+    assert db.get(Movie, 27205) is None
+    db.close()
+
+def test_batch_movie_details(api):
+    """Test the batch endpoint returns found movies and per-ID errors"""
+    response = api.post('/movies/batch', json={'ids': [1, 404, 2]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [movie['id'] for movie in body['movies']] == [1, 2]
+    assert body['errors'] == [{'id': 404, 'detail': 'Resource not found'}]
+
+def test_batch_movie_details_rejects_large_batches(api):
+    """Test batches above the configured size are rejected"""
+    response = api.post('/movies/batch', json={'ids': list(range(1, 102))})
+
+    assert response.status_code == 400
+
+def test_recommendations_for_catalog_movies_are_local(api, session_factory):
+    """Test movies known to the recommender never hit TMDB"""
+    api.get('/movies/1')
+    api.get('/movies/2')
+    db = session_factory()
+    recommender = build_content_recommender(db)
+    db.close()
+    app.dependency_overrides[get_recommender] = lambda: recommender
+    UPSTREAM_CALLS.clear()
+
+    response = api.get('/movies/1/recommendations')
+
+    assert response.status_code == 200
+    assert [movie['id'] for movie in response.json()['movies']] == [2]
+    assert UPSTREAM_CALLS == []
+
+def test_recommendations_prefer_collaborative_neighbors(api, session_factory):
+    """Test precomputed neighbors are served ahead of the content recommender"""
+    for movie_id in (1, 2, 3):
+        api.get(f'/movies/{movie_id}')
+    db = session_factory()
+    db.add_all([
+        MovieNeighbor(movie_id=1, neighbor_id=3, rank=0, score=0.9),
+        MovieNeighbor(movie_id=1, neighbor_id=2, rank=1, score=0.4)
+    ])
+    db.commit()
+    db.close()
+    UPSTREAM_CALLS.clear()
+
+    response = api.get('/movies/1/recommendations')
+
+    assert response.status_code == 200
+    assert [movie['id'] for movie in response.json()['movies']] == [3, 2]
+    assert response.json()['total_results'] == 2
+    assert UPSTREAM_CALLS == []
+
+def test_neighbors_missing_from_the_catalog_fall_back(api, session_factory):
+    """Test neighbors that cannot be rendered are skipped in favor of content similarity"""
+    api.get('/movies/1')
+    api.get('/movies/2')
+    db = session_factory()
+    db.add(MovieNeighbor(movie_id=1, neighbor_id=900, rank=0, score=0.9))
+    db.commit()
+    recommender = build_content_recommender(db)
+    db.close()
+    app.dependency_overrides[get_recommender] = lambda: recommender
+
+    response = api.get('/movies/1/recommendations')
+
+    assert response.json()['total_results'] == 1
+    assert [movie['id'] for movie in response.json()['movies']] == [2]
+
+def test_catalog_details_answer_conditional_requests(api):
+    """Test a catalog movie carries validators and is not resent while unchanged"""
+    fetched = api.get('/movies/27205')
+    response = api.get('/movies/27205')
+    etag, last_modified = response.headers['etag'], response.headers['last-modified']
+
+    # The write-through response and the catalog response are the same representation
+    assert len(UPSTREAM_CALLS) == 1
+    assert fetched.content == response.content
+    assert fetched.headers['etag'] == etag
+
+    assert response.headers['cache-control'].startswith('public, max-age=')
+    assert api.get('/movies/27205').headers['etag'] == etag
+
+    not_modified = api.get('/movies/27205', headers={'If-None-Match': f'"other", W/{etag}'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b''
+    assert not_modified.headers['etag'] == etag
+    assert api.get('/movies/27205', headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert api.get('/movies/27205', headers={'If-None-Match': '"other"'}).status_code == 200
+    assert api.get('/movies/27205', headers={'If-Modified-Since': 'Thu, 01 Jan 1970 00:00:00 GMT'}).status_code == 200
+
+def test_catalog_details_keep_genre_order(api):
+    """Test a catalog body matches the TMDB body its ETag was computed from"""
+    fetched = api.get('/movies/603')
+    response = api.get('/movies/603')
+
+    assert len(UPSTREAM_CALLS) == 1
+    assert [genre['id'] for genre in response.json()['genres']] == [878, 28]
+    assert response.content == fetched.content
+    assert response.headers['etag'] == fetched.headers['etag']
+
+def test_cached_details_answer_304_without_reserializing(api, monkeypatch):
+    """Test details outside the catalog language reuse the ETag stored with the cached body"""
+    response_cache = LRUCache(16)
+    app.dependency_overrides[get_response_cache] = lambda: response_cache
+
+    first = api.get('/movies/27205', params={'language': 'fr-FR'})
+    monkeypatch.setattr(catalog, 'details_json', None)  # Any serialization would fail
+    second = api.get('/movies/27205', params={'language': 'fr-FR'}, headers={'If-None-Match': first.headers['etag']})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.headers['etag'] == first.headers['etag']
+    assert len(UPSTREAM_CALLS) == 1
+
+def test_cached_pages_answer_304_without_reserializing(api, monkeypatch):
+    """Test the ETag stored with a cached page is reused for If-None-Match"""
+    response_cache = LRUCache(16)
+    app.dependency_overrides[get_response_cache] = lambda: response_cache
+
+    first = api.get('/movies/search', params={'query': 'inception'})
+    monkeypatch.setattr(movies, 'model_json', None)  # Any serialization would fail
+    second = api.get('/movies/search', params={'query': 'inception'}, headers={'If-None-Match': first.headers['etag']})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.headers['etag'] == first.headers['etag']
+    assert second.headers['last-modified'] == first.headers['last-modified']
+    assert second.headers['cache-control'] == get_settings().cache_control_search
+    assert len(UPSTREAM_CALLS) == 1
@@ -0,0 +1,166 @@
+import os
+import numpy as np
+import pytest
+from app.services.catalog import bulk_upsert_movies
+from app.services.embeddings import (
+    EmbeddingStore,
+    IVFIndex,
+    MovieFeatures,
+    build_movie_features,
+    tokenize,
+    top_k
+)
+from app.services.recommender import ContentRecommender, RecommenderLoader, build_content_recommender
+
+ACTION, DRAMA, SCIFI = 28, 18, 878
+
+SAMPLE_MOVIES = [
+    {'id': 1, 'title': 'Space Heist', 'genres': [ACTION, SCIFI], 'original_language': 'en', 'rating': 7.5,
+     'overview': 'A crew of thieves plans a heist on a space station orbiting Mars.'},
+    {'id': 2, 'title': 'Orbit Robbery', 'genres': [ACTION, SCIFI], 'original_language': 'en', 'rating': 7.0,
+     'overview': 'Thieves attempt a robbery aboard a space station.'},
+    {'id': 3, 'title': 'Quiet Farm', 'genres': [DRAMA], 'original_language': 'fr', 'rating': 6.5,
+     'overview': 'A family struggles to keep their farm through a hard winter.'},
+    {'id': 4, 'title': 'Winter Harvest', 'genres': [DRAMA], 'original_language': 'fr', 'rating': 7.2,
+     'overview': 'A farm family faces a hard winter and a poor harvest.'},
+]
+
+def as_feature_rows(movies):
+    return [{**movie, 'tagline': None} for movie in movies]
+
+def test_tokenize_drops_stop_words():
+    """Test tokenization lowercases and removes stop words"""
+    assert tokenize('The Heist of a Lifetime!') == ['heist', 'lifetime']
+
+def test_top_k_returns_best_first():
+    """Test top_k picks the highest scores in descending order"""
+    scores = np.array([0.1, 0.9, 0.5, 0.7])
+
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0]
+
+def test_features_are_normalized():
+    """Test every movie vector has unit length"""
+    features = build_movie_features(as_feature_rows(SAMPLE_MOVIES), text_dim=16, min_df=1)
+
+    assert features.vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(features.vectors, axis=1), 1.0, atol=1e-5)
+
+def test_similar_movies_share_genre_and_topic():
+    """Test the most similar movie is the one with matching genres and overview"""
+    recommender = ContentRecommender(build_movie_features(as_feature_rows(SAMPLE_MOVIES), text_dim=16, min_df=1))
+
+    assert recommender.similar(1, k=1)[0][0] == 2
+    assert recommender.similar(3, k=1)[0][0] == 4
+    assert 1 not in [movie_id for movie_id, _ in recommender.similar(1, k=3)]
+
+def test_recommend_page_caps_results():
+    """Test pagination never exceeds the configured maximum"""
+    recommender = ContentRecommender(
+        build_movie_features(as_feature_rows(SAMPLE_MOVIES), text_dim=16, min_df=1),
+        max_results=2
+    )
+
+    movie_ids, total_results = recommender.recommend_page(1, page=1, page_size=20)
+
+    assert total_results == 2
+    assert len(movie_ids) == 2
+
+def test_build_content_recommender_from_catalog(session_factory):
+    """Test the recommender can be built straight from catalog rows"""
+    db = session_factory()
+    bulk_upsert_movies(db, [
+        {**movie, 'genres': [{'id': genre, 'name': str(genre)} for genre in movie['genres']]}
+        for movie in SAMPLE_MOVIES
+    ], 'en-US')
+
+    recommender = build_content_recommender(db)
+    db.close()
+
+    assert len(recommender) == 4
+    assert recommender.similar(1, k=1)[0][0] == 2
+
+@pytest.fixture
+def random_vectors():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, 16)).astype(np.float32)
+    return np.arange(500, dtype=np.int64) * 10, vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def test_ivf_index_probing_every_list_is_exact(random_vectors):
+    """Test the index matches brute force when every cluster is probed"""
+    ids, vectors = random_vectors
+    index = IVFIndex.build(ids, vectors, nlist=8)
+    query = vectors[7]
+
+    found, scores = index.search(query, k=5, nprobe=index.nlist)
+
+    assert found.tolist() == ids[top_k(vectors @ query, 5)].tolist()
+    assert found[0] == ids[7]
+    assert np.all(np.diff(scores) <= 0)
+
+def test_ivf_index_incremental_add_and_reload(random_vectors, tmp_path):
+    """Test added vectors are searchable at once and survive save/load"""
+    ids, vectors = random_vectors
+    index = IVFIndex.build(ids[:400], vectors[:400], nlist=8, nprobe=2)
+    index.add(ids[400:], vectors[400:])
+
+    assert len(index) == 500
+    assert index.search(vectors[450], k=1)[0][0] == ids[450]
+
+    path = str(tmp_path / 'index.npz')
+    index.save(path)
+    loaded = IVFIndex.load(path)
+
+    assert len(loaded) == 500
+    assert loaded.nprobe == 2
+    assert loaded.search(vectors[450], k=1)[0][0] == ids[450]
+
+def test_recommender_uses_ann_index():
+    """Test similar() gives the same answer through the ANN index"""
+    features = build_movie_features(as_feature_rows(SAMPLE_MOVIES), text_dim=16, min_df=1)
+    index = IVFIndex.build(features.movie_ids, features.vectors, nlist=2, nprobe=2)
+    recommender = ContentRecommender(features, index=index)
+
+    assert recommender.similar(1, k=1)[0][0] == 2
+    assert 1 not in [movie_id for movie_id, _ in recommender.similar(1, k=3)]
+
+def test_embedding_store_publish_and_open(random_vectors, tmp_path):
+    """Test published vectors are memory-mapped back with their index"""
+    ids, vectors = random_vectors
+    features = MovieFeatures(ids, vectors)
+    index = IVFIndex.build(ids, vectors, nlist=8, nprobe=8)
+    store = EmbeddingStore(str(tmp_path / 'embeddings'))
+
+    version = store.publish(features, index)
+    loaded, loaded_index = store.open()
+
+    assert store.current_version() == version
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded_index.vectors is loaded.vectors
+    assert np.allclose(loaded.vector(4500), vectors[450])
+    assert 4505 not in loaded
+    assert loaded_index.search(vectors[450], k=1)[0][0] == 4500
+
+def test_recommender_loader_swaps_published_versions(tmp_path):
+    """Test a newly published version replaces the live recommender"""
+    store = EmbeddingStore(str(tmp_path / 'embeddings'), keep=1)
+    first = build_movie_features(as_feature_rows(SAMPLE_MOVIES[:2]), text_dim=16, min_df=1)
+    store.publish(first)
+    loader = RecommenderLoader(store)
+
+    assert loader.get() is None
+    assert loader.reload() is True
+    assert len(loader.get()) == 2
+
+    store.publish(build_movie_features(as_feature_rows(SAMPLE_MOVIES), text_dim=16, min_df=1), dtype='float16')
+    # Requests keep the mapped version until the reload job runs
+    assert len(loader.get()) == 2
+    assert loader.reload() is True
+    assert loader.reload() is False
+    recommender = loader.get()
+
+    assert len(recommender) == 4
+    assert recommender.version == store.current_version()
+    assert recommender.features.vectors.dtype == np.float16
+    assert recommender.similar(3, k=1)[0][0] == 4
+    assert len([name for name in os.listdir(store.root) if name.startswith('v')]) == 1
@@ -0,0 +1,119 @@
+import asyncio
+import httpx
+import pytest
+from app.utils.cache import LRUCache, TieredCache
+from app.utils.error_handlers import TMDBAPIError, TMDBUnavailableError
+from app.utils.resilience import CircuitBreaker, RetryPolicy, TokenBucket, parse_retry_after
+
+SAMPLE_MOVIE = {'id': 27205, 'title': 'Inception'}
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_token_bucket_limits_burst():
+    """Test the bucket hands out its capacity then waits for refills"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=2, clock=clock)
+
+    async def run():
+        await bucket.acquire()
+        await bucket.acquire()
+        waiter = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        clock.now += 0.1
+        await asyncio.wait_for(waiter, timeout=1)
+
+    asyncio.run(run())
+
+def test_retry_policy_honors_retry_after():
+    """Test Retry-After wins over backoff and long waits give up"""
+    policy = RetryPolicy(max_retries=3, base_delay=0.1, max_delay=2.0)
+
+    assert policy.delay(0, retry_after=1.5) == 1.5
+    assert policy.delay(0, retry_after=10) is None
+    assert 0 <= policy.delay(5) <= 2.0
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after('soon') is None
+
+def test_circuit_breaker_opens_and_probes():
+    """Test the breaker opens after repeated failures and lets one probe through"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+
+def test_client_retries_transient_errors(make_client):
+    """Test a 503 followed by a success is retried transparently"""
+    responses = [httpx.Response(503), httpx.Response(200, json=SAMPLE_MOVIE)]
+    client = make_client(
+        lambda request: responses.pop(0),
+        retry_policy=RetryPolicy(max_retries=2, base_delay=0, max_delay=0)
+    )
+
+    result = asyncio.run(client.get_movie_details(27205))
+
+    assert result['title'] == 'Inception'
+    assert responses == []
+
+def test_client_does_not_retry_client_errors(make_client):
+    """Test a 404 is raised immediately and does not trip the breaker"""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(404)
+
+    client = make_client(handler, retry_policy=RetryPolicy(max_retries=2, base_delay=0))
+
+    with pytest.raises(TMDBAPIError) as exc_info:
+        asyncio.run(client.get_movie_details(27205))
+
+    assert not exc_info.value.transient
+    assert len(calls) == 1
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+def test_open_circuit_serves_stale_cache(make_client):
+    """Test expired entries are served while the circuit is open"""
+    clock = FakeClock()
+    cache = TieredCache(LRUCache(clock=clock, max_stale=3600))
+    healthy = [True]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=SAMPLE_MOVIE) if healthy[0] else httpx.Response(500)
+
+    client = make_client(
+        handler,
+        cache=cache,
+        circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    )
+
+    async def run():
+        await client.get_movie_details(27205)
+        healthy[0] = False
+        clock.now += client.cache_ttls['details'] + 1
+        first = await client.get_movie_details(27205)
+        second = await client.get_movie_details(27205)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first['title'] == second['title'] == 'Inception'
+    assert client.circuit_breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(TMDBUnavailableError):
+        asyncio.run(client.get_movie_details(550))
@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from app.db.models import FavoriteMovie, User, WatchlistItem
+from app.services.saved_movies import get_users_who_saved
+
+@pytest.fixture
+def api_user():
+    return {'favorite_genres': []}
+
+def test_watchlist_add_and_remove(api):
+    """Test watchlist changes are rejected when they would be no-ops"""
+    assert api.post('/users/me/watchlist/10').status_code == 200
+    assert api.post('/users/me/watchlist/10').status_code == 400
+    assert api.post('/users/me/watchlist/20').status_code == 200
+    assert api.get('/users/me/preferences').json()['watchlist'] == [10, 20]
+
+    assert api.delete('/users/me/watchlist/10').status_code == 200
+    assert api.delete('/users/me/watchlist/10').status_code == 400
+    assert api.get('/users/me/preferences').json()['watchlist'] == [20]
+
+def test_preferences_update_replaces_saved_movies(api, session_factory):
+    """Test a preferences update rewrites favorites and leaves the watchlist alone"""
+    api.post('/users/me/watchlist/10')
+    api.put('/users/me/preferences', json={'favorite_movies': [3, 1, 3]})
+
+    response = api.put('/users/me/preferences', json={'favorite_movies': [2], 'language_preference': 'fr-FR'})
+
+    body = response.json()
+    assert body['favorite_movies'] == [2]
+    assert body['watchlist'] == [10]
+    assert body['language_preference'] == 'fr-FR'
+    db = session_factory()
+    assert db.query(FavoriteMovie).count() == 1
+    db.close()
+
+def test_saved_movies_keep_list_order(api):
+    """Test replaced lists keep the given order and additions go last"""
+    api.put('/users/me/preferences', json={'watchlist': [9, 3, 5]})
+    assert api.get('/users/me/preferences').json()['watchlist'] == [9, 3, 5]
+
+    api.post('/users/me/watchlist/1')
+    api.delete('/users/me/watchlist/3')
+    api.post('/users/me/watchlist/3')
+
+    assert api.get('/users/me/preferences').json()['watchlist'] == [9, 5, 1, 3]
+
+def test_users_who_saved_movie(session_factory, async_session_factory):
+    """Test looking up everyone who saved a movie"""
+    db = session_factory()
+    for user_id in (1, 2, 3):
+        db.add(User(id=user_id, email=f'{user_id}@example.com', username=f'user{user_id}', hashed_password='x'))
+    db.add_all([WatchlistItem(user_id=3, movie_id=7), WatchlistItem(user_id=1, movie_id=7), WatchlistItem(user_id=2, movie_id=8)])
+    db.commit()
+    db.close()
+
+    async def users_who_saved():
+        async with async_session_factory() as db:
+            return await get_users_who_saved(db, WatchlistItem, 7)
+
+    assert asyncio.run(users_who_saved()) == [1, 3]
@@ -0,0 +1,183 @@
+import asyncio
+from datetime import timedelta
+import httpx
+import pytest
+from sqlalchemy import select
+from app.main import app
+from app.api import movies
+from app.api.movies import get_response_cache, get_tmdb_client
+from app.db.models import Movie
+from app.services import catalog
+from app.services.scheduler import Scheduler
+from app.services.tmbd_services import create_response_cache
+from app.services.warmer import CacheWarmer
+from app.core.config import get_settings
+from app.utils.cache import LRUCache, SQLiteCache, TieredCache
+
+def test_jobs_run_periodically_and_record_failures():
+    calls = []
+
+    async def ok():
+        calls.append('ok')
+        return {'refreshed': 1}
+
+    async def broken():
+        calls.append('broken')
+        raise RuntimeError("upstream down")
+
+    async def run():
+        scheduler = Scheduler(max_concurrency=1)
+        scheduler.add_job('ok', ok, interval=0.01)
+        scheduler.add_job('broken', broken, interval=0.01)
+        await scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.close()
+        return {job['name']: job for job in scheduler.status()}
+
+    status = asyncio.run(run())
+
+    assert status['ok']['runs'] >= 2
+    assert status['ok']['last_result'] == {'refreshed': 1}
+    assert status['ok']['last_error'] is None
+    assert status['broken']['failures'] == status['broken']['runs'] >= 2
+    assert status['broken']['last_error'] == "upstream down"
+
+def test_status_endpoint_requires_login(api):
+    assert api.get('/scheduler/status').status_code == 401
+
+@pytest.mark.parametrize('api_user', [{}])
+def test_status_endpoint_lists_jobs(api):
+    scheduler = Scheduler()
+    scheduler.add_job('cache_warmer', lambda: asyncio.sleep(0), interval=300)
+    app.state.scheduler = scheduler
+    try:
+        response = api.get('/scheduler/status')
+    finally:
+        del app.state.scheduler
+
+    assert response.status_code == 200
+    assert [job['name'] for job in response.json()['jobs']] == ['cache_warmer']
+    assert response.json()['jobs'][0]['runs'] == 0
+
+def test_cache_warmer_refreshes_only_what_is_due(async_session_factory, make_client, monkeypatch):
+    upstream = []
+
+    def tmdb_handler(request: httpx.Request) -> httpx.Response:
+        upstream.append(request.url.path)
+        path = request.url.path
+        if path.endswith('/popular'):
+            page = int(request.url.params['page'])
+            return httpx.Response(200, json={
+                'page': page, 'total_pages': 2, 'total_results': 4,
+                'results': [{'id': page * 10 + i, 'title': f"Movie {page * 10 + i}"} for i in range(2)]
+            })
+        if path.endswith('/recommendations'):
+            return httpx.Response(200, json={'page': 1, 'total_pages': 1, 'total_results': 0, 'results': []})
+        movie_id = int(path.rsplit('/', 1)[1])
+        return httpx.Response(200, json={'id': movie_id, 'title': f"Movie {movie_id}"})
+
+    monkeypatch.setattr(catalog, 'AsyncSessionLocal', async_session_factory)
+    client = make_client(tmdb_handler, cache=create_response_cache(get_settings()))
+    warmer = CacheWarmer(
+        client, languages=['en-US', 'fr-FR'], popular_pages=2, top_movies=3, min_ttl=60,
+        catalog_max_age=timedelta(hours=24), session_factory=async_session_factory
+    )
+
+    async def run_twice():
+        first = await warmer.run()
+        upstream.clear()
+        second = await warmer.run()
+        async with async_session_factory() as db:
+            stored = sorted(await db.scalars(select(Movie.id)))
+        return first, second, stored
+
+    first, second, stored = asyncio.run(run_twice())
+
+    assert first == {'popular': 4, 'details': 3, 'recommendations': 3}
+    assert stored == [10, 11, 20]
+    assert second == {}
+    assert upstream == []
+
+def test_cache_warmer_counts_failures_without_aborting(async_session_factory, make_client, monkeypatch):
+    def tmdb_handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith('/popular'):
+            return httpx.Response(200, json={
+                'page': 1, 'total_pages': 1, 'total_results': 3,
+                'results': [{'id': movie_id, 'title': f"Movie {movie_id}"} for movie_id in (1, 2, 3)]
+            })
+        if request.url.path.endswith('/2'):
+            return httpx.Response(503)
+        return httpx.Response(200, json={'id': int(request.url.path.rsplit('/', 1)[1]), 'title': 'Movie'})
+
+    async def broken_warm(endpoint, params=None, min_ttl=0.0):
+        raise RuntimeError("cache unavailable")
+
+    monkeypatch.setattr(catalog, 'AsyncSessionLocal', async_session_factory)
+    client = make_client(tmdb_handler, cache=create_response_cache(get_settings()))
+    warmer = CacheWarmer(client, popular_pages=1, top_movies=3, session_factory=async_session_factory)
+
+    async def run():
+        await client.warm('movie/popular', {'page': 1, 'language': 'en-US'})
+        monkeypatch.setattr(client, 'warm', broken_warm)
+        return await warmer.run()
+
+    assert asyncio.run(run()) == {'details': 2, 'failed': 5}
+
+def popular_handler(upstream):
+    def handler(request: httpx.Request) -> httpx.Response:
+        upstream.append(request.url.path)
+        if request.url.path.endswith('/popular'):
+            return httpx.Response(200, json={
+                'page': 1, 'total_pages': 1, 'total_results': 1,
+                'results': [{'id': 7, 'title': 'Movie 7'}]
+            })
+        if request.url.path.endswith('/recommendations'):
+            return httpx.Response(200, json={'page': 1, 'total_pages': 1, 'total_results': 0, 'results': []})
+        return httpx.Response(200, json={'id': 7, 'title': 'Movie 7', 'genres': [{'id': 18, 'name': 'Drama'}]})
+    return handler
+
+def test_workers_do_not_rewarm_what_another_worker_refreshed(make_client, tmp_path):
+    """Test the shared tier's expiry is checked before calling TMDB"""
+    upstream = []
+    path = str(tmp_path / 'cache.db')
+    first, second = (
+        make_client(popular_handler(upstream), cache=TieredCache(LRUCache(), SQLiteCache(path)))
+        for _ in range(2)
+    )
+    params = {'page': 1, 'language': 'en-US'}
+
+    async def run():
+        return await first.warm('movie/popular', params, 60), await second.warm('movie/popular', params, 60)
+
+    assert asyncio.run(run()) == (True, False)
+    assert len(upstream) == 1
+    assert second.cache.ttl('movie/popular?language=en-US&page=1') > 60
+
+def test_cache_warmer_fills_the_response_cache(api, async_session_factory, make_client, monkeypatch):
+    """Test warmed pages and details are served without encoding them on request"""
+    upstream = []
+    client = make_client(popular_handler(upstream), cache=create_response_cache(get_settings()))
+    response_cache = LRUCache(16)
+    warmer = CacheWarmer(
+        client, popular_pages=1, top_movies=1, min_ttl=60, catalog_enabled=False,
+        session_factory=async_session_factory, response_cache=response_cache
+    )
+
+    first = asyncio.run(warmer.run())
+    assert first == {'popular': 1, 'details': 1, 'recommendations': 1}
+    assert asyncio.run(warmer.run()) == {}
+
+    app.dependency_overrides[get_tmdb_client] = lambda: client
+    app.dependency_overrides[get_response_cache] = lambda: response_cache
+    upstream.clear()
+    monkeypatch.setattr(movies, 'page_json', None)  # Any serialization would fail
+    monkeypatch.setattr(catalog, 'details_json', None)
+
+    popular = api.get('/movies/popular')
+    details = api.get('/movies/7')
+    recommendations = api.get('/movies/7/recommendations')
+
+    assert popular.status_code == details.status_code == recommendations.status_code == 200
+    assert popular.json()['movies'][0]['id'] == 7
+    assert details.json()['genres'] == [{'id': 18, 'name': 'Drama'}]
+    assert upstream == []
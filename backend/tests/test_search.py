@@ -0,0 +1,89 @@
+import httpx
+import pytest
+from app.main import app
+from app.api.movies import get_tmdb_client
+from app.api.routes.search import get_search_index
+from app.services.catalog import bulk_upsert_movies
+from app.services.search import SearchIndex, SearchIndexLoader
+from app.utils.text import fold, search_terms
+
+CATALOG = [
+    {'id': 1, 'title': 'The Matrix', 'original_title': 'The Matrix', 'original_language': 'en', 'popularity': 80.0,
+     'overview': 'A hacker learns the world is a simulation.', 'tagline': 'Welcome to the real world'},
+    {'id': 2, 'title': 'The Matrix Reloaded', 'original_title': 'The Matrix Reloaded', 'original_language': 'en',
+     'popularity': 40.0, 'overview': 'Neo fights on.', 'tagline': None},
+    {'id': 3, 'title': 'Amélie', 'original_title': "Le Fabuleux Destin d'Amélie Poulain", 'original_language': 'fr',
+     'popularity': 30.0, 'overview': 'A shy waitress in Paris.', 'tagline': None},
+    {'id': 4, 'title': 'Paris, Texas', 'original_title': 'Paris, Texas', 'original_language': 'en',
+     'popularity': 10.0, 'overview': 'A drifter wanders out of the desert.', 'tagline': None},
+    {'id': 5, 'title': 'Simulation Theory', 'original_title': 'Simulation Theory', 'original_language': 'en',
+     'popularity': 5.0, 'overview': 'A documentary about the matrix hypothesis.', 'tagline': None},
+]
+
+def test_terms_are_folded_and_keep_stop_words():
+    assert fold('Amélie') == 'amelie'
+    assert search_terms("The Fabuleux Destin d'AMÉLIE") == ['the', 'fabuleux', 'destin', 'd', 'amelie']
+
+def test_title_matches_outrank_overview_matches():
+    index = SearchIndex.build(CATALOG)
+
+    ranked, total = index.search('matrix')
+
+    assert total == 3
+    assert [movie_id for movie_id, _ in ranked] == [1, 2, 5]
+
+def test_every_query_term_must_match():
+    index = SearchIndex.build(CATALOG)
+
+    assert index.search('matrix reloaded')[0][0][0] == 2
+    assert index.search('matrix reloaded')[1] == 1
+    assert index.search('matrix nowhere') == ([], 0)
+
+def test_accents_language_filter_and_pagination():
+    index = SearchIndex.build(CATALOG)
+
+    assert index.search('amelie')[0][0][0] == 3
+    assert index.search('paris', original_language='fr')[0] == [(3, pytest.approx(index.search('paris')[0][1][1]))]
+    assert index.search_page('matrix', page=2, page_size=2) == ([5], 3)
+
+def test_index_is_only_rebuilt_when_the_catalog_changes(session_factory):
+    db = session_factory()
+    bulk_upsert_movies(db, [{**movie, 'adult': False} for movie in CATALOG], 'en-US')
+    loader = SearchIndexLoader(session_factory)
+
+    assert loader.refresh() is True
+    index = loader.index
+    assert loader.refresh() is False
+    assert loader.index is index
+
+    bulk_upsert_movies(db, [{'id': 42, 'title': 'Matrix Resurrections'}], 'en-US')
+    db.close()
+    assert loader.refresh() is True
+    assert loader.index.search('resurrections')[0][0][0] == 42
+
+def test_search_is_served_locally_with_tmdb_fallback(api, make_client, session_factory):
+    db = session_factory()
+    bulk_upsert_movies(db, [{**movie, 'adult': False} for movie in CATALOG], 'en-US')
+    db.close()
+    loader = SearchIndexLoader(session_factory)
+    loader.refresh()
+
+    upstream_calls = []
+
+    def tmdb_handler(request: httpx.Request) -> httpx.Response:
+        upstream_calls.append(request)
+        return httpx.Response(200, json={'page': 1, 'total_pages': 1, 'total_results': 1, 'results': [
+            {'id': 99, 'title': 'Remote Result'}
+        ]})
+
+    tmdb_client = make_client(tmdb_handler)
+    app.dependency_overrides[get_tmdb_client] = lambda: tmdb_client
+    app.dependency_overrides[get_search_index] = lambda: loader.index
+    local = api.get('/movies/search', params={'query': 'Matrix'})
+    remote = api.get('/movies/search', params={'query': 'unknown title'})
+
+    assert local.status_code == remote.status_code == 200
+    assert [movie['title'] for movie in local.json()['movies']] == ['The Matrix', 'The Matrix Reloaded', 'Simulation Theory']
+    assert local.json()['total_results'] == 3
+    assert [movie['id'] for movie in remote.json()['movies']] == [99]
+    assert len(upstream_calls) == 1
@@ -0,0 +1,53 @@
+from app.main import app
+from app.api.routes.search import get_suggest_index
+from app.services import suggest
+from app.services.suggest import SuggestIndex
+
+MOVIES = [
+    {'id': 1, 'title': 'Up', 'release_date': '2009-05-28', 'popularity': 50.0},
+    {'id': 2, 'title': 'Upgrade', 'release_date': '2018-06-01', 'popularity': 20.0},
+    {'id': 3, 'title': 'The Matrix', 'release_date': '1999-03-30', 'popularity': 80.0},
+    {'id': 4, 'title': 'Amélie', 'release_date': '2001-04-25', 'popularity': 30.0},
+    {'id': 5, 'title': 'Matrix of Matrices', 'release_date': None, 'popularity': 1.0},
+]
+
+def ids(suggestions):
+    return [movie_id for movie_id, _, _ in suggestions]
+
+def test_prefixes_match_any_of_the_first_words_by_popularity():
+    index = SuggestIndex.build(MOVIES)
+
+    assert ids(index.suggest('mat')) == [3, 5]
+    assert ids(index.suggest('the ma')) == [3]
+    assert ids(index.suggest('AME')) == [4]
+    assert index.suggest('xyz') == []
+
+def test_trailing_space_ends_the_word():
+    index = SuggestIndex.build(MOVIES)
+
+    assert ids(index.suggest('up')) == [1, 2]
+    assert ids(index.suggest('up ')) == []
+    assert ids(index.suggest('up', limit=1)) == [1]
+
+def test_precomputed_heads_agree_with_scanning(monkeypatch):
+    movies = [{'id': i, 'title': f"Star {i}", 'popularity': float(i % 17)} for i in range(1, 200)]
+    popularity = {movie['id']: movie['popularity'] for movie in movies}
+    scanned = SuggestIndex.build(movies)
+    monkeypatch.setattr(suggest, 'SCAN_LIMIT', 10)
+    precomputed = SuggestIndex.build(movies)
+
+    assert b'st' in precomputed.heads
+    for query in ('s', 'star', 'star 1'):
+        expected = [popularity[i] for i in ids(scanned.suggest(query))]
+        assert [popularity[i] for i in ids(precomputed.suggest(query))] == expected
+
+def test_suggest_endpoint(api):
+    index = SuggestIndex.build(MOVIES)
+    app.dependency_overrides[get_suggest_index] = lambda: index
+    response = api.get('/movies/suggest', params={'q': 'matr', 'limit': 1})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'query': 'matr',
+        'suggestions': [{'id': 3, 'title': 'The Matrix', 'release_date': '1999-03-30'}]
+    }
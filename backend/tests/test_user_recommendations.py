@@ -0,0 +1,86 @@
+import pytest
+from app.main import app
+from app.api.movies import get_recommender
+from app.api.routes import recommendations
+from app.api.routes.recommendations import recommendation_cache
+from app.db.models import FavoriteMovie
+from app.services.catalog import bulk_upsert_movies
+from app.services.recommender import ContentRecommender, build_content_recommender
+
+ACTION, DRAMA, SCIFI = 28, 18, 878
+
+CATALOG = [
+    {'id': 1, 'title': 'Space Heist', 'genres': [ACTION, SCIFI], 'original_language': 'en',
+     'overview': 'A crew of thieves plans a heist on a space station orbiting Mars.'},
+    {'id': 2, 'title': 'Orbit Robbery', 'genres': [ACTION, SCIFI], 'original_language': 'en',
+     'overview': 'Thieves attempt a robbery aboard a space station.'},
+    {'id': 3, 'title': 'Quiet Farm', 'genres': [DRAMA], 'original_language': 'fr',
+     'overview': 'A family struggles to keep their farm through a hard winter.'},
+    {'id': 4, 'title': 'Winter Harvest', 'genres': [DRAMA], 'original_language': 'fr',
+     'overview': 'A farm family faces a hard winter and a poor harvest.'},
+    {'id': 5, 'title': 'Station Nights', 'genres': [ACTION, SCIFI], 'original_language': 'en', 'adult': True,
+     'overview': 'Thieves aboard a space station.'},
+]
+
+@pytest.fixture
+def api_user():
+    return {'favorite_genres': []}
+
+@pytest.fixture
+def api(api, session_factory):
+    """Create a test client for a logged-in user who likes movie 1"""
+    db = session_factory()
+    bulk_upsert_movies(db, [
+        {**movie, 'genres': [{'id': genre, 'name': str(genre)} for genre in movie['genres']]}
+        for movie in CATALOG
+    ], 'en-US')
+    db.add(FavoriteMovie(user_id=1, movie_id=1))
+    db.commit()
+    recommender = build_content_recommender(db)
+    db.close()
+
+    recommendation_cache.clear()
+    app.dependency_overrides[get_recommender] = lambda: recommender
+    return api
+
+def test_recommendations_exclude_seen_and_adult_titles(api):
+    """Test favorites and adult titles are never recommended"""
+    response = api.get('/users/me/recommendations')
+
+    assert response.status_code == 200
+    movie_ids = [movie['id'] for movie in response.json()['movies']]
+    assert movie_ids[0] == 2
+    assert 1 not in movie_ids
+    assert 5 not in movie_ids
+
+def test_recommendations_follow_preference_updates(api):
+    """Test cached recommendations are recomputed when preferences change"""
+    api.get('/users/me/recommendations')
+    assert len(recommendation_cache) == 1
+
+    api.put('/users/me/preferences', json={'favorite_movies': [3], 'adult_content': True})
+    response = api.get('/users/me/recommendations')
+
+    movie_ids = [movie['id'] for movie in response.json()['movies']]
+    assert movie_ids[0] == 4
+    assert 5 in movie_ids
+
+def test_recommendations_are_recomputed_after_an_embedding_swap(api, monkeypatch):
+    """Test rankings cached before a new embedding version goes live are not served"""
+    rankings = []
+    rank_for_user = recommendations.rank_for_user
+
+    async def counting_rank_for_user(db, recommender, preferences, limit):
+        rankings.append(recommender.version)
+        return await rank_for_user(db, recommender, preferences, limit)
+
+    monkeypatch.setattr(recommendations, 'rank_for_user', counting_rank_for_user)
+    recommender = app.dependency_overrides[get_recommender]()
+    api.get('/users/me/recommendations')
+    api.get('/users/me/recommendations')
+
+    swapped = ContentRecommender(recommender.features, recommender.max_results, version='v2')
+    app.dependency_overrides[get_recommender] = lambda: swapped
+    api.get('/users/me/recommendations')
+
+    assert rankings == [None, 'v2']
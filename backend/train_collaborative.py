@@ -0,0 +1,32 @@
+"""Rebuild the collaborative-filtering neighbor table from user preferences.
+
+Usage:
+    python train_collaborative.py [--top-n 50] [--shrinkage 10]
+
+Meant to run nightly; neighbors are scored before the neighbor table is
+swapped in a single short transaction, so the API keeps serving the
+previous neighbors until commit and request writes are not held up.
+"""
+import argparse
+import logging
+
+from app.db.session import SessionLocal
+from app.services.collaborative import train_item_neighbors
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train item-item neighbors from watchlists and favorites")
+    parser.add_argument("--top-n", type=int, default=50, help="Neighbors kept per movie")
+    parser.add_argument("--shrinkage", type=float, default=10.0, help="Damping for pairs seen by few users")
+    return parser.parse_args()
+
+def main(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        stats = train_item_neighbors(db, top_n=args.top_n, shrinkage=args.shrinkage)
+    finally:
+        db.close()
+    print(stats)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    main(parse_args())